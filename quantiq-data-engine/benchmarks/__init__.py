@@ -0,0 +1 @@
+"""Benchmarks - 성능 측정 스크립트 (python -m benchmarks.<name>)"""
@@ -0,0 +1,135 @@
+"""
+Indicator Engine Benchmark - 종목별 pandas 경로 vs 벡터화 엔진
+
+Sandbox 합성 가격(상장일/결측일이 종목마다 다른 불균일 이력)으로
+daily_stock_data 문서를 만들고, 두 경로의 소요 시간과 결과 오차를 비교합니다.
+
+Usage:
+    python -m benchmarks.indicator_engine --tickers 500 5000 --days 180
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from src.sandbox.generators import SyntheticDataGenerator
+from src.services.indicator_engine import IndicatorEngine, build_price_matrix
+from src.services.technical_analysis import TechnicalAnalysisService
+
+INDICATORS = ("sma20", "sma50", "rsi", "macd", "signal")
+
+
+def build_daily_docs(ticker_count: int, end_date: str, days: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """합성 daily_stock_data 문서 (종목별 시작일/결측일을 무작위로 다르게 설정)"""
+    generator = SyntheticDataGenerator(seed=seed)
+    start_date = (datetime.strptime(end_date, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+    rng = np.random.default_rng(seed)
+
+    by_date: Dict[str, Dict[str, Any]] = {}
+    for ticker in generator.universe(ticker_count):
+        history = generator.price_history(ticker, start_date, end_date)
+        n = len(history["dates"])
+        first = int(rng.integers(0, n // 3)) if rng.random() < 0.3 else 0
+        keep = rng.random(n) > 0.03
+        keep[:first] = False
+        keep[-1] = True
+        rows = zip(history["dates"], history["open"], history["high"], history["low"], history["close"], history["volume"], keep)
+        for date, open_, high, low, close, volume, kept in rows:
+            if kept:
+                by_date.setdefault(date, {})[ticker] = {
+                    "close_price": close, "open_price": open_, "high_price": high, "low_price": low, "volume": volume
+                }
+
+    return [{"date": date, "stocks": by_date[date]} for date in sorted(by_date)]
+
+
+def run_per_ticker(daily_docs: List[Dict[str, Any]], analysis_date: str) -> Dict[str, Dict[str, float]]:
+    """기존 analyze_stocks의 종목별 DataFrame 경로"""
+    service = TechnicalAnalysisService()
+    data_dict: Dict[str, Dict[str, float]] = {}
+    for doc in daily_docs:
+        for ticker, val in doc["stocks"].items():
+            price = val if isinstance(val, (int, float)) else val.get("close_price")
+            if price:
+                data_dict.setdefault(ticker, {})[doc["date"]] = float(price)
+
+    results = {}
+    target_dt = pd.to_datetime(analysis_date)
+    for ticker, dates_prices in data_dict.items():
+        if len(dates_prices) < 50:
+            continue
+        df = pd.DataFrame.from_dict(dates_prices, orient="index", columns=["close"])
+        df.index = pd.to_datetime(df.index)
+        df.sort_index(inplace=True)
+        df = df.ffill().bfill()
+        df["sma20"] = service.calculate_sma(df["close"], 20)
+        df["sma50"] = service.calculate_sma(df["close"], 50)
+        df["rsi"] = service.calculate_rsi(df["close"])
+        df["macd"], df["signal"] = service.calculate_macd(df["close"])
+        if target_dt not in df.index:
+            continue
+        row = df.loc[target_dt]
+        results[ticker] = {name: float(row[name]) for name in INDICATORS}
+    return results
+
+
+def run_engine(daily_docs: List[Dict[str, Any]], analysis_date: str) -> Dict[str, Dict[str, float]]:
+    """벡터화 엔진 경로 (행렬 적재 포함)"""
+    matrix = build_price_matrix(daily_docs)
+    target_idx = matrix.date_index(analysis_date)
+    indicators = IndicatorEngine().compute(matrix.values)
+    selected = np.flatnonzero((matrix.observation_counts() >= 50) & ~np.isnan(matrix.values[target_idx]))
+    return {
+        matrix.tickers[j]: {name: float(indicators[name][target_idx, j]) for name in INDICATORS}
+        for j in selected
+    }
+
+
+def max_abs_diff(expected: Dict[str, Dict[str, float]], actual: Dict[str, Dict[str, float]]) -> float:
+    """두 결과의 최대 절대 오차 (NaN 위치가 다르면 inf)"""
+    if expected.keys() != actual.keys():
+        return float("inf")
+    worst = 0.0
+    for ticker, row in expected.items():
+        for name in INDICATORS:
+            a, b = row[name], actual[ticker][name]
+            if np.isnan(a) or np.isnan(b):
+                if np.isnan(a) != np.isnan(b):
+                    return float("inf")
+                continue
+            worst = max(worst, abs(a - b))
+    return worst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-ticker pandas vs vectorized indicator engine")
+    parser.add_argument("--tickers", type=int, nargs="+", default=[500, 5000])
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--end-date", default="2025-06-30")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tickers':>8} {'per-ticker (s)':>15} {'engine (s)':>11} {'speedup':>8} {'max |diff|':>11}")
+    for count in args.tickers:
+        docs = build_daily_docs(count, args.end_date, args.days)
+        analysis_date = docs[-1]["date"]
+
+        legacy_times, engine_times = [], []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            expected = run_per_ticker(docs, analysis_date)
+            legacy_times.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            actual = run_engine(docs, analysis_date)
+            engine_times.append(time.perf_counter() - t0)
+
+        legacy, engine = min(legacy_times), min(engine_times)
+        print(f"{count:>8} {legacy:>15.3f} {engine:>11.3f} {legacy / engine:>7.1f}x {max_abs_diff(expected, actual):>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
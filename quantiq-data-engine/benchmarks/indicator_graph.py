@@ -0,0 +1,67 @@
+"""
+Indicator Graph Benchmark - 지표별 독립 계산 vs 공유 중간 결과 실행 계획
+
+같은 지표 목록을 (1) 지표마다 별도 계획으로 계산하는 경우와
+(2) 하나의 계획으로 합쳐 공유 노드를 한 번만 계산하는 경우를 비교합니다.
+
+Usage:
+    python -m benchmarks.indicator_graph --tickers 5000 --days 180
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.indicator_engine import build_daily_docs
+from src.services.indicator_engine import bottom_align, build_field_matrix, build_price_matrix
+from src.services.indicator_graph import INPUT_FIELDS, IndicatorPlan, build_plan, indicator_key, parse_indicator
+
+DEFAULT_SPECS = [
+    "sma(20)", "sma(50)", "ema(12)", "ema(26)", "rsi(14)", "momentum(1)", "momentum(10)",
+    "macd", "macd_signal", "macd_histogram",
+    "bollinger_upper", "bollinger_lower", "bollinger_percent_b",
+    "atr(14)", "stoch_k", "stoch_d", "obv", "volume_sma", "volume_ratio",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Independent vs shared indicator plans")
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--end-date", default="2025-06-30")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--specs", nargs="+", default=DEFAULT_SPECS)
+    args = parser.parse_args()
+
+    docs = build_daily_docs(args.tickers, args.end_date, args.days)
+    matrix = build_price_matrix(docs)
+    aligned, order = bottom_align(matrix.values)
+    inputs = {"close": aligned}
+    for name, field in INPUT_FIELDS.items():
+        if name != "close":
+            inputs[name] = np.take_along_axis(build_field_matrix(docs, matrix, field), order, axis=0)
+
+    shared = build_plan(args.specs)
+    independent = [IndicatorPlan({indicator_key(spec): parse_indicator(spec)}) for spec in args.specs]
+
+    independent_times, shared_times = [], []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        expected = {}
+        for plan in independent:
+            expected.update(plan.execute(inputs))
+        independent_times.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        actual = shared.execute(inputs)
+        shared_times.append(time.perf_counter() - t0)
+
+    identical = all(np.array_equal(expected[k], actual[k], equal_nan=True) for k in expected)
+    stats = shared.stats()
+    print(f"{len(matrix.tickers)} tickers × {len(matrix.dates)} days, {stats['indicators']} indicators")
+    print(f"operations: independent {stats['naive_operations']} → planned {stats['planned_operations']}")
+    print(f"independent {min(independent_times):.3f}s, shared {min(shared_times):.3f}s, identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
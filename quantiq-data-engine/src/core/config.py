@@ -23,14 +23,120 @@ class Settings:
     KAFKA_TOPIC_ANALYSIS_COMPLETED = "quantiq.analysis.completed"
     KAFKA_TOPIC_ECONOMIC_DATA_UPDATE_REQUEST = "economic.data.update.request"
     KAFKA_TOPIC_ECONOMIC_DATA_UPDATED = "economic.data.updated"
+    KAFKA_TOPIC_PIPELINE_RUN_REQUEST = "pipeline.run.request"
+    # 분석 진행 상황/부분 결과 (quantiq.analysis.progress, ANALYSIS_PROGRESS_CHUNK_SIZE개 종목마다 한 번)
+    ANALYSIS_PROGRESS_ENABLED = os.getenv("ANALYSIS_PROGRESS_ENABLED", "true").lower() == "true"
+    ANALYSIS_PROGRESS_CHUNK_SIZE = int(os.getenv("ANALYSIS_PROGRESS_CHUNK_SIZE", "50"))
 
     # APIs
     FRED_API_KEY = os.getenv("FRED_API_KEY", "aedfbcd8ba091c740281c0bd8ca93b46")
     ALPHA_VANTAGE_API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY", "")
+    # Alpha Vantage 요금제 한도 (무료: 분당 5회, 일 25회 / 유료 요금제는 분당 한도만 있으므로 CALLS_PER_DAY=0) 및 동시 요청 수
+    ALPHA_VANTAGE_CALLS_PER_MINUTE = float(os.getenv("ALPHA_VANTAGE_CALLS_PER_MINUTE", "5"))
+    ALPHA_VANTAGE_CALLS_PER_DAY = int(os.getenv("ALPHA_VANTAGE_CALLS_PER_DAY", "25"))
+    ALPHA_VANTAGE_MAX_CONCURRENCY = int(os.getenv("ALPHA_VANTAGE_MAX_CONCURRENCY", "4"))
+    # NEWS_SENTIMENT 수집 방식: 종목 필터 없는 시장 전체 조회로 기사를 모은 뒤 종목별로 분배하고,
+    # 시장 조회에 한 번도 등장하지 않은 종목만 종목별로 조회 (복수 티커 조회는 API가 AND 조건으로 처리)
+    SENTIMENT_MARKET_SWEEP = os.getenv("SENTIMENT_MARKET_SWEEP", "true").lower() == "true"
+    SENTIMENT_SWEEP_LIMIT = int(os.getenv("SENTIMENT_SWEEP_LIMIT", "1000"))  # 요청당 최대 기사 수 (API 최대 1000)
+    SENTIMENT_PER_TICKER_FALLBACK = os.getenv("SENTIMENT_PER_TICKER_FALLBACK", "true").lower() == "true"
+    # API 점수가 없는 종목(한도 소진 등)은 저장된 기사 제목/요약을 어휘 기반으로 오프라인 채점
+    SENTIMENT_LEXICON_FALLBACK = os.getenv("SENTIMENT_LEXICON_FALLBACK", "true").lower() == "true"
+
+    # API Base URLs (로컬 Fake 서버 사용 시 오버라이드, src/sandbox 참고)
+    FRED_BASE_URL = os.getenv("FRED_BASE_URL", "https://api.stlouisfed.org/fred")
+    YAHOO_FINANCE_BASE_URL = os.getenv("YAHOO_FINANCE_BASE_URL", "")  # 비어있으면 yfinance 라이브러리 사용
+    ALPHA_VANTAGE_BASE_URL = os.getenv("ALPHA_VANTAGE_BASE_URL", "https://www.alphavantage.co")
+    SLACK_API_BASE_URL = os.getenv("SLACK_API_BASE_URL", "https://slack.com/api")
+
+    # Technical Analysis
+    # true면 indicator_state를 하루씩 전진시키는 증분 계산 사용 (과거 날짜 재분석은 전체 재계산)
+    TECHNICAL_ANALYSIS_INCREMENTAL = os.getenv("TECHNICAL_ANALYSIS_INCREMENTAL", "false").lower() == "true"
+    INDICATOR_STATE_VERIFY_EVERY = int(os.getenv("INDICATOR_STATE_VERIFY_EVERY", "20"))  # N회 증분 실행마다 전체 재계산과 비교 (0 = 비활성)
+    INDICATOR_STATE_VERIFY_SAMPLE = int(os.getenv("INDICATOR_STATE_VERIFY_SAMPLE", "200"))  # 비교할 종목 수
+    # 기본 지표 외에 추가로 계산해 technical_indicators에 저장할 지표 (예: "atr(14), bollinger_upper(20, 2), stoch_k, obv")
+    # 전체 재계산 경로에서만 계산되며, 증분 경로(indicator_state)는 기본 지표만 유지
+    TECHNICAL_ANALYSIS_EXTRA_INDICATORS = os.getenv("TECHNICAL_ANALYSIS_EXTRA_INDICATORS", "")
+    # 2 이상이면 전체 재계산 지표를 종목 shard로 나눠 프로세스 풀(공유 메모리)에서 계산
+    TECHNICAL_ANALYSIS_WORKERS = int(os.getenv("TECHNICAL_ANALYSIS_WORKERS", "1"))
+    TECHNICAL_ANALYSIS_PARALLEL_MIN_TICKERS = int(os.getenv("TECHNICAL_ANALYSIS_PARALLEL_MIN_TICKERS", "1000"))  # 이보다 적으면 단일 프로세스
+
+    # Analysis Result Cache (같은 기준일/유니버스/입력 데이터/파라미터 요청은 저장된 결과 재사용)
+    ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+    ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "86400"))
+    # 통합 분석은 뉴스 감정 재수집을 건너뛰므로 더 짧게 유지
+    ANALYSIS_CACHE_COMBINED_TTL_SECONDS = int(os.getenv("ANALYSIS_CACHE_COMBINED_TTL_SECONDS", "3600"))
+
+    # Streaming Analysis (quantiq.stock.price.updated 틱 → 장중 매매 신호)
+    # indicator_state를 사용하며, 워커가 재적재 때마다 최신 daily_stock_data 날짜까지 직접 전진시킴
+    # (TECHNICAL_ANALYSIS_INCREMENTAL과 무관하게 동작)
+    STREAMING_ANALYSIS_ENABLED = os.getenv("STREAMING_ANALYSIS_ENABLED", "false").lower() == "true"
+    STREAMING_SIGNAL_COOLDOWN_SECONDS = float(os.getenv("STREAMING_SIGNAL_COOLDOWN_SECONDS", "60"))  # 종목별 신호 재발행 최소 간격
+    STREAMING_STATE_RELOAD_SECONDS = float(os.getenv("STREAMING_STATE_RELOAD_SECONDS", "300"))  # indicator_state 재적재 주기
+
+    # Sentiment Refresh (백그라운드로 sentiment_analysis를 갱신해 통합 분석이 뉴스 API를 기다리지 않도록 함)
+    SENTIMENT_REFRESH_ENABLED = os.getenv("SENTIMENT_REFRESH_ENABLED", "false").lower() == "true"
+    SENTIMENT_REFRESH_INTERVAL_SECONDS = float(os.getenv("SENTIMENT_REFRESH_INTERVAL_SECONDS", "1800"))
+    # 통합 분석이 그대로 사용할 저장된 감성 점수의 최대 나이
+    SENTIMENT_MAX_AGE_SECONDS = float(os.getenv("SENTIMENT_MAX_AGE_SECONDS", "21600"))
+    # 최대 나이 안의 점수가 없는 종목만 통합 분석 중에 직접 수집
+    SENTIMENT_INLINE_FALLBACK = os.getenv("SENTIMENT_INLINE_FALLBACK", "true").lower() == "true"
+    # 통합 분석에서 기술적 분석이 끝난 뒤 감정 단계를 더 기다릴 최대 시간 (초과 시 취소하고 그때까지의 점수 사용, 0 = 무제한)
+    COMBINED_SENTIMENT_TIMEOUT_SECONDS = float(os.getenv("COMBINED_SENTIMENT_TIMEOUT_SECONDS", "600"))
+    # 위 시간 초과로 취소한 뒤 감정 단계가 멈추기를 기다릴 최대 시간 (넘으면 버리고 저장된 감성 점수 사용)
+    COMBINED_SENTIMENT_CANCEL_GRACE_SECONDS = float(os.getenv("COMBINED_SENTIMENT_CANCEL_GRACE_SECONDS", "30"))
+
+    # Combined Scoring (src/services/scoring_engine.py)
+    SCORING_WEIGHTING_SCHEME = os.getenv("SCORING_WEIGHTING_SCHEME", "fixed")  # fixed | rank | confidence
+    COMBINED_TOP_K = int(os.getenv("COMBINED_TOP_K", "0"))  # 통합 추천 최대 종목 수 (0 = 임계값 통과 전체)
+    # true면 골든크로스 + RSI<50 + MACD>Signal 규칙을 모두 만족한 종목만 통합 추천
+    COMBINED_REQUIRE_TECHNICAL_RULE = os.getenv("COMBINED_REQUIRE_TECHNICAL_RULE", "true").lower() == "true"
+
+    # Pipeline (src/services/pipeline.py, 입력 버전이 같은 단계는 건너뜀)
+    PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "2"))  # 동시에 실행할 독립 단계 수
+    # 경제 데이터 수집 단계는 마지막 성공 후 이 시간이 지나야 다시 수집
+    PIPELINE_ECONOMIC_MAX_AGE_SECONDS = float(os.getenv("PIPELINE_ECONOMIC_MAX_AGE_SECONDS", "21600"))
+
+    # Metrics (GET /metrics, Prometheus text format)
+    # pymongo 명령 모니터링으로 Mongo 명령별 소요 시간 수집 (명령마다 리스너 호출 비용 발생)
+    METRICS_MONGO_COMMANDS = os.getenv("METRICS_MONGO_COMMANDS", "true").lower() == "true"
+
+    # Tracing (src/core/tracing.py, W3C traceparent를 Kafka header와 BaseEvent.traceparent로 전파)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file")  # console | file
+    TRACING_FILE_PATH = os.getenv("TRACING_FILE_PATH", "traces/spans.jsonl")  # JSON Lines, 한 줄에 span 하나
+    # 새 trace 중 기록할 비율 (받은 traceparent가 있으면 그 sampled 플래그를 따름)
+    TRACING_SAMPLE_RATIO = float(os.getenv("TRACING_SAMPLE_RATIO", "1.0"))
+    # 요청 처리 중 실행된 Mongo 명령마다 span 기록
+    TRACING_MONGO_COMMANDS = os.getenv("TRACING_MONGO_COMMANDS", "true").lower() == "true"
+
+    # Job Registry (src/core/jobs.py, 처리한 요청마다 job_runs에 단계별 시간/처리 건수/결과 기록 → /api/jobs)
+    JOB_REGISTRY_ENABLED = os.getenv("JOB_REGISTRY_ENABLED", "true").lower() == "true"
+    JOB_RUNS_TTL_DAYS = int(os.getenv("JOB_RUNS_TTL_DAYS", "30"))  # job_runs 보관 기간 (0 = 영구)
+    JOB_MAX_STAGE_RECORDS = int(os.getenv("JOB_MAX_STAGE_RECORDS", "200"))  # 작업당 개별 단계 기록 수 (초과분은 단계별 합계에만 반영)
+    JOB_STATS_MAX_SAMPLES = int(os.getenv("JOB_STATS_MAX_SAMPLES", "1000"))  # p50/p95 계산에 쓸 작업 유형별 최근 실행 수
+
+    # Profiling (/admin/profiling으로 예약한 메시지 처리 구간만 cProfile/샘플링/tracemalloc 측정)
+    PROFILING_DIR = os.getenv("PROFILING_DIR", "profiles")  # 캡처 저장 위치 (캡처당 디렉터리 하나)
+    PROFILING_MAX_CAPTURES = int(os.getenv("PROFILING_MAX_CAPTURES", "50"))  # 초과 시 오래된 캡처부터 삭제
+    PROFILING_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", "10"))  # sampling 모드 기본 주기
+    PROFILING_TRACEMALLOC_FRAMES = int(os.getenv("PROFILING_TRACEMALLOC_FRAMES", "1"))  # 할당 위치당 저장할 스택 깊이
+    PROFILING_ARM_TTL_SECONDS = float(os.getenv("PROFILING_ARM_TTL_SECONDS", "86400"))  # 조건에 맞는 메시지가 없으면 예약 자동 해제
+    # /admin 엔드포인트의 X-Admin-Token 헤더 값 (미설정 시 /admin 엔드포인트는 403)
+    ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
 
     # Slack Settings
     SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
     SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN", "")
     SLACK_CHANNEL = os.getenv("SLACK_CHANNEL", "#trading-alerts")
+    # 알림은 큐에 넣고 백그라운드 스레드가 전송 (false면 호출 스레드에서 동기 전송)
+    SLACK_ASYNC_ENABLED = os.getenv("SLACK_ASYNC_ENABLED", "true").lower() == "true"
+    SLACK_QUEUE_MAX_SIZE = int(os.getenv("SLACK_QUEUE_MAX_SIZE", "1000"))  # 초과 시 새 메시지 버림
+    SLACK_MESSAGES_PER_MINUTE = float(os.getenv("SLACK_MESSAGES_PER_MINUTE", "60"))  # 채널별 (chat.postMessage 초당 약 1건)
+    SLACK_COALESCE_MAX_CHARS = int(os.getenv("SLACK_COALESCE_MAX_CHARS", "3000"))  # 병합된 스레드 답글 최대 길이
+    SLACK_MAX_RETRIES = int(os.getenv("SLACK_MAX_RETRIES", "3"))  # 호출 제한(429) 응답 시 재시도 횟수
+    # request_id → 스레드 타임스탬프 보관 한도 (정리되지 않은 항목도 TTL/개수 초과 시 삭제)
+    SLACK_THREAD_TS_TTL_SECONDS = float(os.getenv("SLACK_THREAD_TS_TTL_SECONDS", "86400"))
+    SLACK_THREAD_TS_MAX_ENTRIES = int(os.getenv("SLACK_THREAD_TS_MAX_ENTRIES", "1000"))
 
 settings = Settings()
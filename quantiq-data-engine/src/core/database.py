@@ -1,5 +1,7 @@
 from pymongo import MongoClient
 from src.core.config import settings
+from src.core.metrics import MongoCommandMetrics
+from src.core.tracing import MongoCommandTracing
 import logging
 
 logger = logging.getLogger(__name__)
@@ -11,7 +13,12 @@ class MongoDB:
     def get_client(cls):
         if cls._client is None:
             try:
-                cls._client = MongoClient(settings.MONGODB_URI)
+                # 명령별 소요 시간을 /metrics로 노출
+                listeners = [MongoCommandMetrics()] if settings.METRICS_MONGO_COMMANDS else []
+                # 요청 처리 중 실행된 명령은 요청 trace의 자식 span으로 기록
+                if settings.TRACING_ENABLED and settings.TRACING_MONGO_COMMANDS:
+                    listeners.append(MongoCommandTracing())
+                cls._client = MongoClient(settings.MONGODB_URI, event_listeners=listeners)
                 # Test connection
                 cls._client.admin.command('ping')
                 logger.info("MongoDB connection successful")
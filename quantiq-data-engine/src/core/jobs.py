@@ -0,0 +1,341 @@
+"""
+Job Registry - 처리한 요청별 실행 기록 (job_runs 컬렉션)
+
+Kafka 요청(과 관리 API 작업) 하나마다 작업 유형(토픽), requestId, 단계별 시작/종료 시간,
+처리 건수, 외부 API 응답 크기, 결과를 기록합니다. /api/jobs에서 최근 작업과 작업 유형별
+p50/p95 소요 시간을 조회할 수 있고, 완료 이벤트에는 단계별 소요 시간(breakdown())을 담아
+배포 직후 지연 회귀를 바로 확인할 수 있습니다.
+
+    job = job_registry.start("analysis.technical.request", request_id)
+    try:
+        with stage_timer("technical", "indicators"):   # 현재 작업의 단계로 기록
+            ...
+        add_records(len(rows))
+        job.complete(result)
+    finally:
+        job_registry.finish(job)
+
+현재 작업은 contextvars로 전달되므로 src/core/metrics의 stage_timer()/external_call()이
+별도 인자 없이 단계와 응답 크기를 기록합니다 (스레드 풀은 tracing.wrap()으로 context 전달).
+"""
+import contextvars
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_COLLECTION = "job_runs"
+
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar("quantiq_current_job", default=None)
+
+
+def _utcnow() -> datetime:
+    return datetime.utcnow()
+
+
+class JobRun:
+    """
+    실행 중인 작업 하나 (thread-safe - 통합 분석의 병렬 단계가 함께 기록)
+
+    Args:
+        job_type: 작업 유형 (Kafka 토픽 이름 등)
+        request_id: 요청 ID
+        topic: 요청 토픽 (Kafka 요청이 아니면 None)
+    """
+
+    def __init__(self, job_type: str, request_id: Optional[str] = None, topic: Optional[str] = None):
+        self.job_id = uuid.uuid4().hex
+        self.job_type = job_type
+        self.request_id = request_id
+        self.topic = topic
+        self.status = "running"
+        self.error: Optional[str] = None
+        self.records = 0
+        self.bytes = 0
+        self.attributes: Dict[str, Any] = {}
+        self.started_at = _utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.stages: List[Dict[str, Any]] = []
+        self.stage_totals: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._duration: Optional[float] = None
+        self._token = None
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        return self._duration if self._duration is not None else time.perf_counter() - self._started
+
+    def add(self, records: int = 0, bytes: int = 0) -> None:
+        with self._lock:
+            self.records += records
+            self.bytes += bytes
+
+    def set(self, **attributes) -> None:
+        """작업 유형별 추가 정보 (예: 업로드한 패키지 버전)"""
+        with self._lock:
+            self.attributes.update(attributes)
+
+    def record_stage(self, name: str, started_at: datetime, duration: float, status: str = "ok") -> None:
+        """
+        단계 기록. 개별 기록은 JOB_MAX_STAGE_RECORDS개까지만 보관하고
+        (기간 분석처럼 같은 단계가 반복되는 경우) 초과분은 단계별 합계에만 반영합니다.
+        """
+        with self._lock:
+            if len(self.stages) < settings.JOB_MAX_STAGE_RECORDS:
+                self.stages.append({
+                    "name": name,
+                    "started_at": started_at,
+                    "ended_at": started_at + timedelta(seconds=duration),
+                    "duration": round(duration, 3),
+                    "status": status
+                })
+            total = self.stage_totals.setdefault(name, {"count": 0, "duration": 0.0, "max": 0.0})
+            total["count"] += 1
+            total["duration"] = round(total["duration"] + duration, 3)
+            total["max"] = round(max(total["max"], duration), 3)
+
+    def complete(self, result: Optional[Dict[str, Any]] = None) -> None:
+        """서비스 결과(status=success/failed 또는 success=True/False)로 작업 결과 설정"""
+        if result and (result.get("status") == "failed" or result.get("success") is False):
+            self.fail(result.get("error", ""))
+        else:
+            self.status = "success"
+
+    def fail(self, error: Any) -> None:
+        self.status = "failed"
+        self.error = str(error)[:500]
+
+    def breakdown(self) -> Dict[str, Any]:
+        """완료 이벤트에 담을 단계별 소요 시간 요약"""
+        with self._lock:
+            return {
+                "jobId": self.job_id,
+                "duration": round(self.duration, 3),
+                "records": self.records,
+                "bytes": self.bytes,
+                "stages": {name: dict(total) for name, total in self.stage_totals.items()}
+            }
+
+    def to_document(self) -> Dict[str, Any]:
+        with self._lock:
+            doc = {
+                "_id": self.job_id,
+                "job_type": self.job_type,
+                "topic": self.topic,
+                "request_id": self.request_id,
+                "status": self.status,
+                "error": self.error,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration": round(self.duration, 3),
+                "records": self.records,
+                "bytes": self.bytes,
+                "stages": list(self.stages),
+                "stage_totals": {name: dict(total) for name, total in self.stage_totals.items()},
+                "attributes": dict(self.attributes)
+            }
+        if self.finished_at is not None and settings.JOB_RUNS_TTL_DAYS > 0:
+            doc["expires_at"] = self.finished_at + timedelta(days=settings.JOB_RUNS_TTL_DAYS)
+        return doc
+
+
+class JobRegistry:
+    """진행 중인 작업(프로세스 내) + job_runs 기록/조회 (프로세스당 하나, job_registry)"""
+
+    _indexes_ready = False
+
+    def __init__(self):
+        self._active: Dict[str, JobRun] = {}
+        self._lock = threading.Lock()
+
+    def _collection(self):
+        # database 모듈이 metrics를 import하므로 순환 import를 피해 지연 import
+        from src.core.database import MongoDB
+
+        collection = MongoDB.get_db()[JOB_COLLECTION]
+        if not JobRegistry._indexes_ready:
+            try:
+                collection.create_index("expires_at", expireAfterSeconds=0)
+                collection.create_index([("job_type", 1), ("finished_at", -1)])
+                collection.create_index("request_id")
+                JobRegistry._indexes_ready = True
+            except Exception as e:
+                logger.warning(f"job_runs 인덱스 생성 실패: {e}")
+        return collection
+
+    def _save(self, job: JobRun) -> None:
+        if not settings.JOB_REGISTRY_ENABLED:
+            return
+        try:
+            doc = job.to_document()
+            self._collection().replace_one({"_id": doc["_id"]}, doc, upsert=True)
+        except Exception as e:
+            logger.warning(f"job_runs 기록 실패 ({job.job_type}/{job.request_id}): {e}")
+
+    def start(self, job_type: str, request_id: Optional[str] = None, topic: Optional[str] = None) -> JobRun:
+        """작업 시작 - running 상태로 기록하고 현재 작업으로 설정 (finish()에서 해제)"""
+        job = JobRun(job_type, request_id, topic)
+        job._token = _CURRENT.set(job)
+        with self._lock:
+            self._active[job.job_id] = job
+        self._save(job)
+        return job
+
+    def finish(self, job: Optional[JobRun], status: str = "ok") -> None:
+        """
+        작업 종료 - 결과를 기록하고 현재 작업 해제.
+        complete()/fail()로 결과를 정하지 않았으면 핸들러 상태(ok/error)로 결정합니다.
+        """
+        if job is None or job.finished_at is not None:
+            return
+        if job.status == "running":
+            if status == "ok":
+                job.status = "success"
+            else:
+                job.fail(status)
+        job._duration = time.perf_counter() - job._started
+        job.finished_at = _utcnow()
+        with self._lock:
+            self._active.pop(job.job_id, None)
+        try:
+            _CURRENT.reset(job._token)
+        except ValueError:
+            _CURRENT.set(None)
+        self._save(job)
+        logger.info(
+            f"🗂️ 작업 기록 [{job.job_type}] {job.request_id}: {job.status}, {job.duration:.2f}초, "
+            f"{job.records}건, 단계 {len(job.stage_totals)}개"
+        )
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def active(self) -> List[Dict[str, Any]]:
+        """진행 중인 작업 (현재까지의 단계 기록 포함)"""
+        with self._lock:
+            jobs = list(self._active.values())
+        return [_public(job.to_document()) for job in jobs]
+
+    def recent(self, job_type: Optional[str] = None, status: Optional[str] = None,
+               request_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 작업 (시작 시각 역순)"""
+        query: Dict[str, Any] = {}
+        if job_type:
+            query["job_type"] = job_type
+        if status:
+            query["status"] = status
+        if request_id:
+            query["request_id"] = request_id
+        cursor = self._collection().find(query).sort("started_at", -1).limit(max(1, limit))
+        return [_public(doc) for doc in cursor]
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._collection().find_one({"_id": job_id})
+        return _public(doc) if doc else None
+
+    def last(self, job_type: str) -> Optional[Dict[str, Any]]:
+        """작업 유형의 마지막 종료 작업 (단계 기록 제외)"""
+        doc = self._collection().find_one(
+            {"job_type": job_type, "finished_at": {"$ne": None}}, {"stages": 0}, sort=[("finished_at", -1)]
+        )
+        return _public(doc) if doc else None
+
+    def stats(self, window_hours: float = 24, job_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        작업 유형별 건수/성공·실패 수/p50·p95·최대 소요 시간과 단계별 p50·p95
+        (유형별 최근 JOB_STATS_MAX_SAMPLES개 종료 작업 기준)
+        """
+        since = _utcnow() - timedelta(hours=window_hours)
+        query: Dict[str, Any] = {"finished_at": {"$gte": since}}
+        job_types = [job_type] if job_type else self._collection().distinct("job_type", query)
+
+        result = {}
+        for name in job_types:
+            docs = list(self._collection().find(
+                {**query, "job_type": name},
+                {"status": 1, "duration": 1, "records": 1, "stage_totals": 1}
+            ).sort("finished_at", -1).limit(settings.JOB_STATS_MAX_SAMPLES))
+            if not docs:
+                continue
+            durations = [d.get("duration") or 0.0 for d in docs]
+            stage_durations: Dict[str, List[float]] = {}
+            for doc in docs:
+                for stage, total in (doc.get("stage_totals") or {}).items():
+                    stage_durations.setdefault(stage, []).append(total.get("duration", 0.0))
+            result[name] = {
+                "count": len(docs),
+                "success": sum(1 for d in docs if d.get("status") == "success"),
+                "failed": sum(1 for d in docs if d.get("status") == "failed"),
+                **_percentiles(durations),
+                "records_avg": round(float(np.mean([d.get("records") or 0 for d in docs])), 1),
+                "stages": {stage: _percentiles(values) for stage, values in sorted(stage_durations.items())}
+            }
+        return {"window_hours": window_hours, "job_types": result}
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    array = np.asarray(values, dtype=float)
+    return {
+        "p50": round(float(np.percentile(array, 50)), 3),
+        "p95": round(float(np.percentile(array, 95)), 3),
+        "max": round(float(array.max()), 3)
+    }
+
+
+def _public(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """API 응답용 (_id → job_id, 만료 시각 제외)"""
+    doc = dict(doc)
+    doc["job_id"] = doc.pop("_id")
+    doc.pop("expires_at", None)
+    return doc
+
+
+job_registry = JobRegistry()
+
+
+def current_job() -> Optional[JobRun]:
+    return _CURRENT.get()
+
+
+def add_records(count: int) -> None:
+    """현재 작업의 처리 건수 추가 (작업 밖이면 무시)"""
+    job = _CURRENT.get()
+    if job is not None and count:
+        job.add(records=count)
+
+
+def add_bytes(count: int) -> None:
+    """현재 작업이 외부에서 받은 응답 크기 추가 (작업 밖이면 무시)"""
+    job = _CURRENT.get()
+    if job is not None and count:
+        job.add(bytes=count)
+
+
+@contextmanager
+def stage(name: str):
+    """현재 작업의 단계 시간 기록 (작업 밖이면 아무것도 하지 않음)"""
+    job = _CURRENT.get()
+    if job is None:
+        yield
+        return
+    started_at = _utcnow()
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        job.record_stage(name, started_at, time.perf_counter() - started, status)
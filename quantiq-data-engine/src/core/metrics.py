@@ -0,0 +1,352 @@
+"""
+Metrics - 프로세스 내 메트릭 레지스트리 (Prometheus text exposition format)
+
+Counter / Gauge / Histogram을 라벨별로 모으고 GET /metrics에서 text format 0.0.4로 내보냅니다.
+외부 의존성 없이 prometheus_client와 같은 사용 방식을 따릅니다.
+
+    KAFKA_HANDLER_SECONDS.labels(topic="analysis.combined.request", status="success").observe(12.3)
+
+    with EXTERNAL_API_SECONDS.labels(service="fred", operation="observations").time():
+        ...
+
+    with external_call("alphavantage", "market") as call:
+        ...
+        call.status = "rate_limited"
+
+공통 메트릭(Kafka 핸들러, 외부 API, Mongo 명령, 이벤트 발행, 분석 단계, Slack)은 이 모듈에 정의해
+한 곳에서 목록을 볼 수 있게 합니다. 스크레이프 시점에 값을 채워야 하는 게이지(큐 길이 등)는
+add_collect_hook()으로 등록합니다.
+"""
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from src.core import jobs, tracing
+
+logger = logging.getLogger(__name__)
+
+# 초 단위 기본 버킷 (Mongo 명령 수 ms ~ 분석 단계 수 분)
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 180.0, 600.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """라벨 조합별 child를 갖는 메트릭 기본 클래스"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[n] for n in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        """라벨 없는 메트릭의 child"""
+        return self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _render_child(self, labels: Tuple[str, ...], child) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = list(self._children.items())
+        for labels, child in sorted(children):
+            lines.extend(self._render_child(labels, child))
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def _render_child(self, labels, child):
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(child.value)}"]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+
+class _HistogramChild:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def _render_child(self, labels, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, ('le', _format_value(bound)))} {cumulative}")
+        lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, ('le', '+Inf'))} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """메트릭 이름 → 메트릭 (같은 이름으로 다시 등록하면 기존 메트릭 반환)"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._hooks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different type/labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def add_collect_hook(self, hook: Callable[[], None]) -> None:
+        """render() 직전에 호출할 함수 (스크레이프 시점 게이지 갱신용)"""
+        with self._lock:
+            self._hooks.append(hook)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        with self._lock:
+            hooks = list(self._hooks)
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.warning(f"메트릭 수집 hook 실패: {e}")
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ============================================================================
+# 공통 메트릭
+# ============================================================================
+
+KAFKA_MESSAGES = counter(
+    "quantiq_kafka_messages_total", "Kafka request messages consumed", ("topic",))
+KAFKA_HANDLER_SECONDS = histogram(
+    "quantiq_kafka_handler_duration_seconds", "Kafka request handler latency", ("topic", "status"))
+KAFKA_CONSUMER_LAG = gauge(
+    "quantiq_kafka_consumer_lag", "Messages behind the partition high watermark after the last consumed message", ("topic", "partition"))
+
+EXTERNAL_API_SECONDS = histogram(
+    "quantiq_external_api_duration_seconds", "External API call latency", ("service", "operation", "status"))
+
+MONGO_COMMAND_SECONDS = histogram(
+    "quantiq_mongo_command_duration_seconds", "MongoDB command latency", ("command", "collection", "status"))
+
+EVENTS_PUBLISHED = counter(
+    "quantiq_events_published_total", "Events produced to Kafka", ("topic", "status"))
+EVENT_DELIVERIES = counter(
+    "quantiq_event_deliveries_total", "Kafka delivery reports", ("topic", "status"))
+
+ANALYSIS_STAGE_SECONDS = histogram(
+    "quantiq_analysis_stage_duration_seconds", "Analysis/collection stage latency", ("analysis", "stage"))
+
+SLACK_MESSAGES = counter(
+    "quantiq_slack_messages_total", "Slack notifier queue outcomes", ("outcome",))
+SLACK_QUEUE_DEPTH = gauge(
+    "quantiq_slack_queue_depth", "Slack messages waiting to be sent")
+
+
+class _CallStatus:
+    def __init__(self):
+        self.status = "ok"
+        self.bytes = 0  # 응답 크기 (현재 작업의 bytes에 합산)
+
+
+@contextmanager
+def external_call(service: str, operation: str):
+    """
+    외부 API 호출 시간 측정 (client span도 함께 기록). 예외가 나면 status="error",
+    호출 제한 등은 블록 안에서 call.status를 바꿔 기록합니다.
+    """
+    call = _CallStatus()
+    started = time.perf_counter()
+    with tracing.start_span(f"{service} {operation}", kind="client", attributes={"peer.service": service}) as span:
+        try:
+            yield call
+        except Exception:
+            call.status = "error"
+            raise
+        finally:
+            span.set_attribute("quantiq.call.status", call.status)
+            span.set_attribute("quantiq.response_bytes", call.bytes or None)
+            jobs.add_bytes(call.bytes)
+            if call.status != "ok":
+                span.set_status("ERROR", call.status)
+            EXTERNAL_API_SECONDS.labels(service=service, operation=operation, status=call.status).observe(time.perf_counter() - started)
+
+
+@contextmanager
+def stage_timer(analysis: str, stage: str):
+    """분석/수집 단계 소요 시간 측정 context manager (단계 span과 현재 작업의 단계 기록도 함께 남김)"""
+    with tracing.start_span(f"{analysis}.{stage}", attributes={"quantiq.analysis": analysis}):
+        with jobs.stage(f"{analysis}.{stage}"):
+            with ANALYSIS_STAGE_SECONDS.labels(analysis=analysis, stage=stage).time():
+                yield
+
+
+# ============================================================================
+# MongoDB command monitoring
+# ============================================================================
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo 명령 이벤트 → MONGO_COMMAND_SECONDS (MongoClient(event_listeners=[...])로 등록)"""
+
+    def __init__(self):
+        self._collections: Dict[Tuple[int, object], str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if isinstance(target, str):
+            return target
+        # getMore는 커서 ID 대신 collection 필드에 컬렉션 이름이 있음
+        return str(event.command.get("collection", ""))
+
+    def started(self, event):
+        with self._lock:
+            self._collections[(event.request_id, event.connection_id)] = self._collection(event)
+
+    def _finish(self, event, status):
+        with self._lock:
+            collection = self._collections.pop((event.request_id, event.connection_id), "")
+        MONGO_COMMAND_SECONDS.labels(
+            command=event.command_name, collection=collection, status=status
+        ).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
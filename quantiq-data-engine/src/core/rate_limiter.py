@@ -0,0 +1,173 @@
+"""
+Rate Limiter - 외부 API 호출 한도를 지키는 토큰 버킷
+
+분당 한도(토큰 버킷)와 일일 한도(날짜별 카운터)를 함께 적용합니다.
+여러 스레드가 acquire()로 토큰을 받아 한도 안에서 동시에 호출할 수 있고,
+API가 호출 제한 응답을 돌려주면 on_rate_limited()로 속도를 낮췄다가 성공이 이어지면 회복합니다.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DailyQuotaExceeded(Exception):
+    """일일 호출 한도 소진"""
+
+
+class TokenBucketRateLimiter:
+    """
+    분당/일일 호출 한도 토큰 버킷 (thread-safe)
+
+    Args:
+        name: 로그용 이름
+        calls_per_minute: 분당 호출 수 (토큰 보충 속도)
+        calls_per_day: 일일 호출 수 (0 = 무제한)
+        burst: 버킷 크기 (한 번에 연속 호출 가능한 수, 기본 = 분당 한도)
+        min_rate_ratio: 호출 제한 응답 시 낮출 수 있는 최저 속도 비율
+        cooldown_seconds: Retry-After가 없는 호출 제한 응답 후 멈출 시간 (분 단위 한도면 60초면 회복)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        calls_per_minute: float,
+        calls_per_day: int = 0,
+        burst: Optional[int] = None,
+        min_rate_ratio: float = 0.1,
+        cooldown_seconds: float = 60.0
+    ):
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute must be positive")
+
+        self.name = name
+        self.base_rate = calls_per_minute / 60.0  # 초당 토큰
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate * min_rate_ratio
+        self.capacity = float(burst if burst is not None else max(1, int(calls_per_minute)))
+        self.calls_per_day = calls_per_day
+        self.cooldown_seconds = cooldown_seconds
+
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._day = datetime.utcnow().strftime("%Y-%m-%d")
+        self._day_count = 0
+        self._exhausted_day = None  # API가 일일 한도 소진을 알린 날 (로컬 카운터와 무관하게 그날은 중단)
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Token Bucket
+    # ------------------------------------------------------------------
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _roll_day(self) -> None:
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        if today != self._day:
+            self._day = today
+            self._day_count = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        토큰 하나를 받을 때까지 대기합니다.
+
+        Returns:
+            토큰을 받으면 True, timeout 안에 못 받으면 False
+
+        Raises:
+            DailyQuotaExceeded: 일일 한도를 모두 사용한 경우
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._roll_day()
+                if self.calls_per_day and self._day_count >= self.calls_per_day:
+                    raise DailyQuotaExceeded(f"{self.name} daily quota ({self.calls_per_day}) exhausted")
+                if self._exhausted_day == self._day:
+                    raise DailyQuotaExceeded(f"{self.name} daily quota exhausted (reported by API)")
+
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    self._day_count += 1
+                    return True
+
+                wait = max(self._paused_until - now, (1.0 - self._tokens) / self.rate)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    # ------------------------------------------------------------------
+    # Adaptive Control
+    # ------------------------------------------------------------------
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> None:
+        """
+        API가 호출 제한을 알렸을 때 호출합니다.
+
+        속도를 절반으로 낮추고, 버킷을 비운 뒤 retry_after(없으면 cooldown_seconds)만큼 멈춥니다.
+        동시에 나간 요청들이 한꺼번에 제한 응답을 받아도 멈춘 구간 안에서는 한 번만 감속합니다.
+        """
+        with self._lock:
+            if time.monotonic() < self._paused_until:
+                return
+            self.rate = max(self.min_rate, self.rate / 2.0)
+            self._tokens = 0.0
+            self._successes = 0
+            pause = retry_after if retry_after is not None else self.cooldown_seconds
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            logger.warning(f"⏳ {self.name} 호출 제한 응답 → 분당 {self.rate * 60:.1f}회로 감속, {pause:.1f}초 대기")
+
+    def on_quota_exhausted(self) -> None:
+        """
+        API가 일일 한도 소진을 알렸을 때 호출합니다 (로컬 카운터가 놓친 경우, 다른 프로세스와 키 공유 등).
+
+        감속/재시도해도 회복되지 않으므로 그날 남은 acquire()는 모두 DailyQuotaExceeded를 발생시킵니다.
+        """
+        with self._lock:
+            self._roll_day()
+            self._exhausted_day = self._day
+        logger.warning(f"🛑 {self.name} 일일 한도 소진 응답 → 오늘 남은 호출 중단")
+
+    def on_success(self) -> None:
+        """성공 응답. 감속 상태면 성공이 이어질 때 조금씩 원래 속도로 회복합니다."""
+        with self._lock:
+            if self.rate >= self.base_rate:
+                return
+            self._successes += 1
+            if self._successes >= 5:
+                self.rate = min(self.base_rate, self.rate * 1.25)
+                self._successes = 0
+
+    # ------------------------------------------------------------------
+    # Estimates
+    # ------------------------------------------------------------------
+
+    @property
+    def remaining_today(self) -> Optional[int]:
+        """오늘 남은 호출 수 (무제한이면 None)"""
+        with self._lock:
+            self._roll_day()
+            if self._exhausted_day == self._day:
+                return 0
+            return max(0, self.calls_per_day - self._day_count) if self.calls_per_day else None
+
+    def estimate_seconds(self, calls: int) -> float:
+        """calls번 호출을 마치는 데 걸리는 최소 시간 (현재 버킷 잔량과 속도 기준)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            pending = max(0.0, calls - self._tokens)
+            return max(0.0, self._paused_until - now) + pending / self.rate
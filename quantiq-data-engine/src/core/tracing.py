@@ -0,0 +1,456 @@
+"""
+Tracing - W3C Trace Context 기반 분산 추적 (OpenTelemetry 호환 span)
+
+Kafka 요청 하나가 Mongo 명령, 외부 API 호출, 발행 이벤트로 어떻게 퍼지는지 span 트리로 기록합니다.
+
+    with start_span("analysis.combined.request process", kind="consumer", parent=extract(msg.headers())) as span:
+        span.set_attribute("quantiq.request_id", request_id)
+        ...
+
+연결 지점:
+- 컨슈머 span: 메시지 headers(없으면 본문 BaseEvent.traceparent)의 traceparent를 부모로 시작
+- 외부 API / 분석 단계: src/core/metrics의 external_call(), stage_timer()가 span도 함께 기록
+- Mongo 명령: MongoCommandTracing 리스너 (진행 중인 span이 있을 때만 자식 span 기록)
+- 이벤트 발행: producer span의 traceparent를 Kafka header와 BaseEvent.traceparent에 담음
+
+현재 span은 contextvars로 전달되므로 스레드 풀에 넘기는 함수는 wrap()으로 감쌉니다
+(진행 중인 작업 기록(src/core/jobs) 등 다른 context 값도 함께 전달).
+TRACING_ENABLED=false면 span을 기록하지 않지만 받은 traceparent는 발행 이벤트에 그대로 전달되어
+quantiq-core 쪽 trace가 끊기지 않습니다.
+
+Span은 OpenTelemetry span 필드 이름(traceId, spanId, parentSpanId, startTimeUnixNano ...)으로
+TRACING_EXPORTER(console | file)에 내보냅니다. file은 한 줄에 span 하나(JSON Lines)입니다.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "quantiq-data-engine"
+TRACEPARENT_HEADER = "traceparent"
+TRACESTATE_HEADER = "tracestate"
+
+_TRACEPARENT_PATTERN = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+SPAN_KINDS = {
+    "internal": "SPAN_KIND_INTERNAL",
+    "server": "SPAN_KIND_SERVER",
+    "client": "SPAN_KIND_CLIENT",
+    "producer": "SPAN_KIND_PRODUCER",
+    "consumer": "SPAN_KIND_CONSUMER",
+}
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """전파되는 trace 식별자 (traceparent 한 줄)"""
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+    is_remote: bool = False
+    tracestate: Optional[str] = None
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: Any, tracestate: Optional[str] = None) -> Optional[SpanContext]:
+    """traceparent 문자열 → SpanContext (형식이 틀리면 None)"""
+    if isinstance(value, bytes):
+        value = value.decode("utf-8", errors="ignore")
+    if not isinstance(value, str):
+        return None
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match:
+        return None
+    version, trace_id, span_id, flags, rest = match.groups()
+    # ff는 금지된 버전, 00 버전은 뒤에 추가 필드가 없어야 함
+    if version == "ff" or (version == "00" and rest):
+        return None
+    if trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return SpanContext(trace_id, span_id, sampled=bool(int(flags, 16) & 0x01), is_remote=True, tracestate=tracestate)
+
+
+def _new_id(bits: int) -> str:
+    value = 0
+    while not value:
+        value = random.getrandbits(bits)
+    return f"{value:0{bits // 4}x}"
+
+
+def _should_sample(trace_id: str) -> bool:
+    """새 trace 샘플링 (trace_id 기준이라 같은 trace는 항상 같은 결정)"""
+    ratio = settings.TRACING_SAMPLE_RATIO
+    if ratio >= 1.0:
+        return True
+    if ratio <= 0.0:
+        return False
+    return int(trace_id[-8:], 16) < ratio * 0xFFFFFFFF
+
+
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar("quantiq_current_span", default=None)
+
+
+class Span:
+    """
+    기록되는 span. with 블록으로 쓰면 현재 span으로 설정되고 블록이 끝날 때 종료/내보내기됩니다.
+    블록 안에서 예외가 나면 exception 이벤트와 ERROR 상태를 남깁니다.
+    """
+
+    recording = True
+
+    def __init__(self, name: str, context: SpanContext, parent: Optional[SpanContext], kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.context = context
+        self.parent = parent
+        self.kind = kind
+        self.attributes: Dict[str, Any] = {k: v for k, v in (attributes or {}).items() if v is not None}
+        self.events: List[Dict[str, Any]] = []
+        self.status = "UNSET"
+        self.status_message: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self._token = None
+
+    def traceparent(self) -> Optional[str]:
+        return self.context.traceparent() if self.context else None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if value is not None:
+            self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "timeUnixNano": time.time_ns(), "attributes": attributes or {}})
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.status_message = message
+
+    def record_exception(self, error: BaseException) -> None:
+        self.add_event("exception", {"exception.type": type(error).__name__, "exception.message": str(error)[:500]})
+        self.set_status("ERROR", str(error)[:200])
+
+    def activate(self) -> "Span":
+        """현재 span으로 설정 (end()에서 이전 span으로 되돌림)"""
+        self._token = _CURRENT.set(self)
+        return self
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self._token is not None:
+            try:
+                _CURRENT.reset(self._token)
+            except ValueError:
+                # 다른 context(스레드)에서 종료된 경우 - 현재 span만 되돌림
+                _CURRENT.set(None)
+            self._token = None
+        if self.recording and self.context.sampled:
+            _export(self)
+
+    def __enter__(self) -> "Span":
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self.record_exception(exc)
+        self.end()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OpenTelemetry span 필드 이름의 JSON 직렬화 형태"""
+        return {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else None,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, SPAN_KINDS["internal"]),
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": f"STATUS_CODE_{self.status}", "message": self.status_message},
+            "resource": {"service.name": SERVICE_NAME},
+        }
+
+
+class NonRecordingSpan(Span):
+    """
+    기록하지 않는 span (추적 비활성/미샘플링).
+    부모 context를 그대로 갖고 있어 발행 이벤트에는 받은 traceparent가 전달됩니다.
+    """
+
+    recording = False
+
+    def __init__(self, context: Optional[SpanContext]):
+        self.name = ""
+        self.context = context
+        self.parent = None
+        self.kind = "internal"
+        self.attributes = {}
+        self.events = []
+        self.status = "UNSET"
+        self.status_message = None
+        self.start_ns = 0
+        self.end_ns = None
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def set_status(self, status: str, message: Optional[str] = None) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+
+def current_span() -> Optional[Span]:
+    return _CURRENT.get()
+
+
+def current_context() -> Optional[SpanContext]:
+    span = _CURRENT.get()
+    return span.context if span is not None else None
+
+
+def current_traceparent() -> Optional[str]:
+    context = current_context()
+    return context.traceparent() if context else None
+
+
+def start_span(name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None,
+               parent: Optional[SpanContext] = None) -> Span:
+    """
+    span 생성 (현재 span으로 설정하려면 with 블록이나 activate() 사용)
+
+    Args:
+        parent: 부모 context (없으면 현재 span, 현재 span도 없으면 새 trace)
+    """
+    if parent is None:
+        parent = current_context()
+    if not settings.TRACING_ENABLED:
+        return NonRecordingSpan(parent)
+
+    if parent is not None:
+        context = SpanContext(parent.trace_id, _new_id(64), sampled=parent.sampled, tracestate=parent.tracestate)
+    else:
+        trace_id = _new_id(128)
+        context = SpanContext(trace_id, _new_id(64), sampled=_should_sample(trace_id))
+    if not context.sampled:
+        return NonRecordingSpan(context)
+    return Span(name, context, parent, kind, attributes)
+
+
+@contextmanager
+def use_context(context: Optional[SpanContext]):
+    """다른 스레드에서 넘겨받은 context를 현재 부모로 사용 (span은 기록하지 않음)"""
+    token = _CURRENT.set(NonRecordingSpan(context) if context is not None else None)
+    try:
+        yield
+    finally:
+        _CURRENT.reset(token)
+
+
+def wrap(fn: Callable) -> Callable:
+    """
+    현재 context(현재 span, 진행 중인 작업 등)를 유지한 채 다른 스레드에서 실행할 함수
+    (ThreadPoolExecutor.submit/map용)
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        # 같은 Context는 여러 스레드에서 동시에 실행할 수 없으므로 호출마다 복사
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def inject_headers(headers: Optional[List[Tuple[str, bytes]]] = None) -> List[Tuple[str, bytes]]:
+    """현재 context를 Kafka 메시지 headers에 추가"""
+    headers = list(headers or [])
+    context = current_context()
+    if context is not None:
+        headers.append((TRACEPARENT_HEADER, context.traceparent().encode("utf-8")))
+        if context.tracestate:
+            headers.append((TRACESTATE_HEADER, context.tracestate.encode("utf-8")))
+    return headers
+
+
+def extract(headers: Optional[List[Tuple[str, Any]]] = None, body: Optional[Dict[str, Any]] = None) -> Optional[SpanContext]:
+    """Kafka headers의 traceparent (없으면 메시지 본문의 traceparent 필드) → 부모 context"""
+    values = {}
+    for key, value in headers or []:
+        if key and key.lower() in (TRACEPARENT_HEADER, TRACESTATE_HEADER) and value is not None:
+            values[key.lower()] = value.decode("utf-8", errors="ignore") if isinstance(value, bytes) else str(value)
+    if TRACEPARENT_HEADER not in values and isinstance(body, dict):
+        for key in (TRACEPARENT_HEADER, TRACESTATE_HEADER):
+            if body.get(key):
+                values[key] = body[key]
+    return parse_traceparent(values.get(TRACEPARENT_HEADER), values.get(TRACESTATE_HEADER))
+
+
+# ============================================================================
+# Exporters
+# ============================================================================
+
+EXPORTERS: Dict[str, type] = {}
+
+
+def register_exporter(name: str):
+    """TRACING_EXPORTER 값으로 선택할 exporter 등록"""
+    def decorator(cls):
+        EXPORTERS[name] = cls
+        return cls
+    return decorator
+
+
+class SpanExporter:
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+
+@register_exporter("console")
+class ConsoleSpanExporter(SpanExporter):
+    """span 한 개당 로그 한 줄"""
+
+    def export(self, span: Span) -> None:
+        logger.info(f"🔭 {json.dumps(span.to_dict(), default=str, ensure_ascii=False)}")
+
+
+@register_exporter("file")
+class FileSpanExporter(SpanExporter):
+    """
+    JSON Lines 파일 exporter (TRACING_FILE_PATH).
+    버퍼에 쓰고 로컬 루트 span(컨슈머 span 등)이 끝날 때 flush합니다.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.TRACING_FILE_PATH
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            self._file.write(line + "\n")
+            if span.parent is None or span.parent.is_remote:
+                self._file.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+
+_exporter: Optional[SpanExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                exporter_cls = EXPORTERS.get(settings.TRACING_EXPORTER)
+                if exporter_cls is None:
+                    logger.warning(f"알 수 없는 TRACING_EXPORTER: {settings.TRACING_EXPORTER} (console 사용)")
+                    exporter_cls = ConsoleSpanExporter
+                _exporter = exporter_cls()
+    return _exporter
+
+
+def set_exporter(exporter: Optional[SpanExporter]) -> None:
+    """exporter 교체 (None이면 다음 export 때 설정값으로 다시 생성)"""
+    global _exporter
+    with _exporter_lock:
+        _exporter = exporter
+
+
+def _export(span: Span) -> None:
+    try:
+        get_exporter().export(span)
+    except Exception as e:
+        logger.warning(f"Span 내보내기 실패: {e}")
+
+
+def shutdown() -> None:
+    """버퍼에 남은 span 기록"""
+    if _exporter is not None:
+        _exporter.flush()
+
+
+# ============================================================================
+# MongoDB command tracing
+# ============================================================================
+
+class MongoCommandTracing(monitoring.CommandListener):
+    """
+    pymongo 명령 이벤트 → 현재 span의 자식 span (MongoClient(event_listeners=[...])로 등록).
+    요청 밖(백그라운드 갱신 등)의 명령은 루트 trace를 만들지 않도록 기록하지 않습니다.
+    """
+
+    def __init__(self):
+        self._spans: Dict[Tuple[int, object], Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = _CURRENT.get()
+        if parent is None or not parent.recording:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else event.command.get("collection")
+        span = start_span(f"mongodb {event.command_name}", kind="client", parent=parent.context, attributes={
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "db.mongodb.collection": collection,
+        })
+        with self._lock:
+            self._spans[(event.request_id, event.connection_id)] = span
+
+    def _finish(self, event, error: Optional[str] = None):
+        with self._lock:
+            span = self._spans.pop((event.request_id, event.connection_id), None)
+        if span is None:
+            return
+        if error:
+            span.set_status("ERROR", error[:200])
+        span.end()
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event, str(event.failure))
@@ -7,7 +7,10 @@ Kafka로 이벤트를 발행하는 범용 서비스입니다.
 from confluent_kafka import Producer
 import json
 import logging
+from typing import Optional
+from src.core import tracing
 from src.core.config import settings
+from src.core.metrics import EVENT_DELIVERIES, EVENTS_PUBLISHED
 from src.events.schema import BaseEvent
 
 logger = logging.getLogger(__name__)
@@ -48,42 +51,62 @@ class EventPublisher:
     @classmethod
     def delivery_report(cls, err, msg):
         """메시지 전송 결과 콜백"""
+        EVENT_DELIVERIES.labels(topic=msg.topic(), status="error" if err is not None else "ok").inc()
         if err is not None:
             logger.error(f'❌ Message delivery failed: {err}')
         else:
             logger.info(f'✅ Message delivered to {msg.topic()} [{msg.partition()}]')
 
     @classmethod
-    def publish(cls, topic: str, event: BaseEvent):
+    def publish(cls, topic: str, event: BaseEvent, flush: bool = True, key: Optional[str] = None):
         """
         이벤트를 Kafka 토픽에 발행합니다
 
         Args:
             topic: Kafka 토픽명
             event: 발행할 이벤트 (BaseEvent)
+            flush: False면 전송 완료를 기다리지 않음 (고빈도 발행 시 linger.ms 배치 전송 사용)
+            key: 메시지 키 (같은 키의 이벤트는 같은 파티션에 순서대로 저장)
         """
-        try:
-            p = cls.get_producer()
-            message = json.dumps(event.to_dict()).encode('utf-8')
-
-            logger.info(f"📤 Publishing event to topic [{topic}]: eventId={event.eventId}, type={event.eventType}")
-            logger.debug(f"Event payload: {message}")
-
-            # Asynchronous produce
-            p.produce(
-                topic,
-                message,
-                callback=cls.delivery_report
-            )
-
-            # Flush to ensure delivery
-            # In high throughput scenarios, this should be managed differently
-            p.flush()
-
-        except Exception as e:
-            logger.error(f"❌ Failed to publish event to {topic}: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+        # producer span의 traceparent를 header와 이벤트 본문에 담아 소비자가 이어서 추적
+        with tracing.start_span(f"{topic} publish", kind="producer", attributes={
+            "messaging.system": "kafka",
+            "messaging.destination.name": topic,
+            "messaging.message.id": event.eventId
+        }) as span:
+            try:
+                p = cls.get_producer()
+                if event.traceparent is None:
+                    event.traceparent = span.traceparent()
+                # 분석 결과 문서의 datetime 등은 문자열로 직렬화
+                message = json.dumps(event.to_dict(), default=str).encode('utf-8')
+
+                logger.info(f"📤 Publishing event to topic [{topic}]: eventId={event.eventId}, type={event.eventType}")
+                logger.debug(f"Event payload: {message}")
+
+                # Asynchronous produce
+                p.produce(
+                    topic,
+                    message,
+                    key=key.encode('utf-8') if key else None,
+                    headers=tracing.inject_headers(),
+                    callback=cls.delivery_report
+                )
+
+                # Flush to ensure delivery
+                # 고빈도 발행은 flush=False로 배치 전송하고 poll(0)로 전송 결과 콜백만 처리
+                if flush:
+                    p.flush()
+                else:
+                    p.poll(0)
+                EVENTS_PUBLISHED.labels(topic=topic, status="ok").inc()
+
+            except Exception as e:
+                span.record_exception(e)
+                EVENTS_PUBLISHED.labels(topic=topic, status="error").inc()
+                logger.error(f"❌ Failed to publish event to {topic}: {e}")
+                import traceback
+                logger.error(traceback.format_exc())
 
     @classmethod
     def close(cls):
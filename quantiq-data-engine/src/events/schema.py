@@ -26,6 +26,8 @@ class BaseEvent:
     timestamp: str = field(default_factory=lambda: datetime.now(KST).isoformat())
     source: str = "quantiq-data-engine"
     payload: Dict[str, Any] = field(default_factory=dict)
+    # W3C traceparent (발행 시 현재 trace context, Kafka header가 없는 소비자용)
+    traceparent: Optional[str] = None
 
     def to_dict(self) -> dict:
         """딕셔너리로 변환"""
@@ -129,6 +131,21 @@ class AnalysisCompletedPayload:
     status: str
 
 
+@dataclass
+class AnalysisProgressPayload:
+    requestId: str
+    analysisType: str  # technical, technical_range, sentiment, combined
+    status: str  # started, running, partial, completed, failed
+    sequence: int  # 요청 내 이벤트 순번 (소비 측 정렬/누락 확인용)
+    stage: Optional[str] = None
+    processed: Optional[int] = None
+    total: Optional[int] = None
+    chunkIndex: Optional[int] = None
+    results: List[Dict[str, Any]] = field(default_factory=list)  # status=partial일 때 이번 청크의 결과
+    message: Optional[str] = None
+    final: bool = False  # completed/failed 마커
+
+
 @dataclass
 class AnalysisRecommendationGeneratedPayload:
     symbol: str
@@ -202,6 +219,7 @@ class EventTopics:
     # Analysis
     ANALYSIS_REQUEST = "quantiq.analysis.request"
     ANALYSIS_COMPLETED = "quantiq.analysis.completed"
+    ANALYSIS_PROGRESS = "quantiq.analysis.progress"
     ANALYSIS_RECOMMENDATION_GENERATED = "quantiq.analysis.recommendation.generated"
     ANALYSIS_PREDICTION_COMPLETED = "quantiq.analysis.prediction.completed"
 
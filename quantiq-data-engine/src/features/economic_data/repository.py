@@ -1,7 +1,10 @@
 """Economic Data Repository - MongoDB 데이터 접근"""
+import hashlib
+import json
 import logging
 from typing import Dict, Any, List
 from datetime import datetime
+from pymongo import UpdateOne
 from src.core.database import MongoDB
 
 logger = logging.getLogger(__name__)
@@ -96,6 +99,7 @@ class EconomicDataRepository:
             update_data = {
                 "$set": {
                     **data,
+                    "content_hash": self.content_hash(data),
                     "updated_at": datetime.now()
                 }
             }
@@ -111,3 +115,69 @@ class EconomicDataRepository:
         except Exception as e:
             logger.error(f"Daily data upsert 실패 (date={date}): {e}")
             return False
+
+    @staticmethod
+    def content_hash(data: Dict[str, Any]) -> str:
+        """날짜 파티션 데이터의 내용 해시 (키 순서와 무관)"""
+        canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def upsert_daily_data_batch(self, daily_data: Dict[str, Dict[str, Any]], chunk_size: int = 500) -> Dict[str, int]:
+        """
+        daily_stock_data에 여러 날짜를 일괄 upsert하되, 내용이 바뀌지 않은 날짜는 쓰지 않습니다.
+
+        날짜별 content_hash를 저장된 값과 비교해 같으면 쓰기를 생략하므로
+        365일 재수집 시에도 실제로 바뀐 날짜만 oplog에 기록됩니다.
+
+        Args:
+            daily_data: {date: {"fred_indicators": ..., "yfinance_indicators": ..., "stocks": ...}}
+            chunk_size: bulk_write 1회당 최대 연산 수
+
+        Returns:
+            {"written": 쓴 날짜 수, "skipped": 생략한 날짜 수, "failed": 실패한 날짜 수}
+        """
+        stats = {"written": 0, "skipped": 0, "failed": 0}
+        if not daily_data:
+            return stats
+
+        if self.db is None:
+            logger.error("MongoDB 연결 없음")
+            stats["failed"] = len(daily_data)
+            return stats
+
+        collection = self.db["daily_stock_data"]
+        dates = list(daily_data.keys())
+
+        try:
+            stored_hashes = {
+                doc["date"]: doc.get("content_hash")
+                for doc in collection.find({"date": {"$in": dates}}, {"_id": 0, "date": 1, "content_hash": 1})
+            }
+        except Exception as e:
+            logger.error(f"저장된 content_hash 조회 실패: {e}")
+            stored_hashes = {}
+
+        now = datetime.now()
+        operations = []
+        for date in dates:
+            data = daily_data[date]
+            digest = self.content_hash(data)
+            if stored_hashes.get(date) == digest:
+                stats["skipped"] += 1
+                continue
+            operations.append(UpdateOne(
+                {"date": date},
+                {"$set": {**data, "content_hash": digest, "updated_at": now}},
+                upsert=True
+            ))
+
+        for i in range(0, len(operations), chunk_size):
+            chunk = operations[i:i + chunk_size]
+            try:
+                collection.bulk_write(chunk, ordered=False)
+                stats["written"] += len(chunk)
+            except Exception as e:
+                logger.error(f"Daily data bulk upsert 실패 ({len(chunk)}건): {e}")
+                stats["failed"] += len(chunk)
+
+        return stats
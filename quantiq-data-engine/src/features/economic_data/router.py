@@ -4,6 +4,8 @@ from datetime import datetime
 from fastapi import APIRouter
 from pytz import timezone
 
+from src.core.config import settings
+from src.core.jobs import job_registry
 from .schemas import StatusResponse
 
 logger = logging.getLogger(__name__)
@@ -14,12 +16,25 @@ router = APIRouter(prefix="/api/economic", tags=["economic"])
 
 @router.get("/status", response_model=StatusResponse)
 def get_economic_data_status():
-    """경제 데이터 수집 상태 조회 (Read-Only)"""
+    """경제 데이터 수집 상태 조회 (Read-Only) - 진행 중/마지막 수집 작업과 최근 24시간 통계"""
+    job_type = settings.KAFKA_TOPIC_ECONOMIC_DATA_UPDATE_REQUEST
+    active_jobs = [j for j in job_registry.active() if j["job_type"] == job_type]
+    last_job = None
+    stats = None
+    try:
+        last_job = job_registry.last(job_type)
+        stats = job_registry.stats(window_hours=24, job_type=job_type)["job_types"].get(job_type)
+    except Exception as e:
+        logger.warning(f"경제 데이터 수집 작업 기록 조회 실패: {e}")
+
     return StatusResponse(
         service="economic-data-collector",
-        status="running",
+        status="collecting" if active_jobs else "running",
         timestamp=datetime.now(KST).isoformat(),
         supported_triggers=[
             "Kafka Topic: economic.data.update.request"
-        ]
+        ],
+        active_jobs=len(active_jobs),
+        last_job=last_job,
+        stats=stats
     )
@@ -1,4 +1,6 @@
 """Economic Data Pydantic Schemas (Read-Only API)"""
+from typing import Any, Optional
+
 from pydantic import BaseModel
 
 
@@ -8,3 +10,6 @@ class StatusResponse(BaseModel):
     status: str
     timestamp: str
     supported_triggers: list[str]
+    active_jobs: int = 0
+    last_job: Optional[dict[str, Any]] = None  # 마지막으로 끝난 수집 작업 (job_runs)
+    stats: Optional[dict[str, Any]] = None  # 최근 24시간 건수/성공·실패/p50·p95
@@ -3,12 +3,16 @@ import logging
 import requests
 import yfinance as yf
 import pandas as pd
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from collections import defaultdict
 
 from .repository import EconomicDataRepository
 from src.core.config import settings
+from src.core.jobs import add_records
+from src.core.metrics import external_call, stage_timer
+from src.services.error_digest import ErrorDigest
 
 logger = logging.getLogger(__name__)
 
@@ -19,14 +23,16 @@ class EconomicDataService:
     def __init__(self):
         self.repository = EconomicDataRepository()
 
-    def collect_economic_data(self, target_date: str = None) -> Dict[str, Any]:
+    def collect_economic_data(self, target_date: str = None, errors: Optional[ErrorDigest] = None) -> Dict[str, Any]:
         """
         경제 데이터를 수집하여 daily_stock_data에 저장합니다.
         날짜별로 fred_indicators와 yfinance_indicators를 통합하여 저장합니다.
 
         Args:
             target_date: 수집할 기준 날짜 (YYYY-MM-DD). 미입력 시 당일 기준으로 조회
+            errors: 지표/종목별 수집 오류를 모을 digest (결과의 "errors"에 요약 포함)
         """
+        errors = errors if errors is not None else ErrorDigest("economic_data")
         try:
             # 기준 날짜 설정
             if target_date:
@@ -59,43 +65,54 @@ class EconomicDataService:
             })
 
             # FRED 데이터 수집 (날짜별로 그룹화)
-            fred_count = self._collect_fred_data_grouped(
-                fred_indicators, start_date_str, end_date_str, daily_data
-            )
+            with stage_timer("economic_data", "fred"):
+                fred_count = self._collect_fred_data_grouped(
+                    fred_indicators, start_date_str, end_date_str, daily_data, errors
+                )
 
             # Yahoo Finance 데이터 수집 (날짜별로 그룹화)
-            yahoo_count = self._collect_yahoo_data_grouped(
-                yfinance_indicators, start_date_str, end_date_str, daily_data
-            )
+            with stage_timer("economic_data", "yahoo"):
+                yahoo_count = self._collect_yahoo_data_grouped(
+                    yfinance_indicators, start_date_str, end_date_str, daily_data, errors
+                )
 
             # 개별 종목 데이터 수집 (날짜별로 그룹화)
-            stocks_count = self._collect_individual_stocks(
-                start_date_str, end_date_str, daily_data
+            with stage_timer("economic_data", "stocks"):
+                stocks_count = self._collect_individual_stocks(
+                    start_date_str, end_date_str, daily_data, errors
+                )
+
+            # daily_stock_data에 날짜별로 저장 (내용이 바뀐 날짜만 쓰기)
+            with stage_timer("economic_data", "store"):
+                write_stats = self.repository.upsert_daily_data_batch(daily_data)
+            add_records(fred_count + yahoo_count + stocks_count)
+            saved_dates = write_stats["written"] + write_stats["skipped"]
+
+            logger.info(
+                f"경제 데이터 수집 완료: FRED={fred_count}개 지표, Yahoo={yahoo_count}개 지표, Stocks={stocks_count}개 종목, "
+                f"{len(daily_data)}일치 중 쓰기 {write_stats['written']}일, 변경 없음 {write_stats['skipped']}일, 실패 {write_stats['failed']}일, "
+                f"소스 오류 {len(errors)}건"
             )
 
-            # daily_stock_data에 날짜별로 저장
-            saved_dates = 0
-            for date_str, data in daily_data.items():
-                if self.repository.upsert_daily_data(date_str, data):
-                    saved_dates += 1
-                    logger.info(f"✅ daily_stock_data 저장: {date_str} (FRED: {len(data['fred_indicators'])}, Yahoo: {len(data['yfinance_indicators'])}, Stocks: {len(data['stocks'])})")
-
-            logger.info(f"경제 데이터 수집 완료: FRED={fred_count}개 지표, Yahoo={yahoo_count}개 지표, Stocks={stocks_count}개 종목, {saved_dates}일치 저장")
-
             return {
                 "success": True,
                 "target_date": end_date_str,
                 "fred_collected": fred_count,
                 "yahoo_collected": yahoo_count,
                 "stocks_collected": stocks_count,
-                "dates_saved": saved_dates
+                "dates_saved": saved_dates,
+                "dates_written": write_stats["written"],
+                "dates_skipped": write_stats["skipped"],
+                "dates_failed": write_stats["failed"],
+                "errors": errors.summary()
             }
 
         except Exception as e:
             logger.error(f"경제 데이터 수집 실패: {e}")
             return {
                 "success": False,
-                "error": str(e)
+                "error": str(e),
+                "errors": errors.summary()
             }
 
     def _load_fred_indicators(self) -> Dict[str, str]:
@@ -127,7 +144,8 @@ class EconomicDataService:
         indicators: Dict[str, str],
         start_date: str,
         end_date: str,
-        daily_data: Dict[str, Dict]
+        daily_data: Dict[str, Dict],
+        errors: Optional[ErrorDigest] = None
     ) -> int:
         """
         FRED 데이터를 수집하여 daily_data에 날짜별로 그룹화합니다.
@@ -137,6 +155,7 @@ class EconomicDataService:
             start_date: 시작 날짜
             end_date: 종료 날짜
             daily_data: 날짜별 데이터를 저장할 딕셔너리 (참조로 전달)
+            errors: 수집 오류 digest
 
         Returns:
             성공적으로 수집한 지표 개수
@@ -145,7 +164,7 @@ class EconomicDataService:
 
         for code, name in indicators.items():
             try:
-                df = self._fetch_fred_data(code, start_date, end_date)
+                df = self._fetch_fred_data(code, start_date, end_date, errors)
 
                 if df is not None and not df.empty:
                     # 각 날짜별로 데이터를 그룹화
@@ -161,6 +180,8 @@ class EconomicDataService:
 
             except Exception as e:
                 logger.error(f"❌ FRED 데이터 수집 실패: {code} - {e}")
+                if errors is not None:
+                    errors.record("fred", code, e)
 
         return success_count
 
@@ -169,7 +190,8 @@ class EconomicDataService:
         indicators: Dict[str, str],
         start_date: str,
         end_date: str,
-        daily_data: Dict[str, Dict]
+        daily_data: Dict[str, Dict],
+        errors: Optional[ErrorDigest] = None
     ) -> int:
         """
         Yahoo Finance 데이터를 수집하여 daily_data에 날짜별로 그룹화합니다.
@@ -179,6 +201,7 @@ class EconomicDataService:
             start_date: 시작 날짜
             end_date: 종료 날짜
             daily_data: 날짜별 데이터를 저장할 딕셔너리 (참조로 전달)
+            errors: 수집 오류 digest
 
         Returns:
             성공적으로 수집한 지표 개수
@@ -187,7 +210,7 @@ class EconomicDataService:
 
         for name, ticker in indicators.items():
             try:
-                df = self._fetch_yahoo_data(ticker, start_date, end_date)
+                df = self._fetch_yahoo_data(ticker, start_date, end_date, errors, source="yahoo")
 
                 if df is not None and not df.empty:
                     # 각 날짜별로 데이터를 그룹화
@@ -203,13 +226,16 @@ class EconomicDataService:
 
             except Exception as e:
                 logger.error(f"❌ Yahoo Finance 데이터 수집 실패: {ticker} - {e}")
+                if errors is not None:
+                    errors.record("yahoo", ticker, e)
 
         return success_count
 
-    def _fetch_fred_data(self, series_id: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """FRED API에서 데이터를 가져옵니다."""
+    def _fetch_fred_data(self, series_id: str, start_date: str, end_date: str, errors: Optional[ErrorDigest] = None) -> pd.DataFrame:
+        """FRED API에서 데이터를 가져옵니다. (실패 시 errors에 기록하고 None)"""
+        started = time.monotonic()
         try:
-            url = "https://api.stlouisfed.org/fred/series/observations"
+            url = f"{settings.FRED_BASE_URL}/series/observations"
             params = {
                 "series_id": series_id,
                 "api_key": settings.FRED_API_KEY,
@@ -218,8 +244,10 @@ class EconomicDataService:
                 "observation_end": end_date
             }
 
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
+            with external_call("fred", "series/observations") as call:
+                response = requests.get(url, params=params, timeout=10)
+                response.raise_for_status()
+                call.bytes = len(response.content)
 
             data = response.json()
             observations = data.get("observations", [])
@@ -236,13 +264,23 @@ class EconomicDataService:
 
         except Exception as e:
             logger.error(f"FRED 데이터 가져오기 실패: {series_id} - {e}")
+            if errors is not None:
+                errors.record("fred", series_id, e, time.monotonic() - started)
             return None
 
-    def _fetch_yahoo_data(self, ticker: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """Yahoo Finance에서 데이터를 가져옵니다."""
+    def _fetch_yahoo_data(
+        self, ticker: str, start_date: str, end_date: str,
+        errors: Optional[ErrorDigest] = None, source: str = "yahoo"
+    ) -> pd.DataFrame:
+        """Yahoo Finance에서 데이터를 가져옵니다. (실패 시 errors에 source로 기록하고 None)"""
+        if settings.YAHOO_FINANCE_BASE_URL:
+            return self._fetch_yahoo_chart(ticker, start_date, end_date, errors, source)
+
+        started = time.monotonic()
         try:
             stock = yf.Ticker(ticker)
-            df = stock.history(start=start_date, end=end_date, interval="1d")
+            with external_call("yahoo", "history"):
+                df = stock.history(start=start_date, end=end_date, interval="1d")
 
             if df is None or df.empty:
                 return None
@@ -251,13 +289,61 @@ class EconomicDataService:
 
         except Exception as e:
             logger.error(f"Yahoo Finance 데이터 가져오기 실패: {ticker} - {e}")
+            if errors is not None:
+                errors.record(source, ticker, e, time.monotonic() - started)
+            return None
+
+    def _fetch_yahoo_chart(
+        self, ticker: str, start_date: str, end_date: str,
+        errors: Optional[ErrorDigest] = None, source: str = "yahoo"
+    ) -> pd.DataFrame:
+        """
+        Yahoo chart API(v8)를 직접 호출해 데이터를 가져옵니다.
+
+        YAHOO_FINANCE_BASE_URL이 설정된 경우(로컬 Fake 서버 등) yfinance 대신 사용하며,
+        yfinance history()와 동일한 컬럼(Open/High/Low/Close/Volume)의 DataFrame을 반환합니다.
+        """
+        started = time.monotonic()
+        try:
+            url = f"{settings.YAHOO_FINANCE_BASE_URL}/v8/finance/chart/{ticker}"
+            params = {
+                "period1": int(pd.Timestamp(start_date).timestamp()),
+                "period2": int(pd.Timestamp(end_date).timestamp()),
+                "interval": "1d"
+            }
+
+            with external_call("yahoo", "chart") as call:
+                response = requests.get(url, params=params, timeout=10)
+                response.raise_for_status()
+                call.bytes = len(response.content)
+
+            result = (response.json().get("chart", {}).get("result") or [None])[0]
+            if not result or not result.get("timestamp"):
+                return None
+
+            quote = result["indicators"]["quote"][0]
+            df = pd.DataFrame({
+                "Open": quote.get("open"),
+                "High": quote.get("high"),
+                "Low": quote.get("low"),
+                "Close": quote.get("close"),
+                "Volume": quote.get("volume")
+            }, index=pd.to_datetime(result["timestamp"], unit="s").normalize())
+
+            return df
+
+        except Exception as e:
+            logger.error(f"Yahoo chart API 데이터 가져오기 실패: {ticker} - {e}")
+            if errors is not None:
+                errors.record(source, ticker, e, time.monotonic() - started)
             return None
 
     def _collect_individual_stocks(
         self,
         start_date: str,
         end_date: str,
-        daily_data: Dict[str, Dict]
+        daily_data: Dict[str, Dict],
+        errors: Optional[ErrorDigest] = None
     ) -> int:
         """
         개별 종목 데이터를 수집하여 daily_data에 날짜별로 그룹화합니다.
@@ -266,6 +352,7 @@ class EconomicDataService:
             start_date: 시작 날짜
             end_date: 종료 날짜
             daily_data: 날짜별 데이터를 저장할 딕셔너리 (참조로 전달)
+            errors: 수집 오류 digest
 
         Returns:
             성공적으로 수집한 종목 개수
@@ -280,7 +367,7 @@ class EconomicDataService:
 
         for ticker in tickers:
             try:
-                df = self._fetch_yahoo_data(ticker, start_date, end_date)
+                df = self._fetch_yahoo_data(ticker, start_date, end_date, errors, source="stocks")
 
                 if df is not None and not df.empty:
                     # 각 날짜별로 데이터를 그룹화
@@ -289,15 +376,20 @@ class EconomicDataService:
                         close_price = float(row["Close"]) if "Close" in row and not pd.isna(row["Close"]) else None
 
                         if close_price is not None:
-                            daily_data[date_str]["stocks"][ticker] = {
-                                "close_price": close_price
-                            }
+                            stock_data = {"close_price": close_price}
+                            # 추가 지표(ATR, 스토캐스틱, 거래량 지표)용 OHLCV
+                            for column, key in (("Open", "open_price"), ("High", "high_price"), ("Low", "low_price"), ("Volume", "volume")):
+                                if column in row and not pd.isna(row[column]):
+                                    stock_data[key] = float(row[column])
+                            daily_data[date_str]["stocks"][ticker] = stock_data
 
                     success_count += 1
                     logger.info(f"✅ 종목 데이터 수집 완료: {ticker} ({len(df)}일)")
 
             except Exception as e:
                 logger.error(f"❌ 종목 데이터 수집 실패: {ticker} - {e}")
+                if errors is not None:
+                    errors.record("stocks", ticker, e)
 
         logger.info(f"📊 개별 종목 데이터 수집 완료: {success_count}/{len(tickers)}개")
         return success_count
@@ -0,0 +1 @@
+"""Jobs Feature - 처리한 요청의 실행 기록/통계 조회 (Read-Only API)"""
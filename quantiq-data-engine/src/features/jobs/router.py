@@ -0,0 +1,42 @@
+"""Jobs Router - job_runs 조회 (Read-Only Status API)"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from src.core.jobs import job_registry
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("")
+def list_jobs(
+    job_type: Optional[str] = None,
+    status: Optional[str] = None,
+    request_id: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=200)
+):
+    """최근 작업 (작업 유형 = 요청 토픽, status = running | success | failed)"""
+    return {"jobs": job_registry.recent(job_type=job_type, status=status, request_id=request_id, limit=limit)}
+
+
+@router.get("/active")
+def list_active_jobs():
+    """이 프로세스에서 진행 중인 작업 (현재까지의 단계 기록 포함)"""
+    return {"jobs": job_registry.active()}
+
+
+@router.get("/stats")
+def get_job_stats(window_hours: float = Query(default=24, gt=0, le=24 * 90), job_type: Optional[str] = None):
+    """작업 유형별 건수/성공·실패 수, 소요 시간 p50/p95/max와 단계별 p50/p95"""
+    return job_registry.stats(window_hours=window_hours, job_type=job_type)
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    job = job_registry.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
@@ -10,12 +10,18 @@ from pydantic import BaseModel
 from datetime import datetime
 from pytz import timezone
 
+from src.core.jobs import job_registry
+from src.core.metrics import stage_timer
+
 KST = timezone('Asia/Seoul')
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/ml", tags=["ML Package"])
 
+# job_runs 작업 유형 (업로드 결과/버전을 /ml/package-status에서 조회)
+UPLOAD_JOB_TYPE = "ml.package.upload"
+
 
 class PackageUploadResponse(BaseModel):
     success: bool
@@ -36,6 +42,7 @@ async def upload_package():
     logger.info("📦 GCS 패키지 업로드 요청 수신")
     logger.info("=" * 80)
 
+    job = job_registry.start(UPLOAD_JOB_TYPE)
     try:
         # upload_to_gcs.py 스크립트 경로
         script_dir = Path(__file__).parent.parent.parent / "scripts" / "utils"
@@ -54,12 +61,13 @@ async def upload_package():
 
         # 스크립트 실행
         logger.info("스크립트 실행 중...")
-        result = subprocess.run(
-            [sys.executable, str(upload_script), "--file", str(predict_script)],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5분 타임아웃
-        )
+        with stage_timer("ml_package", "upload_script"):
+            result = subprocess.run(
+                [sys.executable, str(upload_script), "--file", str(predict_script)],
+                capture_output=True,
+                text=True,
+                timeout=300  # 5분 타임아웃
+            )
 
         # 로그 출력
         if result.stdout:
@@ -106,6 +114,8 @@ async def upload_package():
         logger.info(f"버전: v{version}")
         logger.info("=" * 80)
 
+        job.set(gcs_uri=gcs_uri, version=version)
+        job.complete()
         return PackageUploadResponse(
             success=True,
             message="패키지 업로드 완료",
@@ -116,24 +126,39 @@ async def upload_package():
 
     except subprocess.TimeoutExpired:
         logger.error("❌ 스크립트 실행 타임아웃 (5분 초과)")
+        job.fail("스크립트 실행 타임아웃")
         raise HTTPException(status_code=504, detail="스크립트 실행 타임아웃")
     except FileNotFoundError as e:
         logger.error(f"❌ 파일을 찾을 수 없습니다: {e}")
+        job.fail(e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"❌ 패키지 업로드 실패: {e}")
+        job.fail(e)
         raise HTTPException(status_code=500, detail=f"패키지 업로드 실패: {str(e)}")
+    finally:
+        job_registry.finish(job)
 
 
 @router.get("/package-status")
 async def get_package_status():
     """
-    현재 GCS에 업로드된 패키지 상태 조회
+    패키지 업로드 상태 조회 (job_runs에 기록된 마지막 업로드 결과/버전)
     """
-    # TODO: GCS에서 최신 버전 정보 조회
+    uploading = any(j["job_type"] == UPLOAD_JOB_TYPE for j in job_registry.active())
+    try:
+        last_upload = job_registry.last(UPLOAD_JOB_TYPE)
+    except Exception as e:
+        logger.warning(f"패키지 업로드 기록 조회 실패: {e}")
+        last_upload = None
+
+    attributes = (last_upload or {}).get("attributes") or {}
     return {
         "service": "ml-package-manager",
-        "status": "running",
-        "message": "패키지 상태 조회 (구현 예정)",
+        "status": "uploading" if uploading else "running",
+        "message": "업로드 기록 없음" if last_upload is None else f"마지막 업로드 {last_upload['status']}",
+        "gcs_uri": attributes.get("gcs_uri"),
+        "version": attributes.get("version"),
+        "last_upload": last_upload,
         "timestamp": datetime.now(KST).isoformat()
     }
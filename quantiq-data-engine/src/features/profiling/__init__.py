@@ -0,0 +1 @@
+"""Profiling Feature - 요청 단위 CPU/메모리 프로파일링 (관리자 API)"""
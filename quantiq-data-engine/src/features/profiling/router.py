@@ -0,0 +1,80 @@
+"""Profiling Router - 프로파일러 예약/캡처 조회 (Admin API)"""
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from src.core.config import settings
+from .schemas import ArmRequest, ArmResponse
+from .service import profiling_service
+
+logger = logging.getLogger(__name__)
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(default=None)):
+    """X-Admin-Token 헤더가 ADMIN_API_TOKEN과 일치해야 함 (토큰 미설정 시 Admin API 비활성화)"""
+    if not settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (ADMIN_API_TOKEN not configured)")
+    if x_admin_token != settings.ADMIN_API_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin/profiling", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.post("/arm", response_model=ArmResponse)
+def arm_profiler(request: ArmRequest):
+    """
+    다음 messages개 Kafka 메시지(또는 request_id/topic이 일치하는 메시지) 처리 구간을 프로파일링하도록 예약
+    """
+    try:
+        session = profiling_service.arm(
+            mode=request.mode,
+            memory=request.memory,
+            messages=request.messages,
+            request_id=request.request_id,
+            topic=request.topic,
+            interval_ms=request.interval_ms
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ArmResponse(**session.__dict__)
+
+
+@router.get("/sessions")
+def list_sessions():
+    """대기 중인 예약"""
+    return {"sessions": profiling_service.sessions()}
+
+
+@router.delete("/sessions/{session_id}")
+def disarm_profiler(session_id: str):
+    """예약 취소"""
+    if profiling_service.disarm(session_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return {"session_id": session_id, "status": "disarmed"}
+
+
+@router.get("/captures")
+def list_captures(limit: int = 20):
+    """저장된 캡처 (최신순)"""
+    return {"captures": profiling_service.captures()[:limit]}
+
+
+@router.get("/captures/{capture_id}")
+def get_capture(capture_id: str):
+    meta = profiling_service.capture(capture_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Unknown capture: {capture_id}")
+    return meta
+
+
+@router.get("/captures/{capture_id}/{filename}")
+def download_capture_file(capture_id: str, filename: str):
+    """캡처 파일 다운로드 (cpu.prof는 pstats/snakeviz, cpu.folded는 flamegraph/speedscope로 열기)"""
+    path = profiling_service.capture_file(capture_id, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Unknown file: {capture_id}/{filename}")
+    media_type = "application/octet-stream" if filename.endswith(".prof") else "text/plain; charset=utf-8"
+    return FileResponse(path, media_type=media_type, filename=f"{capture_id}-{filename}")
@@ -0,0 +1,25 @@
+"""Profiling Pydantic Schemas (Admin API)"""
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ArmRequest(BaseModel):
+    """프로파일러 예약 요청 (다음 messages개 메시지, 또는 request_id 요청 처리 구간)"""
+    mode: Literal["cprofile", "sampling", "none"] = "cprofile"
+    memory: bool = False  # tracemalloc으로 처리 전/후 메모리 할당 차이 기록
+    messages: int = Field(default=1, ge=1, le=100)
+    request_id: Optional[str] = None
+    topic: Optional[str] = None
+    interval_ms: Optional[float] = Field(default=None, gt=0)  # sampling 주기 (기본 PROFILING_SAMPLE_INTERVAL_MS)
+
+
+class ArmResponse(BaseModel):
+    session_id: str
+    mode: str
+    memory: bool
+    remaining: int
+    request_id: Optional[str] = None
+    topic: Optional[str] = None
+    expires_at: str
+    captures: list[str] = []
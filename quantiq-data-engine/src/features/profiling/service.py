@@ -0,0 +1,344 @@
+"""
+Profiling Service - 실행 중인 워커의 요청 단위 CPU/메모리 프로파일링
+
+관리자 API로 프로파일러를 예약(arm)해 두면 Kafka 컨슈머 루프가 조건에 맞는 메시지를 처리하는 동안만
+프로파일러를 켜고, 결과를 PROFILING_DIR/<capture_id>/에 저장합니다. 재배포 없이 느린 야간 실행이나
+메모리 급증 구간(예: analyze_stocks의 DataFrame 구성)을 확인할 수 있습니다.
+
+모드:
+- cprofile: 결정적 프로파일러. 컨슈머 스레드만 측정 (cpu.prof - pstats/snakeviz, cpu.txt - 누적 시간 상위 함수)
+- sampling: sys._current_frames()를 주기적으로 샘플링. 컨슈머 스레드와 처리 중 새로 생긴 스레드
+  (통합 분석/파이프라인/감정 수집 스레드 풀)를 함께 측정 (cpu.folded - flamegraph/speedscope, cpu.txt)
+- memory=True: tracemalloc으로 처리 전/후 스냅샷 차이와 최대 사용량 기록 (memory.txt)
+
+컨슈머 루프는 메시지를 하나씩 처리하므로 한 번에 캡처 하나만 진행합니다.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pytz import timezone
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+KST = timezone('Asia/Seoul')
+
+MODES = ("cprofile", "sampling", "none")
+# 요약 텍스트에 담을 함수/할당 위치 수
+TOP_ENTRIES = 40
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass
+class ProfilingSession:
+    """예약된 프로파일링 (조건에 맞는 메시지 remaining개를 캡처)"""
+    session_id: str
+    mode: str
+    memory: bool
+    remaining: int
+    request_id: Optional[str] = None
+    topic: Optional[str] = None
+    interval_ms: Optional[float] = None
+    expires_at: str = ""
+    captures: List[str] = field(default_factory=list)
+
+    def matches(self, topic: str, request_id: Optional[str]) -> bool:
+        if self.topic and self.topic != topic:
+            return False
+        if self.request_id and self.request_id != request_id:
+            return False
+        return True
+
+    def expired(self) -> bool:
+        return datetime.now(KST) >= datetime.fromisoformat(self.expires_at)
+
+
+class SamplingProfiler:
+    """
+    주기적으로 스택을 수집하는 샘플링 프로파일러 (별도 스레드)
+
+    Args:
+        interval: 샘플링 주기 (초)
+        owner: 측정할 스레드 ident (이 스레드 + 시작 이후 새로 생긴 스레드만 측정)
+    """
+
+    def __init__(self, interval: float, owner: int):
+        self.interval = interval
+        self.owner = owner
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._ignored = {t.ident for t in threading.enumerate()} - {owner}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or ident in self._ignored:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def folded(self) -> str:
+        """flamegraph.pl / speedscope용 collapsed stack 형식"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def summary(self) -> str:
+        """함수별 self(스택 맨 위) / total(스택 어딘가) 샘플 수 상위 목록"""
+        own_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            own_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+        total = sum(self.samples.values()) or 1
+        lines = [f"samples: {self.sample_count} (interval {self.interval * 1000:.1f}ms), thread stacks: {sum(self.samples.values())}", ""]
+        for title, counts in (("self", own_counts), ("total", total_counts)):
+            lines.append(f"== top by {title} samples ==")
+            for frame, count in counts.most_common(TOP_ENTRIES):
+                lines.append(f"{count:8d} {count / total * 100:6.2f}%  {frame}")
+            lines.append("")
+        return "\n".join(lines)
+
+
+class Capture:
+    """메시지 하나를 처리하는 동안의 프로파일링 (begin → end)"""
+
+    def __init__(self, session: ProfilingSession, topic: str, request_id: Optional[str]):
+        self.session = session
+        self.topic = topic
+        self.request_id = request_id
+        self.started_at = datetime.now(KST)
+        stamp = self.started_at.strftime("%Y%m%d-%H%M%S")
+        self.capture_id = _UNSAFE_CHARS.sub("_", f"{stamp}-{topic}-{request_id or 'unknown'}")[:120] + f"-{uuid.uuid4().hex[:6]}"
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[SamplingProfiler] = None
+        self._snapshot = None
+        self._started_tracemalloc = False
+        self._started = 0.0
+
+    def start(self) -> None:
+        if self.session.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot()
+        if self.session.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.session.mode == "sampling":
+            interval = (self.session.interval_ms or settings.PROFILING_SAMPLE_INTERVAL_MS) / 1000
+            self._sampler = SamplingProfiler(interval, threading.get_ident())
+            self._sampler.start()
+        self._started = time.perf_counter()
+
+    def stop(self, status: str) -> Dict[str, Any]:
+        """프로파일러를 끄고 결과 파일 저장 → 메타데이터"""
+        duration = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+
+        directory = os.path.join(settings.PROFILING_DIR, self.capture_id)
+        os.makedirs(directory, exist_ok=True)
+        meta: Dict[str, Any] = {
+            "capture_id": self.capture_id,
+            "session_id": self.session.session_id,
+            "topic": self.topic,
+            "request_id": self.request_id,
+            "mode": self.session.mode,
+            "memory": self.session.memory,
+            "status": status,
+            "started_at": self.started_at.isoformat(),
+            "duration": round(duration, 3),
+            "files": []
+        }
+
+        if self._profile is not None:
+            self._profile.dump_stats(os.path.join(directory, "cpu.prof"))
+            stream = io.StringIO()
+            pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(TOP_ENTRIES)
+            _write(directory, "cpu.txt", stream.getvalue())
+            meta["files"] += ["cpu.prof", "cpu.txt"]
+        if self._sampler is not None:
+            _write(directory, "cpu.folded", self._sampler.folded())
+            _write(directory, "cpu.txt", self._sampler.summary())
+            meta["files"] += ["cpu.folded", "cpu.txt"]
+            meta["samples"] = self._sampler.sample_count
+        if self._snapshot is not None:
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+            lines = [f"traced current: {current / 1024 / 1024:.2f} MiB, peak: {peak / 1024 / 1024:.2f} MiB", "",
+                     "== top allocation differences (after - before) =="]
+            lines += [str(stat) for stat in after.compare_to(self._snapshot, "lineno")[:TOP_ENTRIES]]
+            _write(directory, "memory.txt", "\n".join(lines) + "\n")
+            meta["files"].append("memory.txt")
+            meta["memory_peak_bytes"] = peak
+
+        _write(directory, "meta.json", json.dumps(meta, ensure_ascii=False, indent=2))
+        return meta
+
+
+def _write(directory: str, name: str, content: str) -> None:
+    with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+class ProfilingService:
+    """프로파일링 예약/캡처 관리 (프로세스당 하나, profiling_service)"""
+
+    def __init__(self):
+        self._sessions: Dict[str, ProfilingSession] = {}
+        self._active: Optional[Capture] = None
+        self._lock = threading.Lock()
+
+    def arm(self, mode: str = "cprofile", memory: bool = False, messages: int = 1, request_id: Optional[str] = None,
+            topic: Optional[str] = None, interval_ms: Optional[float] = None) -> ProfilingSession:
+        """조건에 맞는 다음 messages개 메시지 처리 구간을 프로파일링하도록 예약"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode} (expected one of {MODES})")
+        if mode == "none" and not memory:
+            raise ValueError("mode=none requires memory=true")
+        expires_at = datetime.now(KST) + timedelta(seconds=settings.PROFILING_ARM_TTL_SECONDS)
+        session = ProfilingSession(
+            session_id=uuid.uuid4().hex[:12], mode=mode, memory=memory, remaining=max(1, messages),
+            request_id=request_id, topic=topic, interval_ms=interval_ms, expires_at=expires_at.isoformat()
+        )
+        with self._lock:
+            self._sessions[session.session_id] = session
+        logger.info(
+            f"🔬 프로파일링 예약 {session.session_id}: mode={mode}, memory={memory}, messages={session.remaining}, "
+            f"requestId={request_id or '*'}, topic={topic or '*'}"
+        )
+        return session
+
+    def disarm(self, session_id: str) -> Optional[ProfilingSession]:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._expire()
+            return [asdict(s) for s in self._sessions.values()]
+
+    def _expire(self) -> None:
+        for session_id in [sid for sid, s in self._sessions.items() if s.expired()]:
+            logger.info(f"🔬 프로파일링 예약 만료: {session_id}")
+            del self._sessions[session_id]
+
+    def begin(self, topic: str, request_id: Optional[str]) -> Optional[Capture]:
+        """메시지 처리 시작 시 호출 - 조건에 맞는 예약이 있으면 캡처 시작"""
+        if not self._sessions:
+            return None
+        with self._lock:
+            self._expire()
+            if self._active is not None:
+                return None
+            session = next((s for s in self._sessions.values() if s.matches(topic, request_id)), None)
+            if session is None:
+                return None
+            session.remaining -= 1
+            if session.remaining <= 0:
+                del self._sessions[session.session_id]
+            capture = Capture(session, topic, request_id)
+            self._active = capture
+        try:
+            capture.start()
+        except Exception as e:
+            logger.warning(f"프로파일러 시작 실패: {e}")
+            with self._lock:
+                self._active = None
+            return None
+        logger.info(f"🔬 프로파일링 시작 {capture.capture_id}")
+        return capture
+
+    def end(self, capture: Optional[Capture], status: str = "ok") -> Optional[Dict[str, Any]]:
+        """메시지 처리 종료 시 호출 - 결과 저장"""
+        if capture is None:
+            return None
+        try:
+            meta = capture.stop(status)
+            capture.session.captures.append(capture.capture_id)
+            logger.info(f"🔬 프로파일링 저장 {capture.capture_id} ({meta['duration']:.1f}초): {', '.join(meta['files'])}")
+            self._prune()
+            return meta
+        except Exception as e:
+            logger.warning(f"프로파일링 결과 저장 실패: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._active = None
+
+    # ------------------------------------------------------------------
+    # 저장된 캡처
+    # ------------------------------------------------------------------
+
+    def captures(self) -> List[Dict[str, Any]]:
+        """저장된 캡처 메타데이터 (최신순)"""
+        if not os.path.isdir(settings.PROFILING_DIR):
+            return []
+        result = []
+        for name in os.listdir(settings.PROFILING_DIR):
+            meta = self.capture(name)
+            if meta is not None:
+                result.append(meta)
+        return sorted(result, key=lambda m: m.get("started_at", ""), reverse=True)
+
+    def capture(self, capture_id: str) -> Optional[Dict[str, Any]]:
+        path = self.capture_file(capture_id, "meta.json")
+        if path is None:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def capture_file(self, capture_id: str, filename: str) -> Optional[str]:
+        """캡처 디렉터리 안의 파일 경로 (경로 조작/없는 파일은 None)"""
+        if any(_UNSAFE_CHARS.search(part) or part.startswith(".") for part in (capture_id, filename)):
+            return None
+        path = os.path.join(settings.PROFILING_DIR, capture_id, filename)
+        return path if os.path.isfile(path) else None
+
+    def _prune(self) -> None:
+        """PROFILING_MAX_CAPTURES를 넘는 오래된 캡처 삭제"""
+        for meta in self.captures()[settings.PROFILING_MAX_CAPTURES:]:
+            shutil.rmtree(os.path.join(settings.PROFILING_DIR, meta["capture_id"]), ignore_errors=True)
+
+
+profiling_service = ProfilingService()
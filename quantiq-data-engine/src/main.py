@@ -9,19 +9,29 @@ import logging
 import json
 import time
 import threading
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 import uvicorn
-from confluent_kafka import Consumer, KafkaError
+from confluent_kafka import Consumer, KafkaError, TopicPartition
 from datetime import datetime
 from pytz import timezone
 
+from src.core import tracing
 from src.core.config import settings
 from src.core.database import MongoDB
+from src.core.jobs import job_registry
+from src.core.metrics import CONTENT_TYPE, KAFKA_CONSUMER_LAG, KAFKA_HANDLER_SECONDS, KAFKA_MESSAGES, REGISTRY
 from src.features.economic_data.router import router as economic_router
+from src.features.jobs.router import router as jobs_router
 from src.features.ml_package.router import router as ml_package_router
+from src.features.profiling.router import router as profiling_router
+from src.features.profiling.service import profiling_service
 from src.features.economic_data.service import EconomicDataService
+from src.services.analysis_progress import ProgressReporter
+from src.services.pipeline import PipelineContext, PipelineExecutor
 from src.services.recommendation_service import RecommendationService
 from src.services.slack_notifier import SlackNotifier
+from src.services.streaming_analysis import StreamingAnalysisWorker
+from src.services.sentiment_refresher import SentimentRefresher
 from src.core.kafka import KafkaEventPublisher
 
 KST = timezone('Asia/Seoul')
@@ -38,7 +48,9 @@ app = FastAPI(
 
 # Include routers (status endpoints only)
 app.include_router(economic_router)
+app.include_router(jobs_router)
 app.include_router(ml_package_router)
+app.include_router(profiling_router)
 
 
 @app.get("/")
@@ -50,9 +62,14 @@ def read_root():
         "subscribed_kafka_topics": [
             "economic.data.update.request",
             "analysis.technical.request",
+            "analysis.technical.range.request",
             "analysis.sentiment.request",
-            "analysis.combined.request"
+            "analysis.combined.request",
+            "pipeline.run.request"
         ],
+        "streaming_analysis": settings.STREAMING_ANALYSIS_ENABLED,
+        "sentiment_refresh": settings.SENTIMENT_REFRESH_ENABLED,
+        "slack_queue": SlackNotifier.stats(),
         "api_purpose": "Read-only health checks and status queries",
         "timestamp": datetime.now(KST).isoformat()
     }
@@ -63,6 +80,49 @@ def health_check():
     return {"status": "alive", "timestamp": datetime.now(KST).isoformat()}
 
 
+@app.get("/metrics")
+def metrics():
+    """Prometheus text format 메트릭 (핸들러/외부 API/Mongo/이벤트 발행/Slack)"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+def _record_consumer_lag(consumer, msg):
+    """
+    처리한 메시지 뒤로 파티션에 남은 메시지 수
+    (메시지마다 호출되므로 브로커에 묻지 않고 consumer가 캐시한 high watermark 사용)
+    """
+    try:
+        _, high = consumer.get_watermark_offsets(TopicPartition(msg.topic(), msg.partition()), cached=True)
+        if high < 0:
+            return  # 아직 캐시된 watermark 없음
+        KAFKA_CONSUMER_LAG.labels(topic=msg.topic(), partition=msg.partition()).set(max(0, high - msg.offset() - 1))
+    except Exception as e:
+        logger.debug(f"Consumer lag 조회 실패: {e}")
+
+
+def _request_id(message):
+    """요청 메시지의 requestId (payload 안 또는 최상위)"""
+    body = message if isinstance(message, dict) else {}
+    payload = body.get("payload", body)
+    return payload.get("requestId") if isinstance(payload, dict) else None
+
+
+def _start_consumer_span(msg, message):
+    """
+    요청 메시지 처리 span을 시작해 현재 span으로 설정
+    (quantiq-core가 보낸 traceparent를 부모로, 핸들러의 Mongo/외부 API/발행 span이 이 아래에 기록됨)
+    """
+    body = message if isinstance(message, dict) else {}
+    span = tracing.start_span(f"{msg.topic()} process", kind="consumer", parent=tracing.extract(msg.headers(), body), attributes={
+        "messaging.system": "kafka",
+        "messaging.destination.name": msg.topic(),
+        "messaging.kafka.partition": msg.partition(),
+        "messaging.kafka.offset": msg.offset(),
+        "quantiq.request_id": _request_id(message)
+    })
+    return span.activate()
+
+
 def run_api():
     logger.info("Starting Data Engine API server on port 8000")
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -85,20 +145,36 @@ def main():
     conf = {
         'bootstrap.servers': settings.KAFKA_BOOTSTRAP_SERVERS,
         'group.id': 'quantiq-data-engine-fresh',  # Fresh consumer group for clean start
-        'auto.offset.reset': 'earliest'
+        'auto.offset.reset': 'earliest',
+        # 파티션 high watermark를 fetch 응답/통계로 주기적으로 갱신 (consumer lag 지표를 브로커 왕복 없이 계산)
+        'statistics.interval.ms': 5000
     }
 
     # Wait for Kafka to be ready
     time.sleep(10)
 
+    # 실시간 가격 틱 → 장중 매매 신호 (별도 consumer 스레드)
+    streaming_worker = None
+    if settings.STREAMING_ANALYSIS_ENABLED:
+        streaming_worker = StreamingAnalysisWorker()
+        streaming_worker.start()
+
+    # 뉴스 감성 점수 백그라운드 갱신 (통합 분석은 저장된 점수를 바로 사용)
+    sentiment_refresher = None
+    if settings.SENTIMENT_REFRESH_ENABLED:
+        sentiment_refresher = SentimentRefresher()
+        sentiment_refresher.start()
+
     consumer = Consumer(conf)
 
     # 토픽 구독 (경제 데이터 + 분석 요청)
     topics = [
         settings.KAFKA_TOPIC_ECONOMIC_DATA_UPDATE_REQUEST,
         "analysis.technical.request",
+        "analysis.technical.range.request",
         "analysis.sentiment.request",
-        "analysis.combined.request"
+        "analysis.combined.request",
+        settings.KAFKA_TOPIC_PIPELINE_RUN_REQUEST
     ]
     consumer.subscribe(topics)
     logger.info(f"Subscribed to topics: {topics}")
@@ -106,6 +182,7 @@ def main():
     # Services 초기화
     economic_service = EconomicDataService()
     recommendation_service = RecommendationService()
+    pipeline_executor = PipelineExecutor()
 
     try:
         while True:
@@ -120,9 +197,20 @@ def main():
                     logger.error(f"Consumer error: {msg.error()}")
                     continue
 
+            topic_name = msg.topic()
+            KAFKA_MESSAGES.labels(topic=topic_name).inc()
+            handler_started = time.perf_counter()
+            handler_status = "ok"
+            span = None
+            capture = None
+            job = None
             try:
-                topic_name = msg.topic()
                 message = json.loads(msg.value().decode('utf-8'))
+                span = _start_consumer_span(msg, message)
+                # /admin/profiling으로 예약된 메시지면 처리 구간 프로파일링
+                capture = profiling_service.begin(topic_name, _request_id(message))
+                # 처리 기록 (job_runs, 단계별 시간은 stage_timer가 현재 작업에 기록)
+                job = job_registry.start(topic_name, _request_id(message), topic=topic_name)
                 logger.info(f"Received request from topic '{topic_name}': {message}")
 
                 # 경제 데이터 업데이트 요청 처리
@@ -148,6 +236,11 @@ def main():
                     try:
                         # Service 호출 (날짜 파라미터 전달)
                         result = economic_service.collect_economic_data(target_date=target_date)
+                        if result.get("success") is False:
+                            # 서비스가 예외를 삼키고 실패 결과를 반환 → 수집 오류 요약을 보낸 뒤 실패 처리
+                            SlackNotifier.notify_error_digest(request_id, result.get("errors"), thread_ts)
+                            raise RuntimeError(result.get("error") or "경제 데이터 수집 실패")
+                        job.complete(result)
                         elapsed_time = time.time() - start_time
 
                         logger.info("✅ 경제 데이터 수집 완료")
@@ -158,9 +251,15 @@ def main():
                             "duration": f"{elapsed_time:.2f}초",
                             "fred_collected": result.get("fred_collected", 0),
                             "yahoo_collected": result.get("yahoo_collected", 0),
-                            "total_indicators": result.get("fred_collected", 0) + result.get("yahoo_collected", 0)
+                            "total_indicators": result.get("fred_collected", 0) + result.get("yahoo_collected", 0),
+                            "dates_written": result.get("dates_written", 0),
+                            "dates_skipped": result.get("dates_skipped", 0),
+                            "source_errors": (result.get("errors") or {}).get("total", 0)
                         }
 
+                        # 지표/종목별 수집 오류는 요약 한 건으로 알림
+                        SlackNotifier.notify_error_digest(request_id, result.get("errors"), thread_ts)
+
                         # 🔔 수집 완료 알림 (스레드 답글)
                         SlackNotifier.notify_economic_data_collection_success(
                             request_id,
@@ -173,10 +272,12 @@ def main():
                             "status": "success",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
                             "duration": elapsed_time
                         })
                     except Exception as e:
                         logger.error(f"❌ 경제 데이터 수집 실패: {e}")
+                        job.fail(e)
 
                         # 🔔 오류 알림 (스레드 답글)
                         SlackNotifier.notify_economic_data_collection_error(request_id, str(e), thread_ts)
@@ -186,6 +287,7 @@ def main():
                             "status": "failed",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
                             "error": str(e)
                         })
                         raise
@@ -204,10 +306,17 @@ def main():
                     logger.info(f"Thread TS: {thread_ts}")
                     logger.info("=" * 80)
 
+                    # 진행 상황/부분 결과는 quantiq.analysis.progress로 발행
+                    progress = ProgressReporter(request_id, "technical")
+                    progress.started()
                     start_time = time.time()
                     try:
                         # Service 호출
-                        result = recommendation_service.run_technical_analysis(request_id, thread_ts, target_date)
+                        result = recommendation_service.run_technical_analysis(
+                            request_id, thread_ts, target_date, use_cache=payload.get("useCache", True), progress=progress
+                        )
+                        progress.finish(result)
+                        job.complete(result)
                         elapsed_time = time.time() - start_time
 
                         logger.info("✅ 기술적 분석 완료")
@@ -217,15 +326,70 @@ def main():
                             "status": "success",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
                             "duration": elapsed_time,
                             "result": result
                         })
                     except Exception as e:
                         logger.error(f"❌ 기술적 분석 실패: {e}")
+                        progress.failed(str(e))
+                        job.fail(e)
                         KafkaEventPublisher.publish("ANALYSIS_TECHNICAL_FAILED", {
                             "status": "failed",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
+                            "error": str(e)
+                        })
+
+                # 기간 기술적 분석 요청 처리 (startDate ~ endDate 일괄)
+                elif topic_name == "analysis.technical.range.request":
+                    payload = message.get("payload", message)
+                    request_id = payload.get("requestId", "unknown")
+                    thread_ts = payload.get("threadTs")
+                    start_date = payload.get("startDate")
+                    end_date = payload.get("endDate") or start_date
+
+                    logger.info("=" * 80)
+                    logger.info("기간 기술적 분석 요청 Kafka 메시지 수신")
+                    logger.info(f"Request ID: {request_id}")
+                    logger.info(f"Period: {start_date} ~ {end_date}")
+                    logger.info(f"Thread TS: {thread_ts}")
+                    logger.info("=" * 80)
+
+                    progress = ProgressReporter(request_id, "technical_range")
+                    progress.started()
+                    start_time = time.time()
+                    try:
+                        if not start_date:
+                            raise ValueError("startDate is required")
+
+                        result = recommendation_service.run_technical_range_analysis(
+                            request_id, start_date, end_date, thread_ts, progress=progress
+                        )
+                        progress.finish(result)
+                        job.complete(result)
+                        elapsed_time = time.time() - start_time
+
+                        logger.info("✅ 기간 기술적 분석 완료")
+
+                        KafkaEventPublisher.publish("ANALYSIS_TECHNICAL_RANGE_COMPLETED", {
+                            "status": result.get("status", "success"),
+                            "timestamp": datetime.now(KST).isoformat(),
+                            "requestId": request_id,
+                            "job": job.breakdown(),
+                            "duration": elapsed_time,
+                            "result": result
+                        })
+                    except Exception as e:
+                        logger.error(f"❌ 기간 기술적 분석 실패: {e}")
+                        progress.failed(str(e))
+                        job.fail(e)
+                        KafkaEventPublisher.publish("ANALYSIS_TECHNICAL_RANGE_FAILED", {
+                            "status": "failed",
+                            "timestamp": datetime.now(KST).isoformat(),
+                            "requestId": request_id,
+                            "job": job.breakdown(),
                             "error": str(e)
                         })
 
@@ -241,9 +405,13 @@ def main():
                     logger.info(f"Thread TS: {thread_ts}")
                     logger.info("=" * 80)
 
+                    progress = ProgressReporter(request_id, "sentiment")
+                    progress.started()
                     start_time = time.time()
                     try:
-                        result = recommendation_service.run_sentiment_analysis(request_id, thread_ts)
+                        result = recommendation_service.run_sentiment_analysis(request_id, thread_ts, progress=progress)
+                        progress.finish(result)
+                        job.complete(result)
                         elapsed_time = time.time() - start_time
 
                         logger.info("✅ 뉴스 감정 분석 완료")
@@ -252,15 +420,19 @@ def main():
                             "status": "success",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
                             "duration": elapsed_time,
                             "result": result
                         })
                     except Exception as e:
                         logger.error(f"❌ 뉴스 감정 분석 실패: {e}")
+                        progress.failed(str(e))
+                        job.fail(e)
                         KafkaEventPublisher.publish("ANALYSIS_SENTIMENT_FAILED", {
                             "status": "failed",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
                             "error": str(e)
                         })
 
@@ -278,9 +450,15 @@ def main():
                     logger.info(f"Thread TS: {thread_ts}")
                     logger.info("=" * 80)
 
+                    progress = ProgressReporter(request_id, "combined")
+                    progress.started()
                     start_time = time.time()
                     try:
-                        result = recommendation_service.run_combined_analysis(request_id, thread_ts, target_date)
+                        result = recommendation_service.run_combined_analysis(
+                            request_id, thread_ts, target_date, use_cache=payload.get("useCache", True), progress=progress
+                        )
+                        progress.finish(result)
+                        job.complete(result)
                         elapsed_time = time.time() - start_time
 
                         logger.info("✅ 통합 분석 완료")
@@ -289,25 +467,112 @@ def main():
                             "status": "success",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
                             "duration": elapsed_time,
                             "result": result
                         })
                     except Exception as e:
                         logger.error(f"❌ 통합 분석 실패: {e}")
+                        progress.failed(str(e))
+                        job.fail(e)
                         KafkaEventPublisher.publish("ANALYSIS_FAILED", {
                             "status": "failed",
                             "timestamp": datetime.now(KST).isoformat(),
                             "requestId": request_id,
+                            "job": job.breakdown(),
+                            "error": str(e)
+                        })
+
+                # 파이프라인 실행 요청 처리 (입력이 바뀐 단계만 실행)
+                elif topic_name == settings.KAFKA_TOPIC_PIPELINE_RUN_REQUEST:
+                    payload = message.get("payload", message)
+                    request_id = payload.get("requestId", "unknown")
+                    thread_ts = payload.get("threadTs")
+                    target_date = payload.get("targetDate") or datetime.now(KST).strftime('%Y-%m-%d')
+                    force = payload.get("force", False)  # true면 입력 버전과 무관하게 모든 단계 재실행
+                    stages = payload.get("stages")  # 실행할 단계 (선행 단계 포함, 없으면 전체)
+
+                    logger.info("=" * 80)
+                    logger.info("파이프라인 실행 요청 Kafka 메시지 수신")
+                    logger.info(f"Request ID: {request_id}")
+                    logger.info(f"Target Date: {target_date}")
+                    logger.info(f"Stages: {stages or 'all'} (force={force})")
+                    logger.info("=" * 80)
+
+                    progress = ProgressReporter(request_id, "pipeline")
+                    progress.started()
+                    start_time = time.time()
+                    try:
+                        ctx = PipelineContext(
+                            target_date=target_date,
+                            request_id=request_id,
+                            economic_service=economic_service,
+                            recommendation_service=recommendation_service,
+                            thread_ts=thread_ts,
+                            force=force,
+                            progress=progress
+                        )
+                        result = pipeline_executor.run(ctx, stages)
+                        progress.finish(result)
+                        job.complete(result)
+                        elapsed_time = time.time() - start_time
+
+                        if thread_ts:
+                            SlackNotifier.send_thread_message(
+                                f"{'✅' if result['status'] == 'success' else '⚠️'} 파이프라인 완료 ({target_date})\n"
+                                f"• 실행: {', '.join(result['ran']) or '-'}\n"
+                                f"• 건너뜀(입력 변경 없음): {', '.join(result['skipped']) or '-'}\n"
+                                f"• 소요: {elapsed_time:.1f}초",
+                                thread_ts
+                            )
+
+                        KafkaEventPublisher.publish(
+                            "PIPELINE_COMPLETED" if result["status"] == "success" else "PIPELINE_FAILED", {
+                                "status": result["status"],
+                                "timestamp": datetime.now(KST).isoformat(),
+                                "requestId": request_id,
+                                "job": job.breakdown(),
+                                "duration": elapsed_time,
+                                "result": result
+                            })
+                    except Exception as e:
+                        logger.error(f"❌ 파이프라인 실행 실패: {e}")
+                        progress.failed(str(e))
+                        job.fail(e)
+                        KafkaEventPublisher.publish("PIPELINE_FAILED", {
+                            "status": "failed",
+                            "timestamp": datetime.now(KST).isoformat(),
+                            "requestId": request_id,
+                            "job": job.breakdown(),
                             "error": str(e)
                         })
 
             except Exception as e:
+                handler_status = "error"
+                if span is not None:
+                    span.record_exception(e)
+                if job is not None and job.status == "running":
+                    job.fail(e)
                 logger.error(f"Error processing message: {e}")
+            finally:
+                profiling_service.end(capture, handler_status)
+                job_registry.finish(job, handler_status)
+                if span is not None:
+                    span.end()
+                KAFKA_HANDLER_SECONDS.labels(topic=topic_name, status=handler_status).observe(time.perf_counter() - handler_started)
+                _record_consumer_lag(consumer, msg)
 
     except KeyboardInterrupt:
         pass
     finally:
+        if streaming_worker is not None:
+            streaming_worker.stop()
+        if sentiment_refresher is not None:
+            sentiment_refresher.stop()
         consumer.close()
+        # 큐에 남은 Slack 알림 전송
+        SlackNotifier.flush()
+        tracing.shutdown()
 
 
 if __name__ == "__main__":
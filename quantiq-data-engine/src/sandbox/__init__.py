@@ -0,0 +1 @@
+"""Sandbox - 외부 API(FRED, Yahoo, Alpha Vantage, Slack) 로컬 Fake 서버 및 합성 데이터"""
@@ -0,0 +1,85 @@
+"""
+Fixture Store - 외부 API 응답 녹화/재생
+
+요청(서비스 + 파라미터)별로 응답 JSON을 파일로 저장하고,
+Fake 서버가 같은 요청을 받으면 저장된 응답을 그대로 재생합니다.
+"""
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# 녹화 모드에서 요청을 전달할 실제 API 주소
+UPSTREAM_URLS = {
+    "fred": "https://api.stlouisfed.org/fred/series/observations",
+    "yahoo": "https://query1.finance.yahoo.com/v8/finance/chart/{ticker}",
+    "alphavantage": "https://www.alphavantage.co/query",
+}
+
+# fixture 키 계산에서 제외할 파라미터 (인증 정보)
+SECRET_PARAMS = {"api_key", "apikey", "token"}
+
+
+class FixtureStore:
+    """요청별 응답 JSON 파일 저장소"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def fixture_key(service: str, params: Dict[str, Any]) -> str:
+        """서비스와 파라미터(인증 정보 제외)로 fixture 키를 계산합니다."""
+        normalized = {k: str(v) for k, v in sorted(params.items()) if k not in SECRET_PARAMS}
+        digest = hashlib.sha1(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        return f"{service}_{digest}"
+
+    def _path(self, service: str, params: Dict[str, Any]) -> Path:
+        return self.directory / service / f"{self.fixture_key(service, params)}.json"
+
+    def load(self, service: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """저장된 응답을 조회합니다. 없으면 None"""
+        path = self._path(service, params)
+        if not path.exists():
+            return None
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)["response"]
+
+    def save(self, service: str, params: Dict[str, Any], response: Dict[str, Any]) -> Path:
+        """응답을 저장합니다 (인증 정보는 저장하지 않음)."""
+        path = self._path(service, params)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump({
+                "service": service,
+                "params": {k: v for k, v in params.items() if k not in SECRET_PARAMS},
+                "response": response
+            }, f, ensure_ascii=False)
+        return path
+
+    def record(self, service: str, params: Dict[str, Any], ticker: Optional[str] = None) -> Dict[str, Any]:
+        """
+        실제 API를 호출해 응답을 녹화합니다.
+
+        Args:
+            service: fred / yahoo / alphavantage
+            params: 요청 파라미터 (인증 정보 포함 가능, 파일에는 저장되지 않음)
+            ticker: Yahoo chart 조회 시 티커
+
+        Returns:
+            실제 API 응답
+        """
+        url = UPSTREAM_URLS[service].format(ticker=ticker)
+        response = requests.get(url, params=params, headers={"User-Agent": "Mozilla/5.0"}, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+
+        # Yahoo는 티커가 경로에 있으므로 키에 포함
+        key_params = {**params, "ticker": ticker} if ticker else params
+        path = self.save(service, key_params, data)
+        logger.info(f"📼 fixture 녹화: {service} -> {path}")
+        return data
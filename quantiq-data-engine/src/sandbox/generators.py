@@ -0,0 +1,344 @@
+"""
+Synthetic Data Generator - 외부 API 응답 형식의 합성 데이터 생성
+
+동일한 seed와 요청 파라미터에 대해 항상 같은 데이터를 생성하므로
+벤치마크/부하 테스트 결과를 실행 간에 비교할 수 있습니다.
+"""
+import calendar
+import random
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# FRED 지표별 발표 주기 (그 외는 일별로 생성)
+FRED_FREQUENCIES = {
+    "GDP": "quarterly",
+    "GDPC1": "quarterly",
+    "CPIAUCSL": "monthly",
+    "CPILFESL": "monthly",
+    "UNRATE": "monthly",
+    "PAYEMS": "monthly",
+    "PCEPI": "monthly",
+}
+
+POSITIVE_HEADLINES = [
+    "{name} beats earnings expectations as revenue surges",
+    "{name} raises full-year guidance on strong demand",
+    "Analysts upgrade {name} after record quarter",
+]
+NEGATIVE_HEADLINES = [
+    "{name} misses estimates, shares slide",
+    "{name} cuts outlook amid weak demand",
+    "Regulators open probe into {name}",
+]
+NEUTRAL_HEADLINES = [
+    "{name} to present at industry conference",
+    "{name} announces board changes",
+    "What to watch from {name} this week",
+]
+
+
+class SyntheticDataGenerator:
+    """FRED / Yahoo chart / Alpha Vantage NEWS_SENTIMENT / Slack 형식의 합성 데이터 생성기"""
+
+    def __init__(self, seed: int = 42, articles_per_day: int = 200):
+        self.seed = seed
+        self.articles_per_day = articles_per_day
+        self._pool_cache: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    def _rng(self, *key: Any) -> np.random.Generator:
+        """요청 키별로 결정적인 난수 생성기를 반환합니다."""
+        digest = zlib.crc32("|".join(str(k) for k in key).encode("utf-8"))
+        return np.random.default_rng((self.seed << 32) ^ digest)
+
+    # ------------------------------------------------------------------
+    # Universe
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def universe(size: int) -> List[str]:
+        """합성 종목 티커 목록 (SYN00000 ~)"""
+        return [f"SYN{i:05d}" for i in range(size)]
+
+    def stock_documents(self, size: int) -> List[Dict[str, Any]]:
+        """stocks 컬렉션 시드용 문서 목록"""
+        return [
+            {"ticker": ticker, "stock_name": f"Synthetic {ticker}", "is_active": True}
+            for ticker in self.universe(size)
+        ]
+
+    # ------------------------------------------------------------------
+    # FRED
+    # ------------------------------------------------------------------
+
+    def fred_observations(self, series_id: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """FRED /series/observations 응답"""
+        frequency = FRED_FREQUENCIES.get(series_id, "daily")
+        dates = _date_range(start_date, end_date, frequency)
+
+        base = 1.0 + self._rng("fred", series_id).random() * 100.0
+        # 날짜별 난수를 사용해 조회 구간과 무관하게 같은 날짜에는 같은 값이 나오도록 함
+        values = [base * (1.0 + 0.02 * self._rng("fred", series_id, date).standard_normal()) for date in dates]
+
+        observations = [
+            {
+                "realtime_start": end_date,
+                "realtime_end": end_date,
+                "date": date,
+                "value": f"{value:.4f}"
+            }
+            for date, value in zip(dates, values)
+        ]
+
+        return {
+            "realtime_start": end_date,
+            "realtime_end": end_date,
+            "observation_start": start_date,
+            "observation_end": end_date,
+            "units": "lin",
+            "count": len(observations),
+            "observations": observations
+        }
+
+    # ------------------------------------------------------------------
+    # Yahoo Finance
+    # ------------------------------------------------------------------
+
+    def price_history(self, ticker: str, start_date: str, end_date: str) -> Dict[str, List]:
+        """
+        영업일 기준 OHLCV 시계열 (기하 랜덤워크)
+
+        모든 값은 고정 기준일(2000-01-03)부터 생성한 시계열에서 잘라내므로
+        조회 구간이 달라도 같은 날짜에는 같은 값이 나옵니다.
+        """
+        rng = self._rng("price", ticker)
+        start_price = 20.0 + rng.random() * 480.0
+        drift = 0.0002 + rng.standard_normal() * 0.0003
+        vol = 0.01 + rng.random() * 0.02
+
+        origin = np.datetime64("2000-01-03")
+        dates = _date_range(start_date, end_date, "daily")
+        if not dates:
+            return {"dates": [], "open": [], "high": [], "low": [], "close": [], "volume": []}
+
+        offsets = np.busday_count(origin, np.array(dates, dtype="datetime64[D]"))
+        length = int(offsets.max()) + 1
+
+        series_rng = self._rng("series", ticker)
+        closes_all = start_price * np.exp(np.cumsum(drift + vol * series_rng.standard_normal(length)))
+        open_noise = 1 + 0.005 * series_rng.standard_normal(length)
+        high_noise = 1 + np.abs(0.01 * series_rng.standard_normal(length))
+        low_noise = 1 - np.abs(0.01 * series_rng.standard_normal(length))
+        volumes_all = (1e5 + series_rng.random(length) * 5e6).astype(np.int64)
+
+        closes = closes_all[offsets]
+        opens = closes * open_noise[offsets]
+        highs = np.maximum(opens, closes) * high_noise[offsets]
+        lows = np.minimum(opens, closes) * low_noise[offsets]
+
+        return {
+            "dates": dates,
+            "open": opens.tolist(),
+            "high": highs.tolist(),
+            "low": lows.tolist(),
+            "close": closes.tolist(),
+            "volume": volumes_all[offsets].tolist()
+        }
+
+    def yahoo_chart(self, ticker: str, period1: int, period2: int) -> Dict[str, Any]:
+        """Yahoo /v8/finance/chart/{ticker} 응답"""
+        start_date = datetime.utcfromtimestamp(period1).strftime("%Y-%m-%d")
+        # period2는 배타적 (yfinance end 인자와 동일)
+        end_date = (datetime.utcfromtimestamp(period2) - timedelta(days=1)).strftime("%Y-%m-%d")
+        history = self.price_history(ticker, start_date, end_date)
+
+        timestamps = [
+            calendar.timegm((datetime.strptime(d, "%Y-%m-%d") + timedelta(hours=14, minutes=30)).timetuple())
+            for d in history["dates"]
+        ]
+
+        return {
+            "chart": {
+                "result": [{
+                    "meta": {
+                        "symbol": ticker,
+                        "currency": "USD",
+                        "exchangeTimezoneName": "America/New_York",
+                        "dataGranularity": "1d"
+                    },
+                    "timestamp": timestamps,
+                    "indicators": {
+                        "quote": [{
+                            "open": history["open"],
+                            "high": history["high"],
+                            "low": history["low"],
+                            "close": history["close"],
+                            "volume": history["volume"]
+                        }],
+                        "adjclose": [{"adjclose": history["close"]}]
+                    }
+                }],
+                "error": None
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # Alpha Vantage
+    # ------------------------------------------------------------------
+
+    def news_sentiment(
+        self,
+        tickers: Optional[List[str]],
+        time_from: Optional[str],
+        limit: int,
+        universe: List[str],
+        now: Optional[datetime] = None,
+        time_to: Optional[str] = None,
+        sort: str = "LATEST"
+    ) -> Dict[str, Any]:
+        """
+        Alpha Vantage NEWS_SENTIMENT 응답
+
+        일자별 기사 풀을 결정적으로 생성하고, 요청한 모든 티커를 언급하는 기사만
+        반환합니다 (실제 API와 동일하게 복수 티커는 교집합 필터).
+        같은 기사는 여러 티커 조회에서 같은 URL로 반복 등장합니다.
+        time_to가 없으면 현재 시각까지, sort(LATEST/EARLIEST) 순서로 limit개까지 반환합니다.
+        """
+        now = now or datetime.utcnow()
+        start = datetime.strptime(time_from, "%Y%m%dT%H%M") if time_from else now - timedelta(days=3)
+        end = min(now, datetime.strptime(time_to, "%Y%m%dT%H%M")) if time_to else now
+        wanted = set(tickers or [])
+        pool_universe = sorted(set(universe) | wanted)
+
+        feed = []
+        day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day <= end:
+            for article in self._article_pool(day, pool_universe):
+                published = datetime.strptime(article["time_published"], "%Y%m%dT%H%M%S")
+                if published < start or published > end:
+                    continue
+                mentioned = {ts["ticker"] for ts in article["ticker_sentiment"]}
+                if wanted and not wanted.issubset(mentioned):
+                    continue
+                feed.append(article)
+            day += timedelta(days=1)
+
+        # 실제 API와 같이 기본은 최신 기사 우선
+        feed.sort(key=lambda a: a["time_published"], reverse=(sort != "EARLIEST"))
+        feed = feed[:limit]
+
+        return {
+            "items": str(len(feed)),
+            "sentiment_score_definition": "x <= -0.35: Bearish; -0.35 < x <= -0.15: Somewhat-Bearish; "
+                                          "-0.15 < x < 0.15: Neutral; 0.15 <= x < 0.35: Somewhat_Bullish; x >= 0.35: Bullish",
+            "relevance_score_definition": "0 < x <= 1, with a higher score indicating higher relevance.",
+            "feed": feed
+        }
+
+    def _article_pool(self, day: datetime, universe: List[str]) -> List[Dict[str, Any]]:
+        """하루치 기사 풀 (기사당 1~4개 티커 언급)"""
+        if not universe:
+            return []
+
+        cache_key = (day.strftime("%Y%m%d"), tuple(universe))
+        if cache_key in self._pool_cache:
+            return self._pool_cache[cache_key]
+
+        rng = self._rng("news", day.strftime("%Y%m%d"), len(universe))
+        py_rng = random.Random(int(rng.integers(0, 2 ** 31)))
+        articles = []
+
+        # 유니버스가 커도 모든 티커가 최소 한 번은 언급되도록 기사 수를 보정
+        count = max(self.articles_per_day, len(universe) // 2)
+        for i in range(count):
+            k = 1 + int(rng.integers(0, 4))
+            mentioned = py_rng.sample(universe, min(k, len(universe)))
+            # 기사 i는 유니버스를 순환하며 최소 한 종목을 보장
+            anchor = universe[i % len(universe)]
+            if anchor not in mentioned:
+                mentioned[0] = anchor
+
+            overall = float(np.clip(rng.normal(0.05, 0.25), -1, 1))
+            headlines = POSITIVE_HEADLINES if overall >= 0.15 else NEGATIVE_HEADLINES if overall <= -0.15 else NEUTRAL_HEADLINES
+            title = headlines[i % len(headlines)].format(name=mentioned[0])
+            published = day + timedelta(seconds=int(rng.integers(0, 86400)))
+
+            articles.append({
+                "title": title,
+                "url": f"https://news.sandbox.local/{day.strftime('%Y%m%d')}/{i:06d}",
+                "time_published": published.strftime("%Y%m%dT%H%M%S"),
+                "authors": ["Sandbox Newswire"],
+                "summary": f"{title}. Synthetic article generated for load testing.",
+                "source": "Sandbox Newswire",
+                "overall_sentiment_score": round(overall, 6),
+                "overall_sentiment_label": _sentiment_label(overall),
+                "ticker_sentiment": [
+                    {
+                        "ticker": ticker,
+                        "relevance_score": f"{rng.random():.6f}",
+                        "ticker_sentiment_score": f"{float(np.clip(overall + rng.normal(0, 0.1), -1, 1)):.6f}",
+                        "ticker_sentiment_label": _sentiment_label(overall)
+                    }
+                    for ticker in mentioned
+                ]
+            })
+
+        # 최근 일자 위주로만 조회되므로 오래된 풀은 버림
+        if len(self._pool_cache) >= 16:
+            self._pool_cache.pop(next(iter(self._pool_cache)))
+        self._pool_cache[cache_key] = articles
+        return articles
+
+    # ------------------------------------------------------------------
+    # Slack
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def slack_post_message(channel: str, thread_ts: Optional[str] = None) -> Dict[str, Any]:
+        """Slack chat.postMessage 응답"""
+        ts = f"{datetime.utcnow().timestamp():.6f}"
+        message = {"type": "message", "ts": ts}
+        if thread_ts:
+            message["thread_ts"] = thread_ts
+        return {"ok": True, "channel": channel, "ts": ts, "message": message}
+
+
+def _date_range(start_date: str, end_date: str, frequency: str) -> List[str]:
+    """주기별 날짜 목록 (YYYY-MM-DD)"""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+
+    dates = []
+    if frequency == "daily":
+        current = start
+        while current <= end:
+            if current.weekday() < 5:
+                dates.append(current.strftime("%Y-%m-%d"))
+            current += timedelta(days=1)
+        return dates
+
+    # 월별/분기별 지표는 매월(분기) 1일자로 발표
+    months = 3 if frequency == "quarterly" else 1
+    current = start.replace(day=1)
+    while current <= end:
+        if current >= start and (current.month - 1) % months == 0:
+            dates.append(current.strftime("%Y-%m-%d"))
+        month_index = current.month  # 다음 달 (0-based)
+        current = current.replace(year=current.year + month_index // 12, month=month_index % 12 + 1)
+
+    return dates
+
+
+def _sentiment_label(score: float) -> str:
+    """Alpha Vantage 감정 라벨"""
+    if score <= -0.35:
+        return "Bearish"
+    if score <= -0.15:
+        return "Somewhat-Bearish"
+    if score < 0.15:
+        return "Neutral"
+    if score < 0.35:
+        return "Somewhat-Bullish"
+    return "Bullish"
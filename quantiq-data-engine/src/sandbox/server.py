@@ -0,0 +1,249 @@
+"""
+Fake External API Server - FRED / Yahoo Finance / Alpha Vantage / Slack 로컬 대역 서버
+
+인터넷 없이 수집/분석 파이프라인을 실행하고 벤치마크/부하 테스트를 하기 위한 서버입니다.
+녹화된 fixture가 있으면 재생하고, 없으면 합성 데이터를 생성합니다.
+지연 시간, 오류율, 분당 호출 제한을 서비스별로 설정할 수 있습니다.
+
+Usage:
+    python -m src.sandbox.server --port 8090 --latency-ms 50 --error-rate 0.01 --universe-size 5000
+
+    # Data Engine 환경변수
+    FRED_BASE_URL=http://localhost:8090/fred
+    YAHOO_FINANCE_BASE_URL=http://localhost:8090/yahoo
+    ALPHA_VANTAGE_BASE_URL=http://localhost:8090/alphavantage
+    SLACK_API_BASE_URL=http://localhost:8090/slack/api
+    SLACK_WEBHOOK_URL=http://localhost:8090/slack/webhook
+"""
+import argparse
+import logging
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from src.sandbox.fixtures import UPSTREAM_URLS, FixtureStore
+from src.sandbox.generators import SyntheticDataGenerator
+
+logger = logging.getLogger(__name__)
+
+SERVICES = ("fred", "yahoo", "alphavantage", "slack")
+
+
+@dataclass
+class FakeServerConfig:
+    """Fake 서버 동작 설정"""
+    latency_ms: float = 0.0  # 응답 지연 (기본값)
+    latency_jitter_ms: float = 0.0  # 응답 지연 편차 (균등 분포)
+    error_rate: float = 0.0  # 5xx 응답 비율 (0~1)
+    # 서비스별 분당 호출 제한 (0 = 무제한), 실제 API의 응답 형식으로 제한 응답을 돌려줌
+    rate_limits: Dict[str, int] = field(default_factory=lambda: {s: 0 for s in SERVICES})
+    # 서비스별 지연 오버라이드 (ms)
+    service_latency_ms: Dict[str, float] = field(default_factory=dict)
+    universe_size: int = 100
+    articles_per_day: int = 200
+    seed: int = 42
+    fixtures_dir: Optional[str] = None
+    record: bool = False  # True면 실제 API로 요청을 전달해 fixture를 녹화
+
+
+class FaultInjector:
+    """지연/오류/호출 제한 주입기 (서비스별 슬라이딩 윈도우)"""
+
+    def __init__(self, config: FakeServerConfig):
+        self.config = config
+        self._calls: Dict[str, Deque[float]] = defaultdict(deque)
+        self._lock = threading.Lock()
+        self._rng = random.Random(config.seed)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"requests": 0, "errors": 0, "rate_limited": 0})
+
+    def delay(self, service: str) -> None:
+        base = self.config.service_latency_ms.get(service, self.config.latency_ms)
+        jitter = self.config.latency_jitter_ms
+        delay_ms = base + (self._rng.uniform(-jitter, jitter) if jitter else 0.0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+
+    def is_rate_limited(self, service: str) -> bool:
+        limit = self.config.rate_limits.get(service, 0)
+        now = time.monotonic()
+        with self._lock:
+            self.stats[service]["requests"] += 1
+            if not limit:
+                return False
+            calls = self._calls[service]
+            while calls and now - calls[0] >= 60.0:
+                calls.popleft()
+            if len(calls) >= limit:
+                self.stats[service]["rate_limited"] += 1
+                return True
+            calls.append(now)
+            return False
+
+    def should_fail(self, service: str) -> bool:
+        with self._lock:
+            failed = self.config.error_rate > 0 and self._rng.random() < self.config.error_rate
+            if failed:
+                self.stats[service]["errors"] += 1
+            return failed
+
+
+def create_app(config: FakeServerConfig) -> FastAPI:
+    """Fake 서버 FastAPI 앱을 생성합니다."""
+    app = FastAPI(title="Quantiq Sandbox - Fake External APIs")
+    generator = SyntheticDataGenerator(seed=config.seed, articles_per_day=config.articles_per_day)
+    faults = FaultInjector(config)
+    store = FixtureStore(config.fixtures_dir) if config.fixtures_dir else None
+    universe = generator.universe(config.universe_size)
+
+    def respond(service: str, params: Dict[str, Any], synthesize, ticker: Optional[str] = None):
+        """공통 처리: 지연 → 호출 제한 → 오류 주입 → fixture 재생/녹화 → 합성"""
+        faults.delay(service)
+
+        if faults.is_rate_limited(service):
+            if service == "alphavantage":
+                # Alpha Vantage는 200 + Note 본문으로 호출 제한을 알림
+                return JSONResponse({
+                    "Note": "Thank you for using Alpha Vantage! Our standard API call frequency is "
+                            "5 calls per minute and 500 calls per day."
+                })
+            headers = {"Retry-After": "1"} if service == "slack" else {}
+            body = {"ok": False, "error": "ratelimited"} if service == "slack" else {"error_code": 429, "error_message": "Too Many Requests."}
+            return JSONResponse(body, status_code=429, headers=headers)
+
+        if faults.should_fail(service):
+            return JSONResponse({"error": "sandbox injected failure"}, status_code=503)
+
+        # Slack은 녹화하면 실제 채널에 게시되므로 녹화/재생 대상에서 제외 (합성 응답 사용)
+        if store is not None and service in UPSTREAM_URLS:
+            key_params = {**params, "ticker": ticker} if ticker else params
+            if config.record:
+                return JSONResponse(store.record(service, params, ticker=ticker))
+            recorded = store.load(service, key_params)
+            if recorded is not None:
+                return JSONResponse(recorded)
+
+        return JSONResponse(synthesize())
+
+    @app.get("/fred/series/observations")
+    def fred_observations(request: Request):
+        params = dict(request.query_params)
+        return respond("fred", params, lambda: generator.fred_observations(
+            params.get("series_id", ""),
+            params.get("observation_start", "2000-01-01"),
+            params.get("observation_end", time.strftime("%Y-%m-%d"))
+        ))
+
+    @app.get("/yahoo/v8/finance/chart/{ticker}")
+    def yahoo_chart(ticker: str, request: Request):
+        params = dict(request.query_params)
+        period2 = int(params.get("period2", time.time()))
+        period1 = int(params.get("period1", period2 - 365 * 86400))
+        return respond("yahoo", params, lambda: generator.yahoo_chart(ticker, period1, period2), ticker=ticker)
+
+    @app.get("/alphavantage/query")
+    def alphavantage_query(request: Request):
+        params = dict(request.query_params)
+        if params.get("function") != "NEWS_SENTIMENT":
+            return JSONResponse({"Information": f"sandbox does not support function={params.get('function')}"})
+
+        tickers = [t for t in params.get("tickers", "").split(",") if t]
+        return respond("alphavantage", params, lambda: generator.news_sentiment(
+            tickers or None,
+            params.get("time_from"),
+            int(params.get("limit", 50)),
+            universe,
+            time_to=params.get("time_to"),
+            sort=params.get("sort", "LATEST")
+        ))
+
+    @app.post("/slack/api/chat.postMessage")
+    async def slack_post_message(request: Request):
+        body = await request.json()
+        return respond("slack", {}, lambda: generator.slack_post_message(body.get("channel", ""), body.get("thread_ts")))
+
+    @app.post("/slack/webhook")
+    def slack_webhook():
+        return respond("slack", {}, lambda: {"ok": True})
+
+    @app.get("/_sandbox/stats")
+    def sandbox_stats():
+        """서비스별 요청/오류/호출 제한 카운터"""
+        return {"config": config.__dict__, "stats": dict(faults.stats)}
+
+    return app
+
+
+def seed_mongodb(universe_size: int, seed: int = 42) -> int:
+    """
+    MongoDB stocks 컬렉션에 합성 유니버스를 등록합니다.
+
+    기존 종목은 비활성화하고 합성 종목만 활성화합니다 (로컬/부하 테스트 전용).
+    """
+    from pymongo import UpdateOne
+    from src.core.database import MongoDB
+
+    db = MongoDB.get_db()
+    docs = SyntheticDataGenerator(seed=seed).stock_documents(universe_size)
+    db.stocks.update_many({}, {"$set": {"is_active": False}})
+    db.stocks.bulk_write([
+        UpdateOne({"ticker": doc["ticker"]}, {"$set": doc}, upsert=True)
+        for doc in docs
+    ], ordered=False)
+    logger.info(f"🌱 합성 유니버스 등록: {universe_size}개 종목")
+    return len(docs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantiq sandbox fake external API server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fred-rpm", type=int, default=0, help="FRED 분당 호출 제한 (0 = 무제한)")
+    parser.add_argument("--yahoo-rpm", type=int, default=0)
+    parser.add_argument("--alphavantage-rpm", type=int, default=0)
+    parser.add_argument("--slack-rpm", type=int, default=0)
+    parser.add_argument("--universe-size", type=int, default=100)
+    parser.add_argument("--articles-per-day", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--fixtures-dir", default=None, help="녹화된 fixture 디렉토리 (있으면 우선 재생)")
+    parser.add_argument("--record", action="store_true", help="실제 API로 전달하며 fixture 녹화")
+    parser.add_argument("--seed-mongo", action="store_true", help="MongoDB stocks 컬렉션에 합성 유니버스 등록")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    config = FakeServerConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limits={
+            "fred": args.fred_rpm,
+            "yahoo": args.yahoo_rpm,
+            "alphavantage": args.alphavantage_rpm,
+            "slack": args.slack_rpm,
+        },
+        universe_size=args.universe_size,
+        articles_per_day=args.articles_per_day,
+        seed=args.seed,
+        fixtures_dir=args.fixtures_dir,
+        record=args.record
+    )
+
+    if args.seed_mongo:
+        seed_mongodb(args.universe_size, args.seed)
+
+    logger.info(f"Starting sandbox server on port {args.port} (universe={args.universe_size})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
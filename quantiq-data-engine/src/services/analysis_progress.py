@@ -0,0 +1,120 @@
+"""
+Analysis Progress - 분석 진행 상황과 부분 결과 스트리밍
+
+긴 분석 실행 중 quantiq.analysis.progress 토픽으로 다음 이벤트를 발행합니다.
+- started: 요청 수신
+- running: 단계 시작/진행 (stage, processed/total)
+- partial: chunk_size개 종목마다 부분 결과 (results)
+- completed / failed: 최종 마커 (final=True)
+
+같은 요청의 이벤트는 requestId를 키로 발행해 같은 파티션에 순서대로 쌓이며,
+sequence로 정렬/누락을 확인할 수 있습니다. 마지막 running 이후 오래 이벤트가 없으면 멈춘 실행으로 볼 수 있습니다.
+
+최종 마커 외의 이벤트는 flush 없이 배치 전송하므로 분석 경로를 막지 않습니다.
+"""
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from src.core.config import settings
+from src.events.publisher import EventPublisher
+from src.events.schema import AnalysisProgressPayload, EventTopics, create_event
+
+
+class ProgressReporter:
+    """
+    요청 하나의 진행 이벤트 발행기 (thread-safe)
+
+    Args:
+        request_id: 분석 요청 ID
+        analysis_type: technical | technical_range | sentiment | combined
+        chunk_size: 부분 결과 이벤트당 종목 수 (기본 ANALYSIS_PROGRESS_CHUNK_SIZE)
+        enabled: False면 아무것도 발행하지 않음 (기본 ANALYSIS_PROGRESS_ENABLED)
+    """
+
+    def __init__(self, request_id: str, analysis_type: str, chunk_size: Optional[int] = None, enabled: Optional[bool] = None):
+        self.request_id = request_id
+        self.analysis_type = analysis_type
+        self.chunk_size = max(1, chunk_size or settings.ANALYSIS_PROGRESS_CHUNK_SIZE)
+        self.enabled = settings.ANALYSIS_PROGRESS_ENABLED if enabled is None else enabled
+        self._sequence = 0
+        self._chunks = 0
+        self._lock = threading.Lock()
+
+    def _publish(self, status: str, final: bool = False, **fields) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._sequence += 1
+            payload = AnalysisProgressPayload(
+                requestId=self.request_id,
+                analysisType=self.analysis_type,
+                status=status,
+                sequence=self._sequence,
+                final=final,
+                **fields
+            )
+            EventPublisher.publish(
+                EventTopics.ANALYSIS_PROGRESS,
+                create_event(EventTopics.ANALYSIS_PROGRESS, payload),
+                flush=final,
+                key=self.request_id
+            )
+
+    def started(self, message: Optional[str] = None) -> None:
+        self._publish("started", message=message)
+
+    def stage(self, stage: str, processed: Optional[int] = None, total: Optional[int] = None, message: Optional[str] = None) -> None:
+        """단계 시작/진행 상황"""
+        self._publish("running", stage=stage, processed=processed, total=total, message=message)
+
+    def tick(self, stage: str, processed: int, total: Optional[int] = None) -> None:
+        """종목 단위 진행 콜백 - chunk_size개마다(와 마지막에) 한 번만 running 이벤트 발행"""
+        if processed % self.chunk_size == 0 or processed == total or total is None:
+            self.stage(stage, processed=processed, total=total)
+
+    def partial(self, stage: str, results: Iterable[Dict[str, Any]], total: Optional[int] = None) -> None:
+        """결과를 chunk_size개씩 나눠 부분 결과 이벤트로 발행"""
+        if not self.enabled:
+            return
+        results = list(results)
+        processed = 0
+        for start in range(0, len(results), self.chunk_size):
+            chunk = results[start:start + self.chunk_size]
+            processed += len(chunk)
+            with self._lock:
+                chunk_index = self._chunks
+                self._chunks += 1
+            self._publish(
+                "partial", stage=stage, processed=processed,
+                total=total if total is not None else len(results),
+                chunkIndex=chunk_index, results=chunk
+            )
+
+    def completed(self, summary: Optional[Dict[str, Any]] = None, message: Optional[str] = None) -> None:
+        """완료 마커 (부분 결과 청크 수 포함)"""
+        self._publish(
+            "completed", final=True, chunkIndex=self._chunks,
+            results=[summary] if summary else [], message=message
+        )
+
+    def failed(self, error: str) -> None:
+        self._publish("failed", final=True, message=error)
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        """서비스 결과(status=success/failed)에 맞는 최종 마커 발행"""
+        if result.get("status") == "failed":
+            self.failed(result.get("error", ""))
+        else:
+            self.completed(summarize(result))
+
+
+class NullProgressReporter(ProgressReporter):
+    """진행 이벤트를 발행하지 않는 기본 reporter"""
+
+    def __init__(self):
+        super().__init__("", "", chunk_size=1, enabled=False)
+
+
+def summarize(result: Dict[str, Any], exclude: Iterable[str] = ("results", "recommendations", "recommended_by_date")) -> Dict[str, Any]:
+    """완료 마커에 담을 요약 (결과 목록은 부분 결과 이벤트로 이미 전달)"""
+    return {k: v for k, v in result.items() if k not in exclude}
@@ -0,0 +1,374 @@
+"""
+Strategy Backtester - 저장된 daily_stock_data 이력으로 추천 전략을 재생/평가
+
+운영 점수 계산(scoring_engine의 횡단면 composite_score + ScoringEngine 가중 방식/임계값,
+골든크로스 + RSI<50 + MACD 매수 규칙 필터)을 (날짜 × 종목) 행렬에 그대로 적용해
+적중률, 수익률, 낙폭을 계산합니다.
+지표 기간/가중치 그리드 스윕은 프로세스 풀에서 병렬로 실행합니다.
+
+Usage:
+    python -m src.services.backtester --start 2025-01-01 --end 2025-06-30
+    python -m src.services.backtester --start 2025-01-01 --end 2025-06-30 --sweep --workers 8
+"""
+import argparse
+import itertools
+import json
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.core.database import MongoDB
+from src.services.indicator_engine import IndicatorEngine, PriceMatrix, build_price_matrix
+from src.services.scoring_engine import ScoreFrame, ScoringEngine, ScoringParams, cross_sectional_percentile, technical_scores
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+# 기본 스윕 그리드 (지표 파라미터 × 점수 파라미터)
+DEFAULT_GRID = {
+    "sma_short": [10, 20, 30],
+    "sma_long": [50, 100],
+    "rsi_period": [9, 14],
+    "rsi_threshold": [40.0, 50.0, 60.0],
+    "macd_short": [12],
+    "macd_long": [26],
+    "macd_signal": [9],
+    "technical_weight": [0.5, 0.7, 0.9],
+    "score_threshold": [0.5, 0.6, 0.7],
+}
+
+INDICATOR_PARAMS = ("sma_short", "sma_long", "rsi_period", "macd_short", "macd_long", "macd_signal")
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """전략 파라미터 (기본값 = 현재 운영 규칙)"""
+    sma_short: int = 20
+    sma_long: int = 50
+    rsi_period: int = 14
+    rsi_threshold: float = 50.0
+    macd_short: int = 12
+    macd_long: int = 26
+    macd_signal: int = 9
+    technical_weight: float = 0.7
+    score_threshold: float = 0.6
+    scheme: str = "fixed"  # scoring_engine 가중 방식 (WEIGHTING_SCHEMES)
+    # True면 기술적 규칙(3개 조건 모두 충족)을 통과한 종목만 통합 점수로 선정 (운영 플로우와 동일)
+    require_technical_rule: bool = True
+
+    @property
+    def sentiment_weight(self) -> float:
+        return 1.0 - self.technical_weight
+
+    def scoring(self) -> ScoringEngine:
+        """운영과 같은 통합 점수 엔진 (rsi_threshold는 규칙 필터에만 적용)"""
+        return ScoringEngine(ScoringParams(
+            technical_weight=self.technical_weight,
+            sentiment_weight=self.sentiment_weight,
+            score_threshold=self.score_threshold,
+            scheme=self.scheme,
+            require_technical_rule=self.require_technical_rule
+        ))
+
+    def engine(self) -> IndicatorEngine:
+        return IndicatorEngine(
+            sma_short=self.sma_short, sma_long=self.sma_long, rsi_period=self.rsi_period,
+            macd_short=self.macd_short, macd_long=self.macd_long, macd_signal=self.macd_signal
+        )
+
+
+@dataclass
+class BacktestData:
+    """백테스트 입력 (날짜 × 종목 행렬)"""
+    prices: PriceMatrix
+    sentiment: Optional[np.ndarray]  # -1~1, 없으면 NaN. 감정 이력이 전혀 없으면 None
+    article_count: Optional[np.ndarray]  # 감정 점수의 기사 수 (confidence 가중 방식용)
+    start_index: int  # 평가 시작 행 (이전 행은 지표 워밍업 구간)
+
+
+def load_backtest_data(start_date: str, end_date: str, warmup_days: int = 180) -> BacktestData:
+    """
+    daily_stock_data와 sentiment_analysis 이력을 행렬로 불러옵니다.
+
+    Args:
+        start_date: 평가 시작일
+        end_date: 평가 종료일
+        warmup_days: 지표 계산을 위해 시작일 이전에 추가로 읽을 일수
+    """
+    db = MongoDB.get_db()
+    load_start = (datetime.strptime(start_date, "%Y-%m-%d") - timedelta(days=warmup_days)).strftime("%Y-%m-%d")
+
+    docs = db.daily_stock_data.find(
+        {"date": {"$gte": load_start, "$lte": end_date}},
+        {"_id": 0, "date": 1, "stocks": 1}
+    ).sort("date", 1)
+    prices = build_price_matrix(docs)
+
+    sentiment = None
+    article_count = None
+    date_index = {d: i for i, d in enumerate(prices.dates)}
+    ticker_index = {t: j for j, t in enumerate(prices.tickers)}
+    sentiment_docs = list(db.sentiment_analysis.find(
+        {"date": {"$gte": load_start, "$lte": end_date}},
+        {"_id": 0, "ticker": 1, "date": 1, "average_sentiment_score": 1, "article_count": 1}
+    ))
+    if sentiment_docs:
+        sentiment = np.full(prices.values.shape, np.nan)
+        article_count = np.zeros(prices.values.shape)
+        for doc in sentiment_docs:
+            i, j = date_index.get(doc["date"]), ticker_index.get(doc.get("ticker"))
+            if i is not None and j is not None:
+                sentiment[i, j] = float(doc.get("average_sentiment_score", 0.0))
+                article_count[i, j] = float(doc.get("article_count", 0) or 0)
+
+    start_index = int(np.searchsorted(np.array(prices.dates), start_date, side="left"))
+    return BacktestData(prices=prices, sentiment=sentiment, article_count=article_count, start_index=start_index)
+
+
+def forward_returns(values: np.ndarray, horizon: int) -> np.ndarray:
+    """
+    종목별 다음 horizon개 관측치 후의 수익률 (원래 날짜 좌표, 없으면 NaN)
+
+    결측일은 건너뛰고 해당 종목의 다음 관측치 기준으로 계산합니다.
+    """
+    out = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        observed = np.flatnonzero(~np.isnan(values[:, j]))
+        if observed.size <= horizon:
+            continue
+        now, later = observed[:-horizon], observed[horizon:]
+        out[now, j] = values[later, j] / values[now, j] - 1.0
+    return out
+
+
+def strategy_signals(
+    indicators: Dict[str, np.ndarray],
+    sentiment: Optional[np.ndarray],
+    params: StrategyParams,
+    article_count: Optional[np.ndarray] = None,
+    scores: Optional[Dict[str, np.ndarray]] = None
+) -> np.ndarray:
+    """
+    종목 × 날짜 매수 신호 (운영 점수 계산을 날짜별 횡단면으로 적용)
+
+    기술적 점수는 scoring_engine.technical_scores의 composite_score(날짜마다 지표가 있는 종목끼리 표준화)이고,
+    통합 점수/임계값/규칙 필터는 ScoringEngine과 같습니다.
+    감정 값이 없는 칸은 운영과 같이 기술적 점수만으로 계산합니다.
+    scores를 넘기면 (같은 지표로 여러 점수 파라미터를 평가할 때) technical_scores를 다시 계산하지 않습니다.
+    """
+    scores = scores if scores is not None else technical_scores(indicators)
+    analyzed = ~np.isnan(scores["composite_z"])
+    with np.errstate(invalid="ignore"):
+        technical_rule = (
+            (indicators["sma20"] > indicators["sma50"])
+            & (indicators["rsi"] < params.rsi_threshold)
+            & (indicators["macd"] > indicators["signal"])
+        )
+
+    shape = scores["composite_z"].shape
+    if sentiment is None:
+        sentiment = np.full(shape, np.nan)
+    frame = ScoreFrame(
+        tickers=[""] * shape[-1],
+        technical=np.nan_to_num(scores["composite_score"], nan=0.0) / 100.0,
+        technical_percentile=np.nan_to_num(scores["technical_percentile"], nan=0.0),
+        technical_rule=technical_rule,
+        # 운영 분석 대상(지표가 있는 종목) 밖의 감정 값은 백분위 계산에서 제외
+        sentiment=np.where(analyzed, sentiment, np.nan),
+        sentiment_percentile=cross_sectional_percentile(np.where(analyzed, sentiment, np.nan)),
+        article_count=article_count if article_count is not None else np.zeros(shape),
+    )
+
+    scoring = params.scoring()
+    signals = analyzed & (scoring.score(frame) >= params.score_threshold)
+    if params.require_technical_rule:
+        signals &= technical_rule
+    return signals
+
+
+def evaluate(signals: np.ndarray, fwd_horizon: np.ndarray, fwd_next: np.ndarray, start_index: int) -> Dict[str, float]:
+    """
+    신호 성과 지표
+
+    Args:
+        signals: (날짜 × 종목) 매수 신호
+        fwd_horizon: 평가 기간 수익률 (적중률/평균 수익률)
+        fwd_next: 다음 관측치 수익률 (일간 리밸런싱 동일가중 포트폴리오 곡선)
+        start_index: 평가 시작 행
+    """
+    signals = signals[start_index:]
+    fwd_horizon = fwd_horizon[start_index:]
+    fwd_next = fwd_next[start_index:]
+
+    picked = signals & ~np.isnan(fwd_horizon)
+    trade_returns = fwd_horizon[picked]
+
+    # 일간 포트폴리오: 신호 종목 동일가중, 신호 없으면 현금(0)
+    daily_mask = signals & ~np.isnan(fwd_next)
+    counts = daily_mask.sum(axis=1)
+    daily_returns = np.where(counts > 0, np.where(daily_mask, fwd_next, 0.0).sum(axis=1) / np.maximum(counts, 1), 0.0)
+    equity = np.cumprod(1.0 + daily_returns)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0 if equity.size else np.zeros(0)
+
+    # 비교 기준: 전 종목 동일가중
+    universe_returns = fwd_horizon[~np.isnan(fwd_horizon)]
+
+    std = daily_returns.std()
+    return {
+        "signals": int(picked.sum()),
+        "signal_days": int((counts > 0).sum()),
+        "hit_rate": float((trade_returns > 0).mean()) if trade_returns.size else 0.0,
+        "avg_return": float(trade_returns.mean()) if trade_returns.size else 0.0,
+        "cumulative_return": float(equity[-1] - 1.0) if equity.size else 0.0,
+        "max_drawdown": float(drawdown.min()) if drawdown.size else 0.0,
+        "sharpe": float(daily_returns.mean() / std * np.sqrt(TRADING_DAYS_PER_YEAR)) if std > 0 else 0.0,
+        "universe_hit_rate": float((universe_returns > 0).mean()) if universe_returns.size else 0.0,
+        "universe_avg_return": float(universe_returns.mean()) if universe_returns.size else 0.0,
+    }
+
+
+def run_backtest(data: BacktestData, params: StrategyParams, horizon: int = 5) -> Dict[str, Any]:
+    """단일 파라미터 백테스트"""
+    values = data.prices.values
+    indicators = params.engine().compute(values)
+    signals = strategy_signals(indicators, data.sentiment, params, data.article_count)
+    metrics = evaluate(signals, forward_returns(values, horizon), forward_returns(values, 1), data.start_index)
+    return {"params": asdict(params), "horizon": horizon, **metrics}
+
+
+# ============================================================================
+# Parallel Sweep
+# ============================================================================
+
+_worker_data: Optional[BacktestData] = None
+_worker_forward: Dict[int, np.ndarray] = {}
+
+
+def _init_worker(data: BacktestData) -> None:
+    """워커 프로세스당 한 번만 입력 행렬을 전달받음 (작업마다 피클링하지 않음)"""
+    global _worker_data, _worker_forward
+    _worker_data = data
+    _worker_forward = {}
+
+
+def _worker_forward_returns(horizon: int) -> np.ndarray:
+    if horizon not in _worker_forward:
+        _worker_forward[horizon] = forward_returns(_worker_data.prices.values, horizon)
+    return _worker_forward[horizon]
+
+
+def _run_indicator_group(base: StrategyParams, score_variants: List[Dict[str, Any]], horizon: int) -> List[Dict[str, Any]]:
+    """지표 파라미터 하나에 대해 지표를 한 번 계산하고 점수 파라미터 조합을 모두 평가"""
+    data = _worker_data
+    indicators = base.engine().compute(data.prices.values)
+    scores = technical_scores(indicators)
+    fwd_horizon = _worker_forward_returns(horizon)
+    fwd_next = _worker_forward_returns(1)
+
+    results = []
+    for variant in score_variants:
+        params = replace(base, **variant)
+        signals = strategy_signals(indicators, data.sentiment, params, data.article_count, scores)
+        metrics = evaluate(signals, fwd_horizon, fwd_next, data.start_index)
+        results.append({"params": asdict(params), "horizon": horizon, **metrics})
+    return results
+
+
+def run_sweep(
+    data: BacktestData,
+    grid: Optional[Dict[str, List[Any]]] = None,
+    horizon: int = 5,
+    workers: Optional[int] = None,
+    sort_by: str = "sharpe"
+) -> List[Dict[str, Any]]:
+    """
+    파라미터 그리드 스윕을 프로세스 풀에서 실행합니다.
+
+    작업 단위는 지표 파라미터 조합 하나이며, 그 안에서 가중치/임계값 조합을 모두 평가합니다.
+
+    Args:
+        data: 백테스트 입력
+        grid: {파라미터명: 값 목록} (없으면 DEFAULT_GRID)
+        horizon: 평가 보유 기간 (관측치 수)
+        workers: 프로세스 수 (None이면 CPU 수)
+        sort_by: 결과 정렬 기준 지표 (내림차순)
+
+    Returns:
+        파라미터별 성과 목록
+    """
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    indicator_keys = [k for k in grid if k in INDICATOR_PARAMS]
+    score_keys = [k for k in grid if k not in INDICATOR_PARAMS]
+
+    score_variants = [dict(zip(score_keys, combo)) for combo in itertools.product(*(grid[k] for k in score_keys))]
+    groups = []
+    for combo in itertools.product(*(grid[k] for k in indicator_keys)):
+        values = dict(zip(indicator_keys, combo))
+        if values.get("sma_short", 0) >= values.get("sma_long", 1) or values.get("macd_short", 0) >= values.get("macd_long", 1):
+            continue
+        groups.append(StrategyParams(**values))
+
+    logger.info(f"백테스트 스윕: 지표 조합 {len(groups)}개 × 점수 조합 {len(score_variants)}개 = {len(groups) * len(score_variants)}개")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as executor:
+        futures = [executor.submit(_run_indicator_group, base, score_variants, horizon) for base in groups]
+        for future in futures:
+            results.extend(future.result())
+
+    results.sort(key=lambda r: r.get(sort_by, 0.0), reverse=True)
+    return results
+
+
+def save_results(results: List[Dict[str, Any]], run_info: Dict[str, Any]) -> None:
+    """스윕 결과를 backtest_results 컬렉션에 저장합니다."""
+    db = MongoDB.get_db()
+    db.backtest_results.insert_one({**run_info, "results": results, "created_at": datetime.utcnow()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantiq strategy backtester")
+    parser.add_argument("--start", required=True, help="평가 시작일 (YYYY-MM-DD)")
+    parser.add_argument("--end", required=True, help="평가 종료일 (YYYY-MM-DD)")
+    parser.add_argument("--horizon", type=int, default=5, help="보유 기간 (거래일)")
+    parser.add_argument("--sweep", action="store_true", help="DEFAULT_GRID 파라미터 스윕 실행")
+    parser.add_argument("--grid", default=None, help='스윕 그리드 JSON (예: \'{"rsi_threshold": [45, 50]}\')')
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--save", action="store_true", help="결과를 MongoDB backtest_results에 저장")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    started = time.time()
+    data = load_backtest_data(args.start, args.end)
+    logger.info(f"이력 로드 완료: {len(data.prices.dates)}일 × {len(data.prices.tickers)}종목 ({time.time() - started:.1f}초)")
+
+    if args.sweep or args.grid:
+        results = run_sweep(data, json.loads(args.grid) if args.grid else None, args.horizon, args.workers)
+    else:
+        results = [run_backtest(data, StrategyParams(), args.horizon)]
+
+    elapsed = time.time() - started
+    for r in results[:args.top]:
+        p = r["params"]
+        print(
+            f"SMA {p['sma_short']}/{p['sma_long']} RSI{p['rsi_period']}<{p['rsi_threshold']:.0f} "
+            f"MACD {p['macd_short']}/{p['macd_long']}/{p['macd_signal']} w={p['technical_weight']:.2f} th={p['score_threshold']:.2f} | "
+            f"signals={r['signals']} hit={r['hit_rate']:.1%} avg={r['avg_return']:.2%} "
+            f"cum={r['cumulative_return']:.1%} mdd={r['max_drawdown']:.1%} sharpe={r['sharpe']:.2f}"
+        )
+    logger.info(f"백테스트 완료: {len(results)}개 조합, {elapsed:.1f}초")
+
+    if args.save:
+        save_results(results, {"start_date": args.start, "end_date": args.end, "horizon": args.horizon, "duration": elapsed})
+
+
+if __name__ == "__main__":
+    main()
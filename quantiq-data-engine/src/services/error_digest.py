@@ -0,0 +1,95 @@
+"""
+Error Digest - 수집 작업 중 발생한 외부 소스 오류 집계
+
+지표/종목마다 Slack 알림을 보내는 대신 작업 동안 오류를 모아 두었다가
+요청 스레드에 요약 한 건(SlackNotifier.notify_error_digest)으로 보냅니다.
+
+    errors = ErrorDigest("economic_data")
+    errors.record("fred", "GDP", exc, duration=1.2)
+    ...
+    if errors:
+        SlackNotifier.notify_error_digest(request_id, errors.summary(), thread_ts)
+"""
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+# 요약에 담을 최대 샘플/오류 유형 수와 메시지 길이
+MAX_SAMPLES = 5
+MAX_TOP_ERRORS = 3
+MAX_ERROR_CHARS = 200
+
+# 요청 URL(쿼리의 API 키 포함)은 지워서 같은 오류끼리 묶이도록 함
+_URL_PATTERN = re.compile(r"(\s+for url:)?\s*https?://\S+")
+
+
+def normalize_error(error: Any) -> str:
+    """오류 메시지에서 URL을 지우고 길이를 제한 (빈 메시지는 예외 타입 이름)"""
+    message = _URL_PATTERN.sub("", str(error)).strip()
+    return message[:MAX_ERROR_CHARS] or type(error).__name__
+
+
+class ErrorDigest:
+    """
+    작업 하나의 소스별 오류 집계 (thread-safe)
+
+    Args:
+        job: 작업 이름 (요약 제목용)
+        max_samples: 요약에 담을 오류 샘플 수
+    """
+
+    def __init__(self, job: str, max_samples: int = MAX_SAMPLES):
+        self.job = job
+        self.max_samples = max_samples
+        self.started = time.monotonic()
+        self._sources: Dict[str, Dict[str, Any]] = {}
+        self._messages: Counter = Counter()
+        self._samples: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(self, source: str, key: str, error: Any, duration: Optional[float] = None) -> None:
+        """오류 한 건 기록 (source: fred/yahoo/stocks 등, key: 지표 코드/티커)"""
+        message = normalize_error(error)
+        with self._lock:
+            stats = self._sources.setdefault(source, {"count": 0, "keys": set(), "duration_total": 0.0, "duration_max": 0.0})
+            stats["count"] += 1
+            stats["keys"].add(key)
+            if duration is not None:
+                stats["duration_total"] += duration
+                stats["duration_max"] = max(stats["duration_max"], duration)
+            self._messages[message] += 1
+            if len(self._samples) < self.max_samples:
+                self._samples.append({
+                    "source": source,
+                    "key": key,
+                    "error": message,
+                    "duration": round(duration, 3) if duration is not None else None
+                })
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(s["count"] for s in self._sources.values())
+
+    def summary(self) -> Dict[str, Any]:
+        """요약 (JSON 직렬화 가능) - total, 소스별 건수/대상 수/소요 시간, 빈발 오류, 샘플"""
+        with self._lock:
+            return {
+                "job": self.job,
+                "total": sum(s["count"] for s in self._sources.values()),
+                "sources": {
+                    source: {
+                        "count": s["count"],
+                        "keys": len(s["keys"]),
+                        "duration_total": round(s["duration_total"], 3),
+                        "duration_max": round(s["duration_max"], 3)
+                    }
+                    for source, s in self._sources.items()
+                },
+                "top_errors": [
+                    {"error": message, "count": count} for message, count in self._messages.most_common(MAX_TOP_ERRORS)
+                ],
+                "samples": list(self._samples),
+                "elapsed": round(time.monotonic() - self.started, 3)
+            }
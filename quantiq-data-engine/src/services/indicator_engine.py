@@ -0,0 +1,280 @@
+"""
+Indicator Engine - 종목 전체를 한 번에 계산하는 벡터화 기술적 지표 엔진
+
+가격을 (날짜 × 종목) NumPy 행렬 하나로 적재하고 SMA, RSI, MACD, Signal을
+모든 종목에 대해 한 번의 벡터 연산으로 계산합니다.
+지표 조합은 indicator_graph의 실행 계획으로 계산하므로, 추가 지표(볼린저 밴드, ATR 등)를
+요청해도 공유 중간 결과(EMA, diff 등)는 한 번만 계산됩니다.
+
+종목별 상장일/결측일이 달라도 기존 종목별 pandas 계산과 같은 결과가 나오도록,
+각 종목의 유효 관측치를 행렬 아래쪽으로 정렬(bottom-align)한 뒤 계산하고
+원래 날짜 위치로 되돌립니다. 즉, 롤링 윈도우와 EMA는 달력 날짜가 아니라
+"해당 종목의 관측치" 기준으로 진행됩니다.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+RSI_EPSILON = 1e-10
+
+
+@dataclass
+class PriceMatrix:
+    """(날짜 × 종목) 가격 행렬. 값이 없는 칸은 NaN"""
+    dates: List[str]
+    tickers: List[str]
+    values: np.ndarray
+
+    def date_index(self, date: str) -> Optional[int]:
+        """날짜의 행 번호 (없으면 None)"""
+        try:
+            return self.dates.index(date)
+        except ValueError:
+            return None
+
+    def observation_counts(self) -> np.ndarray:
+        """종목별 유효 관측치 수"""
+        return np.count_nonzero(~np.isnan(self.values), axis=0)
+
+
+def extract_close_price(value: Any) -> Optional[float]:
+    """daily_stock_data.stocks 항목에서 종가를 꺼냅니다 (숫자 또는 {"close_price": ...})."""
+    price = value if isinstance(value, (int, float)) else (value or {}).get("close_price")
+    return float(price) if price else None
+
+
+def build_price_matrix(daily_docs: Iterable[Dict[str, Any]]) -> PriceMatrix:
+    """
+    daily_stock_data 문서(날짜 오름차순)로 가격 행렬을 만듭니다.
+
+    Args:
+        daily_docs: {"date": "YYYY-MM-DD", "stocks": {ticker: {"close_price": ...}}} 문서들
+
+    Returns:
+        PriceMatrix
+    """
+    dates: List[str] = []
+    ticker_index: Dict[str, int] = {}
+    rows: List[Dict[int, float]] = []
+
+    for doc in daily_docs:
+        row = {}
+        for ticker, val in doc.get("stocks", {}).items():
+            price = extract_close_price(val)
+            if price is None:
+                continue
+            j = ticker_index.setdefault(ticker, len(ticker_index))
+            row[j] = price
+        dates.append(doc["date"])
+        rows.append(row)
+
+    values = np.full((len(dates), len(ticker_index)), np.nan)
+    for i, row in enumerate(rows):
+        if row:
+            cols = np.fromiter(row.keys(), dtype=np.intp, count=len(row))
+            values[i, cols] = np.fromiter(row.values(), dtype=np.float64, count=len(row))
+
+    return PriceMatrix(dates=dates, tickers=list(ticker_index.keys()), values=values)
+
+
+def build_field_matrix(daily_docs: Iterable[Dict[str, Any]], matrix: PriceMatrix, key: str) -> np.ndarray:
+    """
+    종가 행렬과 같은 (날짜 × 종목) 좌표로 다른 필드(high_price, volume 등)의 행렬을 만듭니다.
+
+    Args:
+        daily_docs: build_price_matrix()에 넘긴 것과 같은 문서들
+        matrix: 기준 종가 행렬
+        key: daily_stock_data.stocks[ticker]의 필드명
+
+    Returns:
+        값이 없는 칸은 NaN인 행렬
+    """
+    date_rows = {date: i for i, date in enumerate(matrix.dates)}
+    ticker_cols = {ticker: j for j, ticker in enumerate(matrix.tickers)}
+    values = np.full(matrix.values.shape, np.nan)
+
+    for doc in daily_docs:
+        i = date_rows.get(doc["date"])
+        if i is None:
+            continue
+        for ticker, val in doc.get("stocks", {}).items():
+            j = ticker_cols.get(ticker)
+            field = val.get(key) if isinstance(val, dict) else None
+            if j is not None and field is not None:
+                values[i, j] = float(field)
+
+    return values
+
+
+# ============================================================================
+# Alignment
+# ============================================================================
+
+def bottom_align(values: np.ndarray) -> tuple:
+    """
+    종목별 유효 관측치를 순서를 유지한 채 열의 아래쪽으로 모읍니다.
+
+    Returns:
+        (aligned, order): aligned는 위쪽이 NaN으로 채워진 행렬,
+        order는 restore()에 넘길 행 재배치 인덱스
+    """
+    order = np.argsort(~np.isnan(values), axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def restore(aligned: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """bottom_align()으로 정렬한 결과를 원래 날짜 위치로 되돌립니다."""
+    out = np.empty_like(aligned)
+    np.put_along_axis(out, order, aligned, axis=0)
+    return out
+
+
+# ============================================================================
+# Vectorized Indicators (열 = 종목, 행 = 관측치)
+# ============================================================================
+
+def rolling_mean(x: np.ndarray, period: int) -> np.ndarray:
+    """단순 이동평균 (pandas rolling(period, min_periods=period).mean()과 동일)"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] < period:
+        return out
+
+    valid = ~np.isnan(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=0)
+    ccount = np.cumsum(valid, axis=0)
+
+    window_sum = csum[period - 1:].copy()
+    window_sum[1:] -= csum[:-period]
+    window_count = ccount[period - 1:].copy()
+    window_count[1:] -= ccount[:-period]
+
+    out[period - 1:] = np.where(window_count == period, window_sum / period, np.nan)
+    return out
+
+
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """지수 이동평균 (pandas ewm(span, adjust=False).mean()과 동일, 첫 유효값에서 시작)"""
+    alpha = 2.0 / (span + 1.0)
+    out = np.full(x.shape, np.nan)
+    prev = np.full(x.shape[1:], np.nan)
+
+    for t in range(x.shape[0]):
+        xt = x[t]
+        updated = np.where(np.isnan(prev), xt, alpha * xt + (1.0 - alpha) * prev)
+        prev = np.where(np.isnan(xt), prev, updated)
+        out[t] = prev
+
+    return out
+
+
+def rsi(x: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI (단순 이동평균 기반, TechnicalAnalysisService.calculate_rsi와 동일)"""
+    delta = np.full(x.shape, np.nan)
+    delta[1:] = x[1:] - x[:-1]
+
+    valid = ~np.isnan(x)
+    # 첫 관측치의 diff는 NaN이지만 pandas where()는 이를 0으로 취급하므로 동일하게 처리
+    gain = np.where(valid, np.where(delta > 0, delta, 0.0), np.nan)
+    loss = np.where(valid, np.where(delta < 0, -delta, 0.0), np.nan)
+
+    avg_gain = rolling_mean(gain, period)
+    avg_loss = rolling_mean(loss, period)
+
+    rs = avg_gain / (avg_loss + RSI_EPSILON)
+    rs[np.isinf(rs)] = np.nan
+    return np.clip(100.0 - (100.0 / (1.0 + rs)), 0.0, 100.0)
+
+
+def macd(x: np.ndarray, short_period: int = 12, long_period: int = 26, signal_period: int = 9) -> tuple:
+    """MACD와 Signal (adjust=False EMA)"""
+    macd_line = ema(x, short_period) - ema(x, long_period)
+    return macd_line, ema(macd_line, signal_period)
+
+
+# ============================================================================
+# Engine
+# ============================================================================
+
+class IndicatorEngine:
+    """SMA20/SMA50/RSI/MACD/Signal(+ 추가 지표)을 전 종목에 대해 한 번에 계산"""
+
+    def __init__(
+        self,
+        sma_short: int = 20,
+        sma_long: int = 50,
+        rsi_period: int = 14,
+        macd_short: int = 12,
+        macd_long: int = 26,
+        macd_signal: int = 9,
+        extra_indicators: Iterable[str] = ()
+    ):
+        # indicator_graph가 이 모듈의 연산을 사용하므로 순환 import를 피해 여기서 import
+        from src.services import indicator_graph as graph
+
+        self.sma_short = sma_short
+        self.sma_long = sma_long
+        self.rsi_period = rsi_period
+        self.macd_short = macd_short
+        self.macd_long = macd_long
+        self.macd_signal = macd_signal
+        self.extra_indicators = list(extra_indicators)
+
+        outputs = {
+            "sma20": graph.sma_indicator(sma_short),
+            "sma50": graph.sma_indicator(sma_long),
+            "rsi": graph.rsi_indicator(rsi_period),
+            "macd": graph.macd_indicator(macd_short, macd_long),
+            "signal": graph.macd_signal_indicator(macd_short, macd_long, macd_signal),
+        }
+        for spec in self.extra_indicators:
+            outputs[graph.indicator_key(spec)] = graph.parse_indicator(spec)
+        self.plan = graph.IndicatorPlan(outputs)
+
+    def config(self) -> Dict[str, Any]:
+        """생성자 인자 (다른 프로세스에서 같은 엔진을 다시 만들 때 사용)"""
+        return {
+            "sma_short": self.sma_short,
+            "sma_long": self.sma_long,
+            "rsi_period": self.rsi_period,
+            "macd_short": self.macd_short,
+            "macd_long": self.macd_long,
+            "macd_signal": self.macd_signal,
+            "extra_indicators": list(self.extra_indicators),
+        }
+
+    @property
+    def input_fields(self) -> List[str]:
+        """종가 외에 필요한 daily_stock_data 필드 (예: high_price, volume)"""
+        from src.services.indicator_graph import INPUT_FIELDS
+        return sorted(INPUT_FIELDS[name] for name in self.plan.inputs if name != "close")
+
+    def compute_aligned(self, aligned: np.ndarray, extra_inputs: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """bottom-align된 가격 행렬로 지표를 계산합니다 (결과도 aligned 좌표)."""
+        return self.plan.execute({"close": aligned, **(extra_inputs or {})})
+
+    def compute(self, values: np.ndarray, extra_inputs: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        (날짜 × 종목) 가격 행렬의 모든 지표를 계산합니다.
+
+        Args:
+            values: 종가 행렬
+            extra_inputs: {"high": 행렬, "low": 행렬, "volume": 행렬, ...} (values와 같은 좌표)
+
+        Returns:
+            {"sma20", "sma50", "rsi", "macd", "signal", 추가 지표...} → 원래 날짜 좌표의 (날짜 × 종목) 행렬.
+            종목의 가격이 없는 날짜는 NaN
+        """
+        aligned, order = bottom_align(values)
+        aligned_inputs = {
+            name: np.take_along_axis(matrix, order, axis=0)
+            for name, matrix in (extra_inputs or {}).items()
+        }
+        results = self.compute_aligned(aligned, aligned_inputs)
+        missing = np.isnan(values)
+        restored = {}
+        for name, matrix in results.items():
+            out = restore(matrix, order)
+            out[missing] = np.nan
+            restored[name] = out
+        return restored
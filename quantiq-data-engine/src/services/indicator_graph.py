@@ -0,0 +1,401 @@
+"""
+Indicator Graph - 선언형 지표 레지스트리와 실행 계획
+
+각 지표는 입력(가격 필드 또는 다른 중간 결과)과 파라미터로 이루어진 Node 그래프로 선언합니다.
+IndicatorPlan은 요청된 지표들의 그래프를 합쳐 같은 (연산, 입력, 파라미터) 노드를 하나로 합치고
+위상 순서대로 한 번씩만 계산합니다. 예를 들어 MACD와 다른 오실레이터가 같은 EMA를 쓰거나
+RSI와 모멘텀이 같은 diff를 쓰면 해당 중간 결과는 실행당 한 번만 계산됩니다.
+
+모든 연산은 indicator_engine과 같은 bottom-align 좌표(열 = 종목, 행 = 해당 종목의 관측치)에서 동작합니다.
+
+새 지표 추가:
+    @register_indicator("my_indicator")
+    def my_indicator(period: int = 10) -> Node:
+        return sma(diff(CLOSE), period)
+"""
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+from src.services.indicator_engine import RSI_EPSILON, ema as ema_values, rolling_mean
+
+# 가격 입력 필드 → daily_stock_data.stocks[ticker]의 키
+INPUT_FIELDS = {
+    "close": "close_price",
+    "open": "open_price",
+    "high": "high_price",
+    "low": "low_price",
+    "volume": "volume",
+}
+
+
+@dataclass(frozen=True)
+class Node:
+    """계산 그래프 노드. (op, inputs, params)가 같으면 같은 노드로 취급"""
+    op: str
+    inputs: Tuple["Node", ...] = ()
+    params: Tuple[Any, ...] = ()
+
+    def __repr__(self) -> str:
+        if self.op == "input":
+            return self.params[0]
+        args = [repr(n) for n in self.inputs] + [str(p) for p in self.params]
+        return f"{self.op}({', '.join(args)})"
+
+
+def source(field: str) -> Node:
+    if field not in INPUT_FIELDS:
+        raise ValueError(f"Unknown input field: {field}")
+    return Node("input", params=(field,))
+
+
+CLOSE = source("close")
+HIGH = source("high")
+LOW = source("low")
+VOLUME = source("volume")
+
+
+# ============================================================================
+# Operations (열 = 종목, 행 = 관측치)
+# ============================================================================
+
+def _lag(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[0]:
+        out[periods:] = x[:-periods]
+    return out
+
+
+def _rolling_reduce(x: np.ndarray, period: int, reducer: Callable) -> np.ndarray:
+    """윈도우 안에 NaN이 하나라도 있으면 NaN (min_periods=period와 동일)"""
+    out = np.full(x.shape, np.nan)
+    if x.shape[0] < period:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, period, axis=0)
+    out[period - 1:] = reducer(windows, axis=-1)
+    return out
+
+
+def _rolling_std(x: np.ndarray, period: int) -> np.ndarray:
+    """표본 표준편차 (pandas rolling(period).std()와 동일, ddof=1)"""
+    # 종목별 기준값을 빼서 E[x²] - E[x]² 계산의 자릿수 손실을 줄임
+    reference = np.nanmean(x, axis=0) if np.any(~np.isnan(x)) else 0.0
+    centered = x - np.nan_to_num(reference)
+    mean = rolling_mean(centered, period)
+    mean_sq = rolling_mean(centered * centered, period)
+    var = np.clip(mean_sq - mean * mean, 0.0, None) * period / (period - 1)
+    return np.sqrt(var)
+
+
+def _gain(delta: np.ndarray, x: np.ndarray) -> np.ndarray:
+    # 첫 관측치의 diff는 NaN이지만 pandas where()는 0으로 취급하므로 동일하게 처리 (indicator_engine.rsi)
+    return np.where(~np.isnan(x), np.where(delta > 0, delta, 0.0), np.nan)
+
+
+def _loss(delta: np.ndarray, x: np.ndarray) -> np.ndarray:
+    return np.where(~np.isnan(x), np.where(delta < 0, -delta, 0.0), np.nan)
+
+
+def _rsi_from(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    rs = avg_gain / (avg_loss + RSI_EPSILON)
+    rs[np.isinf(rs)] = np.nan
+    return np.clip(100.0 - (100.0 / (1.0 + rs)), 0.0, 100.0)
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, prev_close: np.ndarray) -> np.ndarray:
+    ranges = np.stack([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    # 첫 관측치는 직전 종가가 없으므로 고가 - 저가
+    return np.where(np.isnan(prev_close), high - low, np.max(ranges, axis=0))
+
+
+def _on_balance_volume(delta: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    signed = np.where(np.isnan(delta) | np.isnan(volume), 0.0, np.sign(delta) * volume)
+    out = np.cumsum(signed, axis=0)
+    out[np.isnan(volume)] = np.nan
+    return out
+
+
+def _divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = a / b
+    out[~np.isfinite(out)] = np.nan
+    return out
+
+
+OPERATIONS: Dict[str, Callable[..., np.ndarray]] = {
+    "diff": lambda x: x - _lag(x, 1),
+    "lag": _lag,
+    "sma": rolling_mean,
+    "ema": ema_values,
+    "std": _rolling_std,
+    "max": lambda x, period: _rolling_reduce(x, period, np.max),
+    "min": lambda x, period: _rolling_reduce(x, period, np.min),
+    "gain": _gain,
+    "loss": _loss,
+    "rsi_from": _rsi_from,
+    "true_range": _true_range,
+    "obv": _on_balance_volume,
+    "add": lambda a, b: a + b,
+    "sub": lambda a, b: a - b,
+    "scale": lambda x, factor: x * factor,
+    "div": _divide,
+}
+
+
+def _op(name: str, *inputs: Node, params: Tuple[Any, ...] = ()) -> Node:
+    return Node(name, tuple(inputs), tuple(params))
+
+
+def diff(x: Node) -> Node:
+    return _op("diff", x)
+
+
+def lag(x: Node, periods: int = 1) -> Node:
+    return _op("lag", x, params=(periods,))
+
+
+def sma(x: Node, period: int) -> Node:
+    return _op("sma", x, params=(period,))
+
+
+def ema(x: Node, span: int) -> Node:
+    return _op("ema", x, params=(span,))
+
+
+def rolling_std(x: Node, period: int) -> Node:
+    return _op("std", x, params=(period,))
+
+
+def rolling_max(x: Node, period: int) -> Node:
+    return _op("max", x, params=(period,))
+
+
+def rolling_min(x: Node, period: int) -> Node:
+    return _op("min", x, params=(period,))
+
+
+def add(a: Node, b: Node) -> Node:
+    return _op("add", a, b)
+
+
+def sub(a: Node, b: Node) -> Node:
+    return _op("sub", a, b)
+
+
+def scale(x: Node, factor: float) -> Node:
+    return _op("scale", x, params=(float(factor),))
+
+
+def div(a: Node, b: Node) -> Node:
+    return _op("div", a, b)
+
+
+# ============================================================================
+# Indicator Registry
+# ============================================================================
+
+INDICATORS: Dict[str, Callable[..., Node]] = {}
+
+
+def register_indicator(name: str):
+    """지표 빌더 등록 데코레이터. 빌더는 파라미터를 받아 Node를 반환"""
+    def decorator(builder: Callable[..., Node]) -> Callable[..., Node]:
+        INDICATORS[name] = builder
+        return builder
+    return decorator
+
+
+@register_indicator("sma")
+def sma_indicator(period: int = 20) -> Node:
+    return sma(CLOSE, period)
+
+
+@register_indicator("ema")
+def ema_indicator(span: int = 20) -> Node:
+    return ema(CLOSE, span)
+
+
+@register_indicator("rsi")
+def rsi_indicator(period: int = 14) -> Node:
+    delta = diff(CLOSE)
+    return _op("rsi_from", sma(_op("gain", delta, CLOSE), period), sma(_op("loss", delta, CLOSE), period))
+
+
+@register_indicator("momentum")
+def momentum_indicator(period: int = 10) -> Node:
+    return sub(CLOSE, lag(CLOSE, period)) if period > 1 else diff(CLOSE)
+
+
+@register_indicator("macd")
+def macd_indicator(short_period: int = 12, long_period: int = 26) -> Node:
+    return sub(ema(CLOSE, short_period), ema(CLOSE, long_period))
+
+
+@register_indicator("macd_signal")
+def macd_signal_indicator(short_period: int = 12, long_period: int = 26, signal_period: int = 9) -> Node:
+    return ema(macd_indicator(short_period, long_period), signal_period)
+
+
+@register_indicator("macd_histogram")
+def macd_histogram_indicator(short_period: int = 12, long_period: int = 26, signal_period: int = 9) -> Node:
+    line = macd_indicator(short_period, long_period)
+    return sub(line, ema(line, signal_period))
+
+
+@register_indicator("bollinger_upper")
+def bollinger_upper_indicator(period: int = 20, k: float = 2.0) -> Node:
+    return add(sma(CLOSE, period), scale(rolling_std(CLOSE, period), k))
+
+
+@register_indicator("bollinger_lower")
+def bollinger_lower_indicator(period: int = 20, k: float = 2.0) -> Node:
+    return sub(sma(CLOSE, period), scale(rolling_std(CLOSE, period), k))
+
+
+@register_indicator("bollinger_percent_b")
+def bollinger_percent_b_indicator(period: int = 20, k: float = 2.0) -> Node:
+    lower = bollinger_lower_indicator(period, k)
+    return div(sub(CLOSE, lower), sub(bollinger_upper_indicator(period, k), lower))
+
+
+@register_indicator("atr")
+def atr_indicator(period: int = 14) -> Node:
+    """Average True Range (True Range의 단순 이동평균)"""
+    return sma(_op("true_range", HIGH, LOW, lag(CLOSE, 1)), period)
+
+
+@register_indicator("stoch_k")
+def stoch_k_indicator(period: int = 14) -> Node:
+    lowest = rolling_min(LOW, period)
+    return scale(div(sub(CLOSE, lowest), sub(rolling_max(HIGH, period), lowest)), 100.0)
+
+
+@register_indicator("stoch_d")
+def stoch_d_indicator(period: int = 14, smooth: int = 3) -> Node:
+    return sma(stoch_k_indicator(period), smooth)
+
+
+@register_indicator("obv")
+def obv_indicator() -> Node:
+    return _op("obv", diff(CLOSE), VOLUME)
+
+
+@register_indicator("volume_sma")
+def volume_sma_indicator(period: int = 20) -> Node:
+    return sma(VOLUME, period)
+
+
+@register_indicator("volume_ratio")
+def volume_ratio_indicator(period: int = 20) -> Node:
+    """당일 거래량 / 거래량 이동평균"""
+    return div(VOLUME, sma(VOLUME, period))
+
+
+_SPEC_PATTERN = re.compile(r"^\s*([a-z_][a-z0-9_]*)\s*(?:\((.*)\))?\s*$")
+
+
+def parse_indicator(spec: str) -> Node:
+    """
+    "atr", "atr(21)", "bollinger_upper(20, 2.5)" 형식의 지표 명세를 Node로 변환합니다.
+
+    Raises:
+        ValueError: 등록되지 않은 지표이거나 형식이 잘못된 경우
+    """
+    match = _SPEC_PATTERN.match(spec)
+    if not match or match.group(1) not in INDICATORS:
+        raise ValueError(f"Unknown indicator: {spec} (available: {', '.join(sorted(INDICATORS))})")
+
+    args = []
+    for token in (match.group(2) or "").split(","):
+        token = token.strip()
+        if token:
+            args.append(float(token) if "." in token else int(token))
+    return INDICATORS[match.group(1)](*args)
+
+
+# ============================================================================
+# Planner
+# ============================================================================
+
+class IndicatorPlan:
+    """
+    요청된 지표들의 실행 계획.
+
+    그래프를 합쳐 중복 노드를 제거하고 위상 순서로 정렬합니다.
+    execute()는 실행마다 중간 결과 캐시를 새로 만들어 각 노드를 한 번씩만 계산합니다.
+    """
+
+    def __init__(self, outputs: Dict[str, Node]):
+        self.outputs = dict(outputs)
+        self.steps: List[Node] = []
+        seen: Set[Node] = set()
+
+        def visit(node: Node) -> None:
+            if node in seen:
+                return
+            for child in node.inputs:
+                visit(child)
+            seen.add(node)
+            self.steps.append(node)
+
+        for node in self.outputs.values():
+            visit(node)
+
+    @property
+    def inputs(self) -> Set[str]:
+        """계획에 필요한 가격 입력 필드"""
+        return {node.params[0] for node in self.steps if node.op == "input"}
+
+    def stats(self) -> Dict[str, int]:
+        """중복 제거 효과 (지표별로 따로 계산했을 때의 연산 수 대비)"""
+        def count(node: Node) -> int:
+            return (0 if node.op == "input" else 1) + sum(count(child) for child in node.inputs)
+
+        return {
+            "indicators": len(self.outputs),
+            "naive_operations": sum(count(node) for node in self.outputs.values()),
+            "planned_operations": sum(1 for node in self.steps if node.op != "input"),
+        }
+
+    def execute(self, inputs: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        계획을 실행합니다.
+
+        Args:
+            inputs: {"close": 행렬, "high": 행렬, ...} (bottom-align 좌표, 같은 shape)
+
+        Returns:
+            {지표 이름: 행렬}
+
+        Raises:
+            ValueError: 필요한 입력 필드가 없는 경우
+        """
+        missing = self.inputs - inputs.keys()
+        if missing:
+            raise ValueError(f"Missing indicator inputs: {sorted(missing)}")
+
+        cache: Dict[Node, np.ndarray] = {}
+        for node in self.steps:
+            if node.op == "input":
+                cache[node] = inputs[node.params[0]]
+            else:
+                cache[node] = OPERATIONS[node.op](*(cache[child] for child in node.inputs), *node.params)
+
+        return {name: cache[node] for name, node in self.outputs.items()}
+
+
+def split_specs(value: str) -> List[str]:
+    """"atr(14), bollinger_upper(20, 2.5), obv" 같은 목록을 괄호 안 콤마를 무시하고 나눕니다."""
+    return [m.group(0).replace(" ", "") for m in re.finditer(r"[a-z_][a-z0-9_]*(?:\([^)]*\))?", value or "")]
+
+
+def indicator_key(spec: str) -> str:
+    """결과/MongoDB 필드명으로 쓸 키 ("bollinger_upper(20, 2.5)" → "bollinger_upper_20_2_5")"""
+    return re.sub(r"[^a-z0-9]+", "_", spec.lower()).strip("_")
+
+
+def build_plan(specs: Iterable[str]) -> IndicatorPlan:
+    """지표 명세 목록으로 실행 계획을 만듭니다 (결과 키는 indicator_key)."""
+    return IndicatorPlan({indicator_key(spec): parse_indicator(spec) for spec in specs})
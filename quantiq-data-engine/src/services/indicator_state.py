@@ -0,0 +1,423 @@
+"""
+Incremental Indicator State - 종목별 지표 상태를 저장해 하루 한 봉씩 전진
+
+매 실행마다 180일치 롤링 윈도우/EMA를 다시 계산하는 대신, 종목별로
+- SMA20/SMA50 롤링 합계와 최근 종가 링 버퍼
+- RSI 평균 상승/하락폭(롤링 합계)과 최근 상승/하락 링 버퍼
+- MACD 단기/장기 EMA와 Signal EMA
+를 MongoDB indicator_state 컬렉션에 보관하고, 새 봉이 들어오면 O(1)로 갱신합니다.
+
+상태는 종목 전체에 대한 NumPy 배열(IndicatorStateBook)로 들고 있으므로
+여러 종목을 한 번의 벡터 연산으로 전진시킬 수 있습니다.
+
+Note:
+    SMA/RSI는 전체 재계산과 정확히 같습니다. EMA는 시작 시점이 전체 재계산의
+    조회 구간(180일) 시작보다 이르므로 초기값의 영향만큼(약 1e-4 수준) 차이가 나며,
+    verify()는 이를 감안한 허용 오차로 비교합니다.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from pymongo import DeleteMany, ReplaceOne
+
+from src.core.database import MongoDB
+from src.services.indicator_engine import RSI_EPSILON, IndicatorEngine, build_price_matrix
+
+logger = logging.getLogger(__name__)
+
+STATE_COLLECTION = "indicator_state"
+MIN_OBSERVATIONS = 50
+
+# verify() 허용 오차: SMA/RSI는 재계산과 동일해야 하고, EMA 계열은 시작점 차이를 허용
+EXACT_TOLERANCE = 1e-6
+EMA_RELATIVE_TOLERANCE = 1e-3
+
+
+class IndicatorStateBook:
+    """종목별 지표 상태 (종목 = 행)"""
+
+    def __init__(self, tickers: Iterable[str], engine: IndicatorEngine):
+        if engine.sma_short > engine.sma_long:
+            raise ValueError("sma_short must not exceed sma_long")
+
+        self.engine = engine
+        self.tickers: List[str] = list(tickers)
+        self.index: Dict[str, int] = {t: i for i, t in enumerate(self.tickers)}
+        n = len(self.tickers)
+
+        self.closes = np.full((n, engine.sma_long), np.nan)
+        self.gains = np.zeros((n, engine.rsi_period))
+        self.losses = np.zeros((n, engine.rsi_period))
+        self.count = np.zeros(n, dtype=np.int64)
+        self.sum_short = np.zeros(n)
+        self.sum_long = np.zeros(n)
+        self.sum_gain = np.zeros(n)
+        self.sum_loss = np.zeros(n)
+        self.ema_short = np.full(n, np.nan)
+        self.ema_long = np.full(n, np.nan)
+        self.signal = np.full(n, np.nan)
+        self.last_close = np.full(n, np.nan)
+        self.as_of = np.full(n, "", dtype="U10")
+
+    @property
+    def params(self) -> Dict[str, int]:
+        """상태를 만든 지표 파라미터 (다르면 상태를 재사용할 수 없음)"""
+        e = self.engine
+        return {
+            "sma_short": e.sma_short, "sma_long": e.sma_long, "rsi_period": e.rsi_period,
+            "macd_short": e.macd_short, "macd_long": e.macd_long, "macd_signal": e.macd_signal
+        }
+
+    def reset(self, rows: np.ndarray) -> None:
+        """지정한 종목의 상태를 초기화합니다 (재시드용)."""
+        self.closes[rows] = np.nan
+        self.gains[rows] = 0.0
+        self.losses[rows] = 0.0
+        self.count[rows] = 0
+        for arr in (self.sum_short, self.sum_long, self.sum_gain, self.sum_loss):
+            arr[rows] = 0.0
+        for arr in (self.ema_short, self.ema_long, self.signal, self.last_close):
+            arr[rows] = np.nan
+        self.as_of[rows] = ""
+
+    def advance(self, rows: np.ndarray, closes: np.ndarray, date: Optional[str] = None, commit: bool = True) -> Dict[str, np.ndarray]:
+        """
+        종목들을 한 봉씩 전진시킵니다.
+
+        Args:
+            rows: 종목 행 번호 배열
+            closes: 각 종목의 새 종가
+            date: 봉 날짜 (commit 시 as_of로 기록)
+            commit: False면 상태를 바꾸지 않고 전진했을 때의 지표만 계산 (장중 미리보기)
+
+        Returns:
+            {"sma20", "sma50", "rsi", "macd", "signal"} → 각 종목의 새 지표 값
+        """
+        e = self.engine
+        rows = np.asarray(rows, dtype=np.intp)
+        closes = np.asarray(closes, dtype=np.float64)
+        k = self.count[rows]
+        started = k > 0
+
+        # SMA: 링 버퍼에서 윈도우를 벗어나는 종가를 빼고 새 종가를 더함
+        long_slot = k % e.sma_long
+        short_slot = (k - e.sma_short) % e.sma_long
+        out_long = np.where(k >= e.sma_long, self.closes[rows, long_slot], 0.0)
+        out_short = np.where(k >= e.sma_short, self.closes[rows, short_slot], 0.0)
+        sum_long = self.sum_long[rows] + closes - out_long
+        sum_short = self.sum_short[rows] + closes - out_short
+
+        # RSI: 첫 관측치의 변화량은 0 (전체 재계산과 동일)
+        delta = np.where(started, closes - self.last_close[rows], 0.0)
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        rsi_slot = k % e.rsi_period
+        full_rsi = k >= e.rsi_period
+        sum_gain = self.sum_gain[rows] + gain - np.where(full_rsi, self.gains[rows, rsi_slot], 0.0)
+        sum_loss = self.sum_loss[rows] + loss - np.where(full_rsi, self.losses[rows, rsi_slot], 0.0)
+
+        # MACD: adjust=False EMA, 첫 관측치에서 시작
+        a_short = 2.0 / (e.macd_short + 1.0)
+        a_long = 2.0 / (e.macd_long + 1.0)
+        a_signal = 2.0 / (e.macd_signal + 1.0)
+        ema_short = np.where(started, a_short * closes + (1 - a_short) * self.ema_short[rows], closes)
+        ema_long = np.where(started, a_long * closes + (1 - a_long) * self.ema_long[rows], closes)
+        macd_line = ema_short - ema_long
+        signal = np.where(started, a_signal * macd_line + (1 - a_signal) * self.signal[rows], macd_line)
+
+        count = k + 1
+        if commit:
+            self.closes[rows, long_slot] = closes
+            self.gains[rows, rsi_slot] = gain
+            self.losses[rows, rsi_slot] = loss
+            self.sum_long[rows] = sum_long
+            self.sum_short[rows] = sum_short
+            self.sum_gain[rows] = sum_gain
+            self.sum_loss[rows] = sum_loss
+            self.ema_short[rows] = ema_short
+            self.ema_long[rows] = ema_long
+            self.signal[rows] = signal
+            self.last_close[rows] = closes
+            self.count[rows] = count
+            if date is not None:
+                self.as_of[rows] = date
+
+        return self._indicators(count, sum_short, sum_long, sum_gain, sum_loss, macd_line, signal)
+
+    def current(self, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """현재 상태의 지표 값"""
+        rows = np.asarray(rows, dtype=np.intp)
+        macd_line = self.ema_short[rows] - self.ema_long[rows]
+        return self._indicators(
+            self.count[rows], self.sum_short[rows], self.sum_long[rows],
+            self.sum_gain[rows], self.sum_loss[rows], macd_line, self.signal[rows]
+        )
+
+    def _indicators(self, count, sum_short, sum_long, sum_gain, sum_loss, macd_line, signal) -> Dict[str, np.ndarray]:
+        e = self.engine
+        avg_gain = sum_gain / e.rsi_period
+        avg_loss = sum_loss / e.rsi_period
+        rsi = np.clip(100.0 - 100.0 / (1.0 + avg_gain / (avg_loss + RSI_EPSILON)), 0.0, 100.0)
+        return {
+            "sma20": np.where(count >= e.sma_short, sum_short / e.sma_short, np.nan),
+            "sma50": np.where(count >= e.sma_long, sum_long / e.sma_long, np.nan),
+            "rsi": np.where(count >= e.rsi_period, rsi, np.nan),
+            "macd": macd_line,
+            "signal": signal,
+        }
+
+    def seed(self, rows: np.ndarray, dates: List[str], values: np.ndarray) -> None:
+        """
+        가격 이력으로 종목 상태를 처음부터 만듭니다.
+
+        Args:
+            rows: 종목 행 번호 배열
+            dates: values의 행 날짜 (오름차순)
+            values: (날짜 × len(rows)) 가격 행렬, 결측은 NaN
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        self.reset(rows)
+        for t in range(values.shape[0]):
+            mask = ~np.isnan(values[t])
+            if mask.any():
+                self.advance(rows[mask], values[t, mask])
+        # 종목별 마지막 관측 날짜를 as_of로 기록
+        observed = ~np.isnan(values)
+        has_any = observed.any(axis=0)
+        last_idx = values.shape[0] - 1 - np.argmax(observed[::-1], axis=0)
+        self.as_of[rows[has_any]] = np.asarray(dates, dtype="U10")[last_idx[has_any]]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_document(self, row: int) -> Dict[str, Any]:
+        """종목 상태를 MongoDB 문서로 변환합니다."""
+        return {
+            "ticker": self.tickers[row],
+            "as_of_date": self.as_of[row],
+            "params": self.params,
+            "count": int(self.count[row]),
+            "closes": self.closes[row].tolist(),
+            "gains": self.gains[row].tolist(),
+            "losses": self.losses[row].tolist(),
+            "sum_short": float(self.sum_short[row]),
+            "sum_long": float(self.sum_long[row]),
+            "sum_gain": float(self.sum_gain[row]),
+            "sum_loss": float(self.sum_loss[row]),
+            "ema_short": float(self.ema_short[row]),
+            "ema_long": float(self.ema_long[row]),
+            "signal": float(self.signal[row]),
+            "last_close": float(self.last_close[row]),
+            "updated_at": datetime.utcnow()
+        }
+
+    @classmethod
+    def from_documents(cls, docs: List[Dict[str, Any]], engine: IndicatorEngine, tickers: Iterable[str] = ()) -> "IndicatorStateBook":
+        """
+        MongoDB 문서로 상태를 복원합니다.
+
+        Args:
+            docs: indicator_state 문서들 (파라미터가 engine과 다른 문서는 무시)
+            engine: 지표 파라미터
+            tickers: 문서가 없어도 행을 만들 종목 (빈 상태)
+        """
+        book_tickers = list(dict.fromkeys([d["ticker"] for d in docs] + list(tickers)))
+        book = cls(book_tickers, engine)
+        for doc in docs:
+            if doc.get("params") != book.params:
+                continue
+            i = book.index[doc["ticker"]]
+            book.as_of[i] = doc.get("as_of_date", "")
+            book.count[i] = doc["count"]
+            book.closes[i] = doc["closes"]
+            book.gains[i] = doc["gains"]
+            book.losses[i] = doc["losses"]
+            book.sum_short[i] = doc["sum_short"]
+            book.sum_long[i] = doc["sum_long"]
+            book.sum_gain[i] = doc["sum_gain"]
+            book.sum_loss[i] = doc["sum_loss"]
+            book.ema_short[i] = doc["ema_short"]
+            book.ema_long[i] = doc["ema_long"]
+            book.signal[i] = doc["signal"]
+            book.last_close[i] = doc["last_close"]
+        return book
+
+
+class IncrementalIndicatorService:
+    """indicator_state를 하루씩 전진시켜 대상 날짜의 지표를 계산"""
+
+    def __init__(self, engine: Optional[IndicatorEngine] = None, lookback_days: int = 180):
+        self.engine = engine or IndicatorEngine()
+        self.lookback_days = lookback_days
+
+    def load_book(self, tickers: Iterable[str] = ()) -> IndicatorStateBook:
+        """저장된 상태를 모두 불러옵니다."""
+        db = MongoDB.get_db()
+        docs = list(db[STATE_COLLECTION].find({}, {"_id": 0}))
+        return IndicatorStateBook.from_documents(docs, self.engine, tickers)
+
+    def advance_to(self, target_date: str) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        상태를 target_date까지 전진시키고 그날의 지표를 반환합니다.
+
+        상태가 없거나 조회 구간보다 오래된 종목은 조회 구간 이력으로 시드합니다.
+        이미 target_date까지 전진했지만 그날 종가가 상태에 반영된 값과 달라진 종목(데이터 정정/재수집)도
+        다시 시드합니다.
+        이미 target_date 이후로 전진한 종목이 있으면(과거 날짜 재분석) None을 반환하며,
+        호출자는 전체 재계산 경로를 사용해야 합니다.
+
+        Returns:
+            {ticker: {"sma20", "sma50", "rsi", "macd", "signal"}} (target_date에 가격이 있고
+            관측치가 MIN_OBSERVATIONS 이상인 종목) 또는 None
+        """
+        db = MongoDB.get_db()
+        target_doc = db.daily_stock_data.find_one({"date": target_date}, {"_id": 0, "date": 1, "stocks": 1})
+        if not target_doc:
+            logger.warning(f"Target date {target_date} not found in daily stock data")
+            return {}
+
+        target_tickers = list(target_doc.get("stocks", {}).keys())
+        book = self.load_book(target_tickers)
+
+        if any(as_of > target_date for as_of in book.as_of if as_of):
+            logger.info(f"indicator_state가 {target_date} 이후로 전진해 있어 전체 재계산으로 대체합니다")
+            return None
+
+        window_start = (datetime.strptime(target_date, "%Y-%m-%d") - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d")
+        rows = np.array([book.index[t] for t in target_tickers], dtype=np.intp)
+        as_of = book.as_of[rows]
+        needs_seed = (book.count[rows] == 0) | (as_of < window_start)
+
+        # target_date 종가가 바뀌었으면 그 봉을 되돌릴 수 없으므로 재시드 (저장된 float 그대로 비교)
+        target_prices = build_price_matrix([target_doc])
+        target_close = dict(zip(target_prices.tickers, target_prices.values[0]))
+        current_close = np.array([target_close.get(t, np.nan) for t in target_tickers], dtype=np.float64)
+        restated = ~needs_seed & (as_of == target_date) & (book.last_close[rows] != current_close)
+        if restated.any():
+            logger.info(f"indicator_state: {target_date} 종가가 바뀐 {int(restated.sum())}개 종목 재시드")
+            needs_seed |= restated
+        seed_rows = rows[needs_seed]
+        advance_rows = rows[~needs_seed & (as_of < target_date)]
+
+        if seed_rows.size:
+            start = window_start
+        elif advance_rows.size:
+            start = min(book.as_of[advance_rows])
+        else:
+            start = target_date
+
+        docs = list(db.daily_stock_data.find(
+            {"date": {"$gte": start, "$lte": target_date}},
+            {"_id": 0, "date": 1, "stocks": 1}
+        ).sort("date", 1))
+        matrix = build_price_matrix(docs)
+        column = {t: j for j, t in enumerate(matrix.tickers)}
+
+        if seed_rows.size:
+            seed_tickers = [book.tickers[i] for i in seed_rows if book.tickers[i] in column]
+            cols = [column[t] for t in seed_tickers]
+            book.seed(np.array([book.index[t] for t in seed_tickers], dtype=np.intp), matrix.dates, matrix.values[:, cols])
+            logger.info(f"indicator_state 시드: {len(seed_tickers)}개 종목")
+
+        if advance_rows.size:
+            advance_tickers = [book.tickers[i] for i in advance_rows if book.tickers[i] in column]
+            rows_arr = np.array([book.index[t] for t in advance_tickers], dtype=np.intp)
+            cols = np.array([column[t] for t in advance_tickers], dtype=np.intp)
+            for t, date in enumerate(matrix.dates):
+                prices = matrix.values[t, cols]
+                mask = ~np.isnan(prices) & (book.as_of[rows_arr] < date)
+                if mask.any():
+                    book.advance(rows_arr[mask], prices[mask], date=date)
+            logger.info(f"indicator_state 전진: {len(advance_tickers)}개 종목 ({len(matrix.dates)}일)")
+
+        changed = np.concatenate([seed_rows, advance_rows])
+        self.save(book, changed)
+
+        ready = rows[(book.as_of[rows] == target_date) & (book.count[rows] >= MIN_OBSERVATIONS)]
+        values = book.current(ready)
+        return {
+            book.tickers[i]: {name: float(arr[n]) for name, arr in values.items()}
+            for n, i in enumerate(ready)
+        }
+
+    def save(self, book: IndicatorStateBook, rows: np.ndarray, chunk_size: int = 1000) -> int:
+        """변경된 종목 상태를 저장합니다."""
+        db = MongoDB.get_db()
+        operations = [
+            ReplaceOne({"ticker": book.tickers[i]}, book.to_document(i), upsert=True)
+            for i in rows if book.count[i] > 0
+        ]
+        for i in range(0, len(operations), chunk_size):
+            db[STATE_COLLECTION].bulk_write(operations[i:i + chunk_size], ordered=False)
+        return len(operations)
+
+    def verify(self, sample_size: Optional[int] = None, reseed: bool = True) -> Dict[str, Any]:
+        """
+        증분 상태와 전체 재계산 결과를 비교합니다.
+
+        가장 최근 as_of 날짜의 종목들을 대상으로 조회 구간 전체를 다시 계산해
+        SMA/RSI는 EXACT_TOLERANCE, MACD/Signal은 가격 대비 EMA_RELATIVE_TOLERANCE로 비교합니다.
+
+        Args:
+            sample_size: 비교할 종목 수 (None이면 전체)
+            reseed: True면 불일치 종목의 상태를 삭제해 다음 실행에서 다시 시드
+
+        Returns:
+            {"as_of_date", "checked", "mismatched": [ticker...], "max_abs_diff": {지표: 값}}
+        """
+        db = MongoDB.get_db()
+        book = self.load_book()
+        dated = [a for a in book.as_of if a]
+        if not dated:
+            return {"as_of_date": None, "checked": 0, "mismatched": [], "max_abs_diff": {}}
+
+        as_of_date = max(dated)
+        rows = np.flatnonzero(book.as_of == as_of_date)
+        if sample_size and rows.size > sample_size:
+            rows = np.sort(np.random.default_rng().choice(rows, sample_size, replace=False))
+
+        window_start = (datetime.strptime(as_of_date, "%Y-%m-%d") - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d")
+        docs = list(db.daily_stock_data.find(
+            {"date": {"$gte": window_start, "$lte": as_of_date}},
+            {"_id": 0, "date": 1, "stocks": 1}
+        ).sort("date", 1))
+        matrix = build_price_matrix(docs)
+        column = {t: j for j, t in enumerate(matrix.tickers)}
+        rows = np.array([i for i in rows if book.tickers[i] in column], dtype=np.intp)
+        if not rows.size:
+            return {"as_of_date": as_of_date, "checked": 0, "mismatched": [], "max_abs_diff": {}}
+
+        cols = np.array([column[book.tickers[i]] for i in rows], dtype=np.intp)
+        full = self.engine.compute(matrix.values[:, cols])
+        last = matrix.date_index(as_of_date)
+        incremental = book.current(rows)
+        price = np.abs(book.last_close[rows])
+
+        mismatch = np.zeros(rows.size, dtype=bool)
+        max_diff = {}
+        for name, values in incremental.items():
+            expected = full[name][last]
+            diff = np.abs(values - expected)
+            both_nan = np.isnan(values) & np.isnan(expected)
+            diff = np.where(both_nan, 0.0, diff)
+            tolerance = EMA_RELATIVE_TOLERANCE * price if name in ("macd", "signal") else EXACT_TOLERANCE
+            mismatch |= ~(diff <= tolerance)
+            max_diff[name] = float(np.nanmax(np.where(both_nan, np.nan, diff))) if (~both_nan).any() else 0.0
+
+        mismatched = [book.tickers[i] for i in rows[mismatch]]
+        if mismatched:
+            logger.warning(f"⚠️ indicator_state 불일치 {len(mismatched)}/{rows.size}개 종목: {mismatched[:10]}")
+            if reseed:
+                db[STATE_COLLECTION].bulk_write([DeleteMany({"ticker": {"$in": mismatched}})])
+        else:
+            logger.info(f"✅ indicator_state 일치 확인: {rows.size}개 종목 (as_of={as_of_date})")
+
+        return {
+            "as_of_date": as_of_date,
+            "checked": int(rows.size),
+            "mismatched": mismatched,
+            "max_abs_diff": max_diff
+        }
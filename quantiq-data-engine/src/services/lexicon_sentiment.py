@@ -0,0 +1,155 @@
+"""
+Lexicon Sentiment - API 없이 기사 제목/요약의 감성 점수를 계산하는 오프라인 채점기
+
+Alpha Vantage 한도가 소진되거나 API가 종목을 다루지 않을 때의 대체 점수로 사용합니다.
+금융 뉴스용 긍정/부정 어휘(Loughran-McDonald 계열)와 부정어/강조어 처리만 사용하며,
+문서 묶음을 한 번에 토큰화한 뒤 numpy 연산으로 점수를 계산해 초당 수천 건 이상을 처리합니다.
+
+점수:
+    net = Σ(극성 × 강조 × 부정 반전) / (매칭 어휘 수 + SMOOTHING)  → -1 ~ 1
+API 점수와 분포가 다르므로 calibrate()로 저장된 기사의 API 점수에 맞춘 배율을 구해 호출 측에서 곱합니다.
+"""
+import re
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+# 매칭 어휘가 적은 문서가 ±1로 튀지 않도록 분모에 더하는 값
+SMOOTHING = 2.0
+# 부정어는 바로 뒤 NEGATION_WINDOW 토큰의 극성을 뒤집음
+NEGATION_WINDOW = 3
+
+POSITIVE_WORDS = """
+beat beats beating exceed exceeds exceeded outperform outperforms outperformed surge surges surged soar soars soared
+rally rallies rallied jump jumps jumped gain gains gained rise rises rose climb climbs climbed rebound rebounds rebounded
+record strong stronger strongest robust solid upbeat bullish optimistic optimism upgrade upgrades upgraded raise raises
+raised boost boosts boosted growth grow grows grew expand expands expanded expansion profit profits profitable
+profitability win wins won award awarded approve approves approved approval breakthrough innovative innovation
+improve improves improved improvement accelerate accelerates accelerated momentum demand dividend buyback buybacks
+partnership launch launches launched success successful positive favorable strength tops top topped recover
+recovers recovered recovery upside opportunity opportunities efficient efficiency lead leads leading leader
+""".split()
+
+NEGATIVE_WORDS = """
+miss misses missed fall falls fell drop drops dropped plunge plunges plunged slide slides slid sink sinks sank
+tumble tumbles tumbled decline declines declined slump slumps slumped crash crashes crashed loss losses lose loses
+lost weak weaker weakest weakness bearish pessimistic downgrade downgrades downgraded cut cuts cutting lower lowers
+lowered warn warns warned warning probe probes investigation investigate lawsuit lawsuits sue sues sued fine fined
+penalty recall recalls recalled fraud scandal default defaults bankruptcy bankrupt layoff layoffs restructuring
+delay delays delayed halt halts halted suspend suspends suspended risk risks risky concern concerns worried worry
+fear fears volatile volatility uncertainty uncertain slowdown slow slows slowed shortfall disappoint disappoints
+disappointed disappointing negative adverse decline headwind headwinds pressure pressures downside selloff
+sell-off struggle struggles struggled fail fails failed failure dilution impairment writedown investigation
+""".split()
+
+NEGATIONS = set("not no never without nor hardly neither isn't wasn't aren't weren't don't doesn't didn't won't can't cannot".split())
+
+INTENSIFIERS = {
+    "very": 1.5, "sharply": 1.5, "significantly": 1.5, "strongly": 1.5, "record": 1.3, "massive": 1.5,
+    "huge": 1.5, "steep": 1.5, "slightly": 0.5, "modestly": 0.6, "marginally": 0.5, "somewhat": 0.7,
+}
+
+
+class LexiconSentimentScorer:
+    """어휘 사전 기반 배치 감성 채점기 (thread-safe, 상태 없음)"""
+
+    def __init__(
+        self,
+        positive: Iterable[str] = POSITIVE_WORDS,
+        negative: Iterable[str] = NEGATIVE_WORDS,
+        scale: float = 1.0
+    ):
+        self.vocabulary = {}
+        polarity = [0.0]  # 0번 = 사전에 없는 토큰
+        intensity = [1.0]
+        negation = [False]
+
+        def token_id(token: str) -> int:
+            if token not in self.vocabulary:
+                self.vocabulary[token] = len(polarity)
+                polarity.append(0.0)
+                intensity.append(1.0)
+                negation.append(False)
+            return self.vocabulary[token]
+
+        for word in positive:
+            polarity[token_id(word)] = 1.0
+        for word in negative:
+            polarity[token_id(word)] = -1.0
+        for word, weight in INTENSIFIERS.items():
+            intensity[token_id(word)] = weight
+        for word in NEGATIONS:
+            negation[token_id(word)] = True
+
+        self.polarity = np.asarray(polarity)
+        self.intensity = np.asarray(intensity)
+        self.negation = np.asarray(negation)
+        self.scale = scale
+
+    def _encode(self, texts: Sequence[str]):
+        """문서 묶음 → (토큰 id 배열, 토큰별 문서 번호)"""
+        lookup = self.vocabulary.get
+        ids: List[int] = []
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for i, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall((text or "").lower())
+            lengths[i] = len(tokens)
+            ids.extend(lookup(token, 0) for token in tokens)
+        doc_index = np.repeat(np.arange(len(texts)), lengths)
+        return np.asarray(ids, dtype=np.int64), doc_index
+
+    def raw_scores(self, texts: Sequence[str]) -> np.ndarray:
+        """보정 전 점수 (-1 ~ 1)"""
+        n = len(texts)
+        if n == 0:
+            return np.zeros(0)
+        ids, doc_index = self._encode(texts)
+        if ids.size == 0:
+            return np.zeros(n)
+
+        polarity = self.polarity[ids]
+        # 바로 앞 토큰의 강조어 배율, 앞 NEGATION_WINDOW 토큰 안의 부정어 (문서 경계는 넘지 않음)
+        weight = np.ones_like(polarity)
+        flip = np.ones_like(polarity)
+        for offset in range(1, NEGATION_WINDOW + 1):
+            same_doc = doc_index[offset:] == doc_index[:-offset]
+            if offset == 1:
+                weight[1:] = np.where(same_doc, self.intensity[ids[:-1]], 1.0)
+            negated = same_doc & self.negation[ids[:-offset]]
+            flip[offset:] = np.where(negated, -flip[offset:], flip[offset:])
+
+        signed = polarity * weight * flip
+        net = np.bincount(doc_index, weights=signed, minlength=n)
+        matched = np.bincount(doc_index, weights=(polarity != 0).astype(np.float64), minlength=n)
+        return np.clip(net / (matched + SMOOTHING), -1.0, 1.0)
+
+    def score(self, texts: Sequence[str]) -> np.ndarray:
+        """API 점수 척도로 보정한 점수 (-1 ~ 1)"""
+        return np.clip(self.raw_scores(texts) * self.scale, -1.0, 1.0)
+
+    def calibrate(self, texts: Sequence[str], api_scores: Sequence[float], min_samples: int = 50) -> Optional[float]:
+        """
+        API 점수가 있는 기사로 배율을 구합니다 (원점을 지나는 최소제곱).
+
+        채점기 상태는 바꾸지 않으므로 (여러 스레드가 공유) 반환된 배율을 raw_scores에 곱해 사용합니다.
+
+        Returns:
+            배율 (표본이 부족하거나 상관이 없으면 None)
+        """
+        if len(texts) < min_samples:
+            return None
+        raw = self.raw_scores(texts)
+        target = np.asarray(api_scores, dtype=np.float64)
+        denominator = float(raw @ raw)
+        if denominator <= 0:
+            return None
+        slope = float(raw @ target) / denominator
+        if slope <= 0:
+            return None
+        return slope
+
+
+def article_text(article: dict) -> str:
+    """채점 대상 텍스트 (제목 + 요약)"""
+    return f"{article.get('title', '')}. {article.get('summary', '')}"
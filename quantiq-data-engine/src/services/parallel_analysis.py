@@ -0,0 +1,160 @@
+"""
+Parallel Analysis - 종목 유니버스를 프로세스 풀로 나눠 지표를 계산
+
+가격 행렬(종가/고가/저가/거래량)과 결과 행렬을 공유 메모리에 두고,
+워커는 자신에게 할당된 종목 열 구간(shard)만 읽고 씁니다.
+입력/결과 행렬을 피클링하지 않으며, 각 shard가 겹치지 않는 열에 결과를 쓰므로
+병합 결과는 워커 수/완료 순서와 무관하게 단일 프로세스 계산과 같습니다.
+
+지표 계산은 종목(열)별로 독립이므로 shard 경계에서 결과가 달라지지 않습니다.
+"""
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.services.indicator_engine import IndicatorEngine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SharedArraySpec:
+    """워커에 전달하는 공유 메모리 배열 정보 (이름/shape/dtype만 피클링)"""
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """공유 메모리에 올린 NumPy 배열 (생성한 프로세스가 해제/삭제)"""
+
+    def __init__(self, shape: Tuple[int, ...], dtype: str = "float64", source: Optional[np.ndarray] = None):
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        if source is not None:
+            self.array[...] = source
+        else:
+            self.array.fill(np.nan)
+        self.spec = SharedArraySpec(self._shm.name, tuple(shape), dtype)
+
+    def close(self) -> None:
+        self.array = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _attach(spec: SharedArraySpec) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    # spawn 워커는 부모의 resource_tracker를 공유하므로 등록이 중복되지 않고, 삭제는 생성한 쪽에서 수행
+    shm = shared_memory.SharedMemory(name=spec.name)
+    return shm, np.ndarray(spec.shape, dtype=spec.dtype, buffer=shm.buf)
+
+
+# 워커 프로세스별 엔진 캐시 (설정이 같으면 그래프/실행 계획 재사용)
+_worker_engines: Dict[str, IndicatorEngine] = {}
+
+
+def _compute_shard(
+    engine_config: Dict[str, Any],
+    inputs: Dict[str, SharedArraySpec],
+    outputs: Dict[str, SharedArraySpec],
+    start: int,
+    stop: int
+) -> int:
+    """[start, stop) 종목 열의 지표를 계산해 결과 공유 메모리에 씁니다."""
+    key = repr(sorted(engine_config.items()))
+    engine = _worker_engines.get(key)
+    if engine is None:
+        engine = _worker_engines[key] = IndicatorEngine(**engine_config)
+
+    handles = []
+    try:
+        views = {}
+        for name, spec in {**inputs, **outputs}.items():
+            shm, array = _attach(spec)
+            handles.append(shm)
+            views[name] = array
+
+        extra = {name: views[name][:, start:stop] for name in inputs if name != "close"}
+        results = engine.compute(views["close"][:, start:stop], extra)
+        for name in outputs:
+            views[name][:, start:stop] = results[name]
+        del views, extra, results
+    finally:
+        for shm in handles:
+            shm.close()
+
+    return stop - start
+
+
+class ShardedIndicatorRunner:
+    """
+    IndicatorEngine.compute()를 종목 shard 단위로 프로세스 풀에서 실행합니다.
+
+    워커 프로세스는 처음 사용할 때 만들고 close()까지 재사용합니다.
+    (Kafka consumer 스레드에서 호출되므로 fork 대신 spawn으로 시작)
+    """
+
+    def __init__(self, engine: IndicatorEngine, workers: int):
+        self.engine = engine
+        self.workers = max(1, workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"⚙️ 병렬 분석 워커 {self.workers}개 시작")
+        return self._executor
+
+    def shards(self, ticker_count: int) -> List[Tuple[int, int]]:
+        """종목 열을 워커 수만큼 연속 구간으로 나눕니다."""
+        bounds = np.linspace(0, ticker_count, min(self.workers, ticker_count) + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def compute(self, values: np.ndarray, extra_inputs: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """
+        IndicatorEngine.compute()와 같은 결과를 병렬로 계산합니다.
+
+        Returns:
+            {지표 이름: (날짜 × 종목) 행렬} (공유 메모리에서 복사한 일반 배열)
+        """
+        executor = self._get_executor()
+        output_names = list(self.engine.plan.outputs)
+
+        with ExitStack() as stack:
+            inputs = {"close": values, **(extra_inputs or {})}
+            shared_inputs = {}
+            for name, matrix in inputs.items():
+                shared = SharedArray(matrix.shape, "float64", matrix)
+                stack.callback(shared.close)
+                shared_inputs[name] = shared
+            shared_outputs = {}
+            for name in output_names:
+                shared = SharedArray(values.shape, "float64")
+                stack.callback(shared.close)
+                shared_outputs[name] = shared
+
+            input_specs = {name: s.spec for name, s in shared_inputs.items()}
+            output_specs = {name: s.spec for name, s in shared_outputs.items()}
+            futures = [
+                executor.submit(_compute_shard, self.engine.config(), input_specs, output_specs, start, stop)
+                for start, stop in self.shards(values.shape[1])
+            ]
+            for future in futures:
+                future.result()
+
+            return {name: shared.array.copy() for name, shared in shared_outputs.items()}
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,359 @@
+"""
+Pipeline Executor - 날짜 D 전체 파이프라인을 필요한 만큼만 실행
+
+경제 데이터 수집 → 기술적 분석 → 통합 분석, 뉴스 감정 → 통합 분석을 DAG로 모델링합니다.
+
+    economic_data ──► technical ──┐
+                                  ├──► combined
+    sentiment ────────────────────┘
+
+각 단계는 다음을 선언합니다.
+- deps: 선행 단계 (선행 단계가 끝난 뒤 입력 버전을 계산)
+- inputs(ctx): 입력 버전 구성요소 (Mongo 데이터/파라미터의 해시)
+- outputs: 단계가 쓰는 컬렉션
+
+단계를 실행할 때마다 pipeline_versions 컬렉션에 (date, stage)별로 입력 버전과 출력 컬렉션을 기록하고,
+다음 실행에서 입력 버전이 마지막 성공 실행과 같으면 건너뜁니다.
+외부 데이터를 가져오는 단계(economic_data, sentiment)는 입력 해시만으로 변경을 알 수 없으므로
+최대 나이(max_age_seconds)나 단계별 신선도 판단(is_fresh)으로 건너뜁니다.
+
+선행 단계가 모두 끝난 단계는 바로 제출하므로 서로 독립적인 가지(economic_data/technical과 sentiment)는 동시에 실행됩니다.
+선행 단계가 실패하면 하위 단계는 blocked로 끝납니다.
+
+새 단계 추가:
+
+    @register_stage
+    class MyStage(PipelineStage):
+        name = "my_stage"
+        deps = ("technical",)
+        outputs = ("my_collection",)
+
+        def inputs(self, ctx): ...
+        def run(self, ctx): ...
+"""
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.core import tracing
+from src.core.config import settings
+from src.core.database import MongoDB
+from src.core.metrics import stage_timer
+from src.services.analysis_progress import NullProgressReporter, ProgressReporter
+from src.services.result_cache import stable_hash, universe_hash
+from src.services.slack_notifier import SlackNotifier
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_COLLECTION = "pipeline_versions"
+
+
+@dataclass
+class PipelineContext:
+    """단계 실행에 필요한 요청 정보와 서비스"""
+    target_date: str
+    request_id: str
+    economic_service: Any
+    recommendation_service: Any
+    thread_ts: Optional[str] = None
+    force: bool = False
+    progress: ProgressReporter = field(default_factory=NullProgressReporter)
+
+    @property
+    def db(self):
+        return MongoDB.get_db()
+
+    def active_stocks(self) -> List[Dict[str, Any]]:
+        return list(self.db.stocks.find({"is_active": True}, {"_id": 0, "ticker": 1, "stock_name": 1}))
+
+
+class PipelineStage:
+    """파이프라인 단계 기본 클래스"""
+
+    name: str = ""
+    deps: tuple = ()
+    outputs: tuple = ()
+    # 외부 데이터 단계: 마지막 성공 후 이 시간이 지나면 입력이 같아도 다시 실행 (None = 입력 버전만 비교)
+    max_age_seconds: Optional[float] = None
+
+    def inputs(self, ctx: PipelineContext) -> Dict[str, Any]:
+        """입력 버전 구성요소 (값이 바뀌면 단계를 다시 실행)"""
+        return {"date": ctx.target_date}
+
+    def is_fresh(self, ctx: PipelineContext, record: Optional[Dict[str, Any]], input_version: str) -> bool:
+        """마지막 성공 실행의 입력 버전이 같고 최대 나이 이내이면 건너뜀"""
+        if not record or record.get("status") != "success" or record.get("input_version") != input_version:
+            return False
+        if self.max_age_seconds is None:
+            return True
+        return datetime.utcnow() - record["last_run_at"] < timedelta(seconds=self.max_age_seconds)
+
+    def run(self, ctx: PipelineContext) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+STAGES: Dict[str, PipelineStage] = {}
+
+
+def register_stage(cls):
+    """단계 클래스를 STAGES 레지스트리에 등록하는 데코레이터"""
+    stage = cls()
+    unknown = [d for d in stage.deps if d not in STAGES]
+    if unknown:
+        raise ValueError(f"Stage '{stage.name}' depends on unregistered stages: {unknown}")
+    STAGES[stage.name] = stage
+    return cls
+
+
+# ============================================================================
+# Stages
+# ============================================================================
+
+@register_stage
+class EconomicDataStage(PipelineStage):
+    name = "economic_data"
+    outputs = ("daily_stock_data",)
+    max_age_seconds = settings.PIPELINE_ECONOMIC_MAX_AGE_SECONDS
+
+    def inputs(self, ctx):
+        db = ctx.db
+        indicators = {
+            collection: sorted(str(d.get("code") or d.get("ticker")) for d in db[collection].find({"is_active": True}, {"code": 1, "ticker": 1}))
+            for collection in ("fred_indicators", "yfinance_indicators")
+        }
+        return {"date": ctx.target_date, "universe": universe_hash(ctx.active_stocks()), "indicators": stable_hash(indicators)}
+
+    def run(self, ctx):
+        result = ctx.economic_service.collect_economic_data(target_date=ctx.target_date)
+        SlackNotifier.notify_error_digest(ctx.request_id, result.get("errors"), ctx.thread_ts)
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", "economic data collection failed"))
+        return {k: v for k, v in result.items() if k != "success"}
+
+
+@register_stage
+class SentimentStage(PipelineStage):
+    name = "sentiment"
+    outputs = ("news_articles", "sentiment_analysis")
+
+    def inputs(self, ctx):
+        return {"universe": universe_hash(ctx.active_stocks())}
+
+    def is_fresh(self, ctx, record, input_version):
+        # SENTIMENT_MAX_AGE_SECONDS 이내 점수가 모든 종목에 있으면 최신 (백그라운드 갱신이 채운 점수 포함)
+        _, missing = ctx.recommendation_service.sentiment_service.get_fresh_sentiment()
+        return not missing
+
+    def run(self, ctx):
+        sentiment_service = ctx.recommendation_service.sentiment_service
+        _, missing = sentiment_service.get_fresh_sentiment()
+        tickers = None if ctx.force else missing
+        results = sentiment_service.fetch_and_store_sentiment(
+            start_date=ctx.target_date, tickers=tickers,
+            on_progress=ctx.progress.tick
+        )
+        return {"requested": len(missing) if tickers is not None else "all", "scored": len(results)}
+
+
+@register_stage
+class TechnicalStage(PipelineStage):
+    name = "technical"
+    deps = ("economic_data",)
+    outputs = ("stock_recommendations", "analysis_result_cache")
+
+    def inputs(self, ctx):
+        technical_service = ctx.recommendation_service.technical_service
+        return {
+            "universe": universe_hash(ctx.active_stocks()),
+            "daily_data": technical_service.data_version(ctx.db, ctx.target_date),
+            "params": stable_hash(technical_service.cache_params()),
+        }
+
+    def run(self, ctx):
+        technical_service = ctx.recommendation_service.technical_service
+        results = technical_service.analyze_stocks(target_date=ctx.target_date, use_cache=not ctx.force, include_all=True)
+        return {
+            "total_analyzed": len(results),
+            "recommended_count": sum(1 for r in results if r.get("is_recommended")),
+            "cached": technical_service.last_run_cached,
+        }
+
+
+@register_stage
+class CombinedStage(PipelineStage):
+    name = "combined"
+    deps = ("technical", "sentiment")
+    outputs = ("analysis_result_cache",)
+
+    def inputs(self, ctx):
+        # 통합 분석 캐시 키 = 기술적 입력 + 사용할 감성 점수 문서 + 가중치 파라미터
+        return {"combined": ctx.recommendation_service._combined_cache_key(ctx.target_date)}
+
+    def run(self, ctx):
+        result = ctx.recommendation_service.run_combined_analysis(
+            ctx.request_id, ctx.thread_ts, ctx.target_date, use_cache=not ctx.force, progress=ctx.progress
+        )
+        if result.get("status") == "failed":
+            raise RuntimeError(result.get("error", "combined analysis failed"))
+        return {k: v for k, v in result.items() if k != "recommendations"}
+
+
+# ============================================================================
+# Executor
+# ============================================================================
+
+class PipelineExecutor:
+    """
+    STAGES DAG 실행기
+
+    Args:
+        stages: 단계 레지스트리 (기본 STAGES)
+        max_workers: 동시에 실행할 최대 단계 수 (기본 PIPELINE_MAX_WORKERS)
+    """
+
+    _indexes_ready = False
+
+    def __init__(self, stages: Optional[Dict[str, PipelineStage]] = None, max_workers: Optional[int] = None):
+        self.stages = stages if stages is not None else STAGES
+        self.max_workers = max(1, max_workers or settings.PIPELINE_MAX_WORKERS)
+
+    def _collection(self):
+        collection = MongoDB.get_db()[VERSIONS_COLLECTION]
+        if not PipelineExecutor._indexes_ready:
+            try:
+                collection.create_index([("date", 1), ("stage", 1)])
+                PipelineExecutor._indexes_ready = True
+            except Exception as e:
+                logger.warning(f"pipeline_versions 인덱스 생성 실패: {e}")
+        return collection
+
+    def plan(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """targets와 그 선행 단계 전체를 위상 정렬한 목록 (targets가 없으면 전체 단계)"""
+        targets = list(targets) if targets else list(self.stages)
+        unknown = [t for t in targets if t not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {unknown}")
+
+        order, visited = [], set()
+
+        def visit(name):
+            if name in visited:
+                return
+            visited.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            order.append(name)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def run(self, ctx: PipelineContext, targets: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        ctx.target_date 파이프라인 실행
+
+        Returns:
+            status(success/failed), 단계별 결과(ran/skipped/failed/blocked), 실행/건너뜀 단계 수
+        """
+        order = self.plan(targets)
+        logger.info(f"[{ctx.request_id}] 파이프라인 시작 ({ctx.target_date}): {' → '.join(order)}{' (force)' if ctx.force else ''}")
+        started = time.perf_counter()
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        pending = list(order)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline") as executor:
+            running = {}
+            while pending or running:
+                for name in [n for n in pending if all(d in outcomes for d in self.stages[n].deps)]:
+                    pending.remove(name)
+                    failed_deps = [d for d in self.stages[name].deps if outcomes[d]["status"] in ("failed", "blocked")]
+                    if failed_deps:
+                        outcomes[name] = {"status": "blocked", "reason": f"upstream failed: {failed_deps}"}
+                        logger.warning(f"[{ctx.request_id}] ⛔ {name}: 선행 단계 실패로 건너뜀 ({failed_deps})")
+                        continue
+                    running[executor.submit(tracing.wrap(self._execute), self.stages[name], ctx)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes[running.pop(future)] = future.result()
+
+        summary = {
+            "status": "failed" if any(o["status"] in ("failed", "blocked") for o in outcomes.values()) else "success",
+            "target_date": ctx.target_date,
+            "stages": {name: outcomes[name] for name in order},
+            "ran": [n for n in order if outcomes[n]["status"] == "ran"],
+            "skipped": [n for n in order if outcomes[n]["status"] == "skipped"],
+            "duration": round(time.perf_counter() - started, 3),
+        }
+        if summary["status"] == "failed":
+            summary["error"] = "; ".join(
+                f"{name}: {outcome.get('error') or outcome.get('reason')}"
+                for name, outcome in summary["stages"].items() if outcome["status"] in ("failed", "blocked")
+            )
+        logger.info(
+            f"[{ctx.request_id}] 파이프라인 완료 ({summary['status']}, {summary['duration']:.1f}초): "
+            f"실행 {summary['ran']}, 건너뜀 {summary['skipped']}"
+        )
+        return summary
+
+    def _execute(self, stage: PipelineStage, ctx: PipelineContext) -> Dict[str, Any]:
+        """단계 하나를 (입력이 바뀌었으면) 실행하고 pipeline_versions에 기록"""
+        collection = self._collection()
+        record_id = f"{ctx.target_date}:{stage.name}"
+        started = time.perf_counter()
+        try:
+            inputs = stage.inputs(ctx)
+            input_version = stable_hash(inputs)
+            record = collection.find_one({"_id": record_id})
+
+            if not ctx.force and stage.is_fresh(ctx, record, input_version):
+                collection.update_one({"_id": record_id}, {"$set": {"last_checked_at": datetime.utcnow()}})
+                logger.info(f"[{ctx.request_id}] ⏭️ {stage.name}: 입력 변경 없음 - 건너뜀")
+                ctx.progress.stage(stage.name, message="skipped")
+                return {"status": "skipped", "input_version": input_version}
+
+            logger.info(f"[{ctx.request_id}] ▶️ {stage.name} 실행")
+            ctx.progress.stage(stage.name)
+            with stage_timer("pipeline", stage.name):
+                result = stage.run(ctx)
+        except Exception as e:
+            duration = round(time.perf_counter() - started, 3)
+            logger.error(f"[{ctx.request_id}] ❌ {stage.name} 실패: {e}")
+            try:
+                collection.update_one({"_id": record_id}, {"$set": {
+                    "date": ctx.target_date, "stage": stage.name, "status": "failed",
+                    "error": str(e), "last_run_at": datetime.utcnow(), "duration": duration
+                }}, upsert=True)
+            except Exception as record_error:
+                logger.warning(f"pipeline_versions 기록 실패: {record_error}")
+            return {"status": "failed", "error": str(e), "duration": duration}
+
+        duration = round(time.perf_counter() - started, 3)
+        try:
+            collection.replace_one({"_id": record_id}, {
+                "_id": record_id,
+                "date": ctx.target_date,
+                "stage": stage.name,
+                "deps": list(stage.deps),
+                "inputs": inputs,
+                "input_version": input_version,
+                "outputs": list(stage.outputs),
+                "status": "success",
+                "result": result,
+                "duration": duration,
+                "last_run_at": datetime.utcnow(),
+                "last_checked_at": datetime.utcnow()
+            }, upsert=True)
+        except Exception as e:
+            logger.warning(f"pipeline_versions 기록 실패: {e}")
+        logger.info(f"[{ctx.request_id}] ✅ {stage.name} 완료 ({duration:.1f}초)")
+        return {"status": "ran", "input_version": input_version, "duration": duration, "result": result}
+
+    def versions(self, target_date: str) -> List[Dict[str, Any]]:
+        """target_date의 단계별 마지막 실행 기록"""
+        return list(self._collection().find({"date": target_date}, {"_id": 0}).sort("stage", 1))
@@ -3,9 +3,18 @@ RecommendationService - 통합 분석 서비스
 기술적 분석 + 감정 분석 + 통합 점수 계산
 """
 import logging
-from typing import Dict, Any, List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
+from src.core import tracing
+from src.core.config import settings
+from src.core.database import MongoDB
+from src.services.analysis_progress import NullProgressReporter, ProgressReporter
+from src.services.result_cache import ResultCache, stable_hash, universe_hash
+from src.services.scoring_engine import ScoringEngine, ScoringParams
 from src.services.technical_analysis import TechnicalAnalysisService
 from src.services.sentiment_analysis import SentimentAnalysisService
 from src.services.slack_notifier import SlackNotifier
@@ -18,11 +27,26 @@ class RecommendationService:
     추천 서비스 통합 레이어
     """
 
+    # 통합 점수 가중치 (기술적 / 감정)와 추천 임계값
+    TECHNICAL_WEIGHT = 0.7
+    SENTIMENT_WEIGHT = 0.3
+    SCORE_THRESHOLD = 0.6
+
     def __init__(self):
         self.technical_service = TechnicalAnalysisService()
         self.sentiment_service = SentimentAnalysisService()
-
-    def run_technical_analysis(self, request_id: str, thread_ts: str = None, target_date: str = None) -> Dict[str, Any]:
+        self.cache = ResultCache(ttl_seconds=settings.ANALYSIS_CACHE_COMBINED_TTL_SECONDS)
+        self.scoring_engine = ScoringEngine(ScoringParams(
+            technical_weight=self.TECHNICAL_WEIGHT,
+            sentiment_weight=self.SENTIMENT_WEIGHT,
+            score_threshold=self.SCORE_THRESHOLD,
+            scheme=settings.SCORING_WEIGHTING_SCHEME,
+            top_k=settings.COMBINED_TOP_K,
+            require_technical_rule=settings.COMBINED_REQUIRE_TECHNICAL_RULE
+        ))
+
+    def run_technical_analysis(self, request_id: str, thread_ts: str = None, target_date: str = None, use_cache: bool = True,
+                               progress: ProgressReporter = None) -> Dict[str, Any]:
         """
         기술적 분석 전체 플로우
 
@@ -30,12 +54,16 @@ class RecommendationService:
             request_id: 요청 ID
             thread_ts: Slack 스레드 타임스탬프
             target_date: 분석 기준 날짜 (YYYY-MM-DD)
+            use_cache: False면 캐시된 결과를 무시하고 다시 계산
+            progress: 진행 상황/부분 결과 발행기 (quantiq.analysis.progress)
 
         Returns:
             분석 결과
         """
+        progress = progress or NullProgressReporter()
         try:
             logger.info(f"[{request_id}] 기술적 분석 시작 (target_date={target_date})")
+            progress.stage("technical")
 
             # 시작 알림
             if thread_ts:
@@ -45,15 +73,17 @@ class RecommendationService:
                 )
 
             # 분석 실행
-            results = self.technical_service.analyze_stocks(target_date=target_date)
+            results = self.technical_service.analyze_stocks(target_date=target_date, use_cache=use_cache)
+            cached = self.technical_service.last_run_cached
 
             # 추천 종목 필터링
             recommended = [r for r in results if r.get("is_recommended", False)]
+            progress.partial("technical", recommended)
 
             # 완료 알림
             if thread_ts:
                 SlackNotifier.send_thread_message(
-                    f"✅ 기술적 분석 완료\n"
+                    f"✅ 기술적 분석 완료{' (캐시된 결과)' if cached else ''}\n"
                     f"• 분석 종목: {len(results)}개\n"
                     f"• 추천 종목: {len(recommended)}개\n"
                     f"• 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
@@ -64,6 +94,7 @@ class RecommendationService:
 
             return {
                 "status": "success",
+                "cached": cached,
                 "total_analyzed": len(results),
                 "recommended_count": len(recommended),
                 "results": results
@@ -83,29 +114,99 @@ class RecommendationService:
                 "error": str(e)
             }
 
-    def run_sentiment_analysis(self, request_id: str, thread_ts: str = None) -> Dict[str, Any]:
+    def run_technical_range_analysis(self, request_id: str, start_date: str, end_date: str, thread_ts: str = None,
+                                     progress: ProgressReporter = None) -> Dict[str, Any]:
+        """
+        기간 일괄 기술적 분석 플로우 (start_date ~ end_date의 모든 거래일)
+
+        Args:
+            request_id: 요청 ID
+            start_date: 시작 날짜 (YYYY-MM-DD)
+            end_date: 종료 날짜 (YYYY-MM-DD)
+            thread_ts: Slack 스레드 타임스탬프
+            progress: 진행 상황/부분 결과 발행기 (quantiq.analysis.progress)
+
+        Returns:
+            분석 결과
+        """
+        progress = progress or NullProgressReporter()
+        try:
+            logger.info(f"[{request_id}] 기간 기술적 분석 시작 ({start_date} ~ {end_date})")
+            progress.stage("technical_range", message=f"{start_date} ~ {end_date}")
+
+            if thread_ts:
+                SlackNotifier.send_thread_message(
+                    f"🔄 기간 기술적 분석 시작...\n{start_date} ~ {end_date} 지표 일괄 계산 중",
+                    thread_ts
+                )
+
+            summary = self.technical_service.analyze_date_range(start_date, end_date)
+            progress.partial("technical_range", summary["recommendations"])
+
+            if thread_ts:
+                SlackNotifier.send_thread_message(
+                    f"✅ 기간 기술적 분석 완료\n"
+                    f"• 기간: {start_date} ~ {end_date} ({summary['dates']}거래일)\n"
+                    f"• 저장 행: {summary['total_analyzed']}개\n"
+                    f"• 추천: {len(summary['recommendations'])}건\n"
+                    f"• 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    thread_ts
+                )
+
+            logger.info(f"[{request_id}] 기간 기술적 분석 완료: {summary['dates']}거래일, 추천 {len(summary['recommendations'])}건")
+
+            return {
+                "status": "success",
+                "start_date": start_date,
+                "end_date": end_date,
+                "dates_analyzed": summary["dates"],
+                "total_analyzed": summary["total_analyzed"],
+                "recommended_count": len(summary["recommendations"]),
+                "recommended_by_date": summary["recommended_by_date"]
+            }
+
+        except Exception as e:
+            logger.error(f"[{request_id}] 기간 기술적 분석 실패: {e}")
+
+            if thread_ts:
+                SlackNotifier.send_thread_message(
+                    f"❌ 기간 기술적 분석 실패\n오류: {str(e)}",
+                    thread_ts
+                )
+
+            return {
+                "status": "failed",
+                "error": str(e)
+            }
+
+    def run_sentiment_analysis(self, request_id: str, thread_ts: str = None, progress: ProgressReporter = None) -> Dict[str, Any]:
         """
         뉴스 감정 분석 전체 플로우
 
         Args:
             request_id: 요청 ID
             thread_ts: Slack 스레드 타임스탬프
+            progress: 진행 상황/부분 결과 발행기 (quantiq.analysis.progress)
 
         Returns:
             분석 결과
         """
+        progress = progress or NullProgressReporter()
         try:
             logger.info(f"[{request_id}] 뉴스 감정 분석 시작")
+            progress.stage("sentiment")
 
-            # 시작 알림
+            # 시작 알림 (호출 한도 기준 예상 완료 시각 포함)
             if thread_ts:
                 SlackNotifier.send_thread_message(
-                    "🔄 뉴스 감정 분석 시작...\nAlpha Vantage NEWS_SENTIMENT API 호출 중",
+                    "🔄 뉴스 감정 분석 시작...\nAlpha Vantage NEWS_SENTIMENT API 호출 중\n"
+                    f"{self._sentiment_eta_text()}",
                     thread_ts
                 )
 
             # 분석 실행
-            results = self.sentiment_service.fetch_and_store_sentiment()
+            results = self.sentiment_service.fetch_and_store_sentiment(on_progress=progress.tick)
+            progress.partial("sentiment", results)
 
             # 평균 감정 점수 계산
             avg_score = sum(r.get("average_sentiment_score", 0) for r in results) / len(results) if results else 0
@@ -143,60 +244,123 @@ class RecommendationService:
                 "error": str(e)
             }
 
-    def run_combined_analysis(self, request_id: str, thread_ts: str = None, target_date: str = None) -> Dict[str, Any]:
+    def run_combined_analysis(self, request_id: str, thread_ts: str = None, target_date: str = None, use_cache: bool = True,
+                              progress: ProgressReporter = None) -> Dict[str, Any]:
         """
         통합 분석 (3단계)
-        1. 기술적 분석
-        2. 감정 분석
+        1. 기술적 분석 ┐ 서로 독립적이므로 동시에 실행
+        2. 감정 분석   ┘ (기술적 분석 실패 시 감정 단계 취소, 감정 단계 실패 시 기술적 점수만 사용)
         3. 통합 점수 계산
 
         Args:
             request_id: 요청 ID
             thread_ts: Slack 스레드 타임스탬프
             target_date: 분석 기준 날짜 (YYYY-MM-DD)
+            use_cache: False면 캐시된 결과를 무시하고 다시 계산
+            progress: 진행 상황/부분 결과 발행기 (quantiq.analysis.progress)
+                기술적 추천은 감정 단계를 기다리지 않고 먼저 발행하고, 최종 추천은 3단계 후 발행
 
         Returns:
             통합 분석 결과
         """
+        progress = progress or NullProgressReporter()
         try:
             logger.info(f"[{request_id}] 통합 분석 시작 (target_date={target_date})")
 
-            # 1단계: 기술적 분석
+            analysis_date = target_date or datetime.now().strftime('%Y-%m-%d')
+            if use_cache:
+                cached = self.cache.get(self._combined_cache_key(analysis_date))
+                if cached is not None:
+                    logger.info(f"[{request_id}] 통합 분석 캐시 적중: 최종 추천 {cached['final_recommendations']}개")
+                    if thread_ts:
+                        SlackNotifier.send_thread_message(
+                            f"♻️ 입력 데이터 변경 없음 - 캐시된 통합 분석 결과 사용\n"
+                            f"• 최종 추천: {cached['final_recommendations']}개\n"
+                            f"• 시각: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                            thread_ts
+                        )
+                    progress.partial("combined", cached["recommendations"])
+                    return {**cached, "cached": True}
+
+            # 1·2단계: 기술적 분석과 감정 분석 동시 실행
             if thread_ts:
                 SlackNotifier.send_thread_message(
-                    "🔄 1단계: 기술적 지표 분석 중...",
+                    "🔄 1단계: 기술적 지표 분석 + 2단계: 뉴스 감정 점수 조회 동시 진행 중...",
                     thread_ts
                 )
 
-            tech_results = self.technical_service.analyze_stocks(target_date=target_date)
-            tech_recommended = [r for r in tech_results if r.get("is_recommended", False)]
-
-            logger.info(f"[{request_id}] 1단계 완료: 기술적 분석 {len(tech_recommended)}개 추천")
-
-            # 2단계: 감정 분석
-            if thread_ts:
-                SlackNotifier.send_thread_message(
-                    f"✅ 1단계 완료: {len(tech_recommended)}개 추천\n"
-                    f"🔄 2단계: 뉴스 감정 분석 중...",
-                    thread_ts
+            progress.stage("technical")
+            progress.stage("sentiment")
+            started = time.perf_counter()
+            stage_timings = {}
+            cancel = threading.Event()
+            sentiment_error = None
+            # with 블록을 쓰지 않음: 빠져나갈 때 취소된 감정 단계(진행 중인 HTTP 호출)를 기다리지 않도록 wait=False로 종료
+            executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="combined")
+            try:
+                tech_future = executor.submit(
+                    tracing.wrap(self._timed_stage), stage_timings, "technical",
+                    self.technical_service.analyze_stocks, target_date=target_date, use_cache=use_cache, include_all=True
+                )
+                sentiment_future = executor.submit(
+                    tracing.wrap(self._timed_stage), stage_timings, "sentiment",
+                    self._collect_sentiment, request_id, thread_ts, cancel, progress
                 )
 
-            sentiment_results = self.sentiment_service.fetch_and_store_sentiment()
-            avg_sentiment = sum(r.get("average_sentiment_score", 0) for r in sentiment_results) / len(sentiment_results) if sentiment_results else 0
-
-            logger.info(f"[{request_id}] 2단계 완료: 감정 분석 {len(sentiment_results)}개 종목")
+                try:
+                    tech_results = tech_future.result()
+                except Exception:
+                    # 기술적 분석 없이는 통합 점수를 낼 수 없으므로 감정 단계의 남은 API 호출 중단
+                    cancel.set()
+                    raise
+                tech_recommended = [r for r in tech_results if r.get("is_recommended", False)]
+                logger.info(f"[{request_id}] 1단계 완료: 기술적 분석 {len(tech_recommended)}개 추천 ({stage_timings['technical']:.1f}초)")
+                # 감정 단계가 끝나기 전에 기술적 추천부터 소비 측에 전달
+                progress.partial("technical", tech_recommended)
+
+                if thread_ts and not sentiment_future.done():
+                    SlackNotifier.send_thread_message(
+                        f"✅ 1단계 완료: {len(tech_recommended)}개 추천\n"
+                        f"⏳ 2단계: 뉴스 감정 점수 수집 대기 중...",
+                        thread_ts
+                    )
+
+                timeout = settings.COMBINED_SENTIMENT_TIMEOUT_SECONDS or None
+                try:
+                    sentiment_results = sentiment_future.result(timeout=timeout)
+                except FuturesTimeoutError:
+                    # 남은 API 호출을 취소하고 그때까지 저장된 기사로 집계한 점수 사용
+                    logger.warning(f"[{request_id}] 감정 분석이 {timeout:g}초를 넘어 취소합니다")
+                    cancel.set()
+                    sentiment_results, sentiment_error = self._await_cancelled_sentiment(request_id, sentiment_future)
+                except Exception as e:
+                    sentiment_error, sentiment_results = str(e), []
+            finally:
+                executor.shutdown(wait=False)
+            stage_timings.setdefault("sentiment", round(time.perf_counter() - started, 3))
+
+            if sentiment_error:
+                logger.error(f"[{request_id}] 감정 분석 실패 - 기술적 점수만 사용: {sentiment_error}")
+            logger.info(f"[{request_id}] 2단계 완료: 감정 분석 {len(sentiment_results)}개 종목 ({stage_timings['sentiment']:.1f}초)")
 
             # 3단계: 통합 점수 계산
+            progress.stage("scoring", message=f"sentiment_error: {sentiment_error}" if sentiment_error else None)
             if thread_ts:
                 SlackNotifier.send_thread_message(
-                    f"✅ 2단계 완료: {len(sentiment_results)}개 분석\n"
+                    f"✅ 1단계 완료: {len(tech_recommended)}개 추천 ({stage_timings['technical']:.1f}초)\n"
+                    f"{'⚠️ 2단계 실패 - 기술적 점수만 사용' if sentiment_error else f'✅ 2단계 완료: {len(sentiment_results)}개 분석'}"
+                    f" ({stage_timings['sentiment']:.1f}초)\n"
                     f"🔄 3단계: 통합 점수 계산 중...",
                     thread_ts
                 )
 
-            final_recommendations = self._calculate_final_score(tech_results, sentiment_results)
+            final_recommendations = self._timed_stage(
+                stage_timings, "scoring", self._calculate_final_score, tech_results, sentiment_results
+            )
+            stage_timings["total"] = round(time.perf_counter() - started, 3)
 
-            logger.info(f"[{request_id}] 3단계 완료: 최종 추천 {len(final_recommendations)}개")
+            logger.info(f"[{request_id}] 3단계 완료: 최종 추천 {len(final_recommendations)}개 (단계별 소요: {stage_timings})")
+            progress.partial("combined", final_recommendations)
 
             # 최종 완료 알림
             if thread_ts:
@@ -214,7 +378,7 @@ class RecommendationService:
                     thread_ts
                 )
 
-            return {
+            result = {
                 "status": "success",
                 "technical_analyzed": len(tech_results),
                 "technical_recommended": len(tech_recommended),
@@ -222,6 +386,13 @@ class RecommendationService:
                 "final_recommendations": len(final_recommendations),
                 "recommendations": final_recommendations
             }
+            if sentiment_error:
+                result["sentiment_error"] = sentiment_error
+
+            # 감정 수집 이후의 데이터 버전으로 저장 (다음 요청 시 변경이 없으면 적중)
+            self.cache.put(self._combined_cache_key(analysis_date), "combined", analysis_date, result)
+
+            return {**result, "cached": False, "stage_timings": stage_timings}
 
         except Exception as e:
             logger.error(f"[{request_id}] 통합 분석 실패: {e}")
@@ -237,56 +408,102 @@ class RecommendationService:
                 "error": str(e)
             }
 
+    @staticmethod
+    def _timed_stage(timings: Dict[str, float], stage: str, fn, *args, **kwargs):
+        """fn을 실행하고 소요 시간(초)을 timings[stage]에 기록 (실패해도 기록)"""
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timings[stage] = round(time.perf_counter() - started, 3)
+
+    def _await_cancelled_sentiment(self, request_id: str, sentiment_future) -> Tuple[List[Dict], Optional[str]]:
+        """
+        취소 신호를 보낸 감정 단계를 COMBINED_SENTIMENT_CANCEL_GRACE_SECONDS까지만 기다림
+
+        그 안에 끝나지 않으면 (락 대기, 응답 없는 HTTP 호출 등) 단계를 버리고 저장된 감성 점수를 사용합니다.
+
+        Returns:
+            (감성 점수 문서 목록, 오류 메시지 또는 None)
+        """
+        grace = settings.COMBINED_SENTIMENT_CANCEL_GRACE_SECONDS
+        try:
+            return sentiment_future.result(timeout=grace), None
+        except FuturesTimeoutError:
+            logger.warning(f"[{request_id}] 감정 분석이 취소 후 {grace:g}초 안에 끝나지 않아 저장된 감성 점수를 사용합니다")
+        except Exception as e:
+            return [], str(e)
+        try:
+            stored, _ = self.sentiment_service.get_fresh_sentiment()
+            return stored, None
+        except Exception as e:
+            return [], str(e)
+
+    def _collect_sentiment(self, request_id: str, thread_ts: str = None, cancel_event: threading.Event = None,
+                           progress: ProgressReporter = None) -> List[Dict]:
+        """
+        통합 분석용 감성 점수
+
+        SENTIMENT_MAX_AGE_SECONDS 이내의 저장된 점수를 그대로 사용하고,
+        점수가 없는 종목만 (SENTIMENT_INLINE_FALLBACK이면) 직접 수집합니다.
+        """
+        stored, missing = self.sentiment_service.get_fresh_sentiment()
+        if not missing or not settings.SENTIMENT_INLINE_FALLBACK:
+            logger.info(f"[{request_id}] 저장된 감성 점수 사용: {len(stored)}개 종목 (누락 {len(missing)}개)")
+            return stored
+
+        logger.info(f"[{request_id}] 저장된 감성 점수 {len(stored)}개 사용, {len(missing)}개 종목 직접 수집")
+        if thread_ts:
+            SlackNotifier.send_thread_message(
+                f"📰 최신 감성 점수가 없는 {len(missing)}개 종목 직접 수집 중...\n"
+                f"{self._sentiment_eta_text(len(missing))}",
+                thread_ts
+            )
+        fetched = self.sentiment_service.fetch_and_store_sentiment(
+            tickers=missing, cancel_event=cancel_event, on_progress=progress.tick if progress else None
+        )
+        return stored + fetched
+
+    def _sentiment_eta_text(self, ticker_count: int = None) -> str:
+        """감정 분석 예상 소요 시간 안내 문구"""
+        try:
+            estimate = self.sentiment_service.estimate_completion(ticker_count)
+        except Exception as e:
+            logger.warning(f"감정 분석 예상 시간 계산 실패: {e}")
+            return ""
+        text = (
+            f"• 호출 수: {estimate['calls']}회\n"
+            f"• 예상 소요: 약 {estimate['seconds'] / 60:.1f}분 (완료 예정 {estimate['eta'].strftime('%H:%M:%S')})"
+        )
+        if estimate["remaining_today"] is not None and estimate["remaining_today"] < estimate["calls"]:
+            text += f"\n⚠️ 일일 한도 잔여 {estimate['remaining_today']}회 - 일부 종목은 건너뜁니다"
+        return text
+
+    def _combined_cache_key(self, analysis_date: str) -> str:
+        """통합 분석 캐시 키 (기술적 분석 입력 + 사용할 감정 점수 + 가중치)"""
+        db = MongoDB.get_db()
+        active_stocks = list(db.stocks.find({"is_active": True}, {"_id": 0, "ticker": 1, "stock_name": 1}))
+        # 통합 분석은 최대 나이 이내의 저장된 점수를 사용하므로 그 문서들로 버전을 계산
+        fresh_sentiment, _ = self.sentiment_service.get_fresh_sentiment()
+        data_version = stable_hash([
+            self.technical_service.data_version(db, analysis_date),
+            [(d["ticker"], d.get("date"), str(d.get("updated_at", ""))) for d in fresh_sentiment]
+        ])
+        params = {
+            **self.technical_service.cache_params(),
+            **self.scoring_engine.params.config(),
+        }
+        return ResultCache.make_key("combined", analysis_date, universe_hash(active_stocks), data_version, params)
+
     def _calculate_final_score(self, tech_results: List[Dict], sentiment_results: List[Dict]) -> List[Dict]:
         """
         기술적 분석 + 감정 분석 통합 점수 계산
 
         Args:
-            tech_results: 기술적 분석 결과
+            tech_results: 기술적 분석 결과 (분석한 전체 종목, composite_score 포함)
             sentiment_results: 감정 분석 결과
 
         Returns:
-            통합 점수가 계산된 추천 목록 (점수 내림차순 정렬)
+            통합 점수가 임계값 이상인 상위 추천 목록 (점수 내림차순 정렬)
         """
-        # 감정 점수를 ticker별로 매핑
-        sentiment_map = {
-            r["ticker"]: r.get("average_sentiment_score", 0)
-            for r in sentiment_results
-        }
-
-        # 기술적 분석 결과에 감정 점수 추가
-        combined = []
-        for tech in tech_results:
-            ticker = tech.get("ticker")
-            if not ticker:
-                continue
-
-            # 기술적 점수 (0-100 → 0-1 정규화)
-            technical_score = tech.get("composite_score", 0) / 100.0
-
-            # 감정 점수 (-1 ~ 1 → 0-1 정규화)
-            sentiment_score = sentiment_map.get(ticker, 0)
-            sentiment_normalized = (sentiment_score + 1) / 2.0
-
-            # 가중 평균 (sentiment 없으면 technical 100%, 있으면 기술적 70% + 감정 30%)
-            if sentiment_results:
-                combined_score = (technical_score * 0.7) + (sentiment_normalized * 0.3)
-            else:
-                combined_score = technical_score  # sentiment 비활성화 시 technical만 사용
-
-            combined.append({
-                "ticker": ticker,
-                "technical_score": technical_score,
-                "sentiment_score": sentiment_score,
-                "combined_score": combined_score,
-                "is_recommended": combined_score >= 0.6,  # 임계값 0.6
-                **tech  # 기존 기술적 지표 데이터 포함
-            })
-
-        # 통합 점수로 내림차순 정렬
-        combined.sort(key=lambda x: x["combined_score"], reverse=True)
-
-        # 추천 종목만 필터링
-        recommended = [r for r in combined if r["is_recommended"]]
-
-        return recommended
+        return self.scoring_engine.rank(tech_results, sentiment_results)
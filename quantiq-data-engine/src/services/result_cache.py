@@ -0,0 +1,117 @@
+"""
+Analysis Result Cache - 분석 결과 메모이제이션
+
+같은 기준일/유니버스/입력 데이터/전략 파라미터로 다시 요청하면 저장된 결과를 즉시 반환합니다.
+
+캐시 키:
+- kind: "technical" | "combined"
+- target_date: 분석 기준일
+- universe_hash: 활성 종목 (ticker, stock_name) 목록의 해시
+- data_version: 조회 구간 daily_stock_data의 (date, content_hash) 해시
+  (+ 통합 분석은 사용한 sentiment_analysis 문서의 (ticker, date, updated_at))
+- params_hash: 지표/가중치 파라미터 해시
+
+입력 데이터가 바뀌면 data_version이 달라져 키가 바뀌므로 별도 무효화 없이 새로 계산되며,
+오래된 항목은 expires_at TTL 인덱스로 삭제됩니다.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from src.core.config import settings
+from src.core.database import MongoDB
+
+logger = logging.getLogger(__name__)
+
+CACHE_COLLECTION = "analysis_result_cache"
+
+
+def stable_hash(value: Any) -> str:
+    """JSON 직렬화 가능한 값의 순서 독립 해시"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def universe_hash(stocks: Iterable[Dict[str, Any]]) -> str:
+    """활성 종목 목록 해시 (종목명은 추천 결과에 포함되므로 함께 반영)"""
+    return stable_hash(sorted((s["ticker"], s.get("stock_name", "")) for s in stocks if s.get("ticker")))
+
+
+def daily_data_version(db, start_date: str, end_date: str) -> str:
+    """
+    조회 구간 daily_stock_data의 버전 해시.
+
+    upsert_daily_data(_batch)가 기록한 content_hash를 사용하며,
+    content_hash가 없는 이전 문서는 updated_at으로 대신합니다.
+    """
+    docs = db.daily_stock_data.find(
+        {"date": {"$gte": start_date, "$lte": end_date}},
+        {"_id": 0, "date": 1, "content_hash": 1, "updated_at": 1}
+    ).sort("date", 1)
+    return stable_hash([(d["date"], d.get("content_hash") or str(d.get("updated_at", ""))) for d in docs])
+
+
+class ResultCache:
+    """analysis_result_cache 컬렉션 기반 결과 캐시"""
+
+    _indexes_ready = False
+
+    def __init__(self, ttl_seconds: Optional[int] = None):
+        self.ttl_seconds = settings.ANALYSIS_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.enabled = settings.ANALYSIS_CACHE_ENABLED
+
+    @staticmethod
+    def make_key(kind: str, target_date: str, universe: str, data_version: str, params: Dict[str, Any]) -> str:
+        return stable_hash({
+            "kind": kind,
+            "target_date": target_date,
+            "universe": universe,
+            "data_version": data_version,
+            "params": params,
+        })
+
+    def _collection(self):
+        db = MongoDB.get_db()
+        collection = db[CACHE_COLLECTION]
+        if not ResultCache._indexes_ready:
+            try:
+                collection.create_index("expires_at", expireAfterSeconds=0)
+                collection.create_index([("kind", 1), ("target_date", 1)])
+                ResultCache._indexes_ready = True
+            except Exception as e:
+                logger.warning(f"결과 캐시 인덱스 생성 실패: {e}")
+        return collection
+
+    def get(self, key: str) -> Optional[Any]:
+        """캐시된 결과 (없거나 만료되었으면 None)"""
+        if not self.enabled:
+            return None
+        try:
+            doc = self._collection().find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}}, {"result": 1})
+        except Exception as e:
+            logger.warning(f"결과 캐시 조회 실패: {e}")
+            return None
+        return doc["result"] if doc else None
+
+    def put(self, key: str, kind: str, target_date: str, result: Any) -> None:
+        """결과를 저장합니다 (실패해도 분석 흐름에는 영향 없음)."""
+        if not self.enabled:
+            return
+        now = datetime.utcnow()
+        try:
+            self._collection().replace_one({"_id": key}, {
+                "_id": key,
+                "kind": kind,
+                "target_date": target_date,
+                "result": result,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl_seconds)
+            }, upsert=True)
+        except Exception as e:
+            logger.warning(f"결과 캐시 저장 실패: {e}")
+
+    def invalidate(self, target_date: Optional[str] = None) -> int:
+        """캐시 항목 삭제 (target_date가 없으면 전체)"""
+        query = {"target_date": target_date} if target_date else {}
+        return self._collection().delete_many(query).deleted_count
@@ -0,0 +1,349 @@
+"""
+Scoring Engine - 유니버스 횡단면 기술적/감정 점수와 통합 순위
+
+기술적 점수:
+    종목별 지표에서 세 가지 특성을 만들고 (같은 날짜의 유니버스 안에서) 표준화합니다.
+    - trend: SMA20 / SMA50 - 1 (골든크로스 강도)
+    - rsi: 50 - RSI (과매도일수록 큼)
+    - macd: (MACD - Signal) / SMA20 (가격 대비 모멘텀)
+    composite_z = 특성 z-score(±3 절단)의 가중 평균
+    composite_score = 100 × Φ(composite_z) (0~100, 로지스틱 근사)
+    technical_percentile = composite_z의 유니버스 내 백분위 (0~1)
+
+통합 점수:
+    감정 점수는 ticker 기준 인덱스로 기술적 프레임에 붙이고 (없는 종목은 NaN),
+    가중 방식(WEIGHTING_SCHEMES)으로 combined_score(0~1)를 계산합니다.
+    감정 점수가 없는 종목은 가중치를 기술적 점수에 몰아줍니다.
+
+순위:
+    임계값을 넘는 종목 중 상위 K개를 np.argpartition으로 고른 뒤 K개만 정렬하므로
+    전체 시장 규모에서도 O(N + K log K)입니다.
+
+모든 계산은 마지막 축이 종목인 배열에서 동작하므로 (종목,) 한 날짜와 (날짜 × 종목) 기간 분석에 같이 쓸 수 있습니다.
+
+새 가중 방식 추가:
+    @register_weighting("my_scheme")
+    def my_scheme(frame: ScoreFrame, params: ScoringParams) -> np.ndarray:
+        ...
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 특성 z-score 절단 범위 (이상치 한 종목이 점수를 독점하지 않도록)
+Z_CLIP = 3.0
+# 표준정규 CDF의 로지스틱 근사 계수 (Φ(z) ≈ 1 / (1 + e^(-1.702 z)))
+LOGISTIC_SCALE = 1.702
+
+TECHNICAL_FEATURES = ("trend", "rsi", "macd")
+
+
+@dataclass(frozen=True)
+class ScoringParams:
+    """통합 점수 파라미터 (결과 캐시 키에도 사용)"""
+    technical_weight: float = 0.7
+    sentiment_weight: float = 0.3
+    score_threshold: float = 0.6
+    scheme: str = "fixed"
+    top_k: int = 0  # 0이면 임계값을 넘는 모든 종목
+    # True면 골든크로스 + RSI<50 + MACD>Signal 규칙을 모두 만족한 종목만 추천
+    require_technical_rule: bool = True
+    # confidence 방식: 기사 수가 이만큼 이상이면 감정 가중치를 모두 반영
+    full_confidence_articles: int = 5
+    feature_weights: Dict[str, float] = field(default_factory=lambda: {name: 1.0 for name in TECHNICAL_FEATURES})
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "technical_weight": self.technical_weight,
+            "sentiment_weight": self.sentiment_weight,
+            "score_threshold": self.score_threshold,
+            "scheme": self.scheme,
+            "top_k": self.top_k,
+            "require_technical_rule": self.require_technical_rule,
+            "full_confidence_articles": self.full_confidence_articles,
+            "feature_weights": dict(sorted(self.feature_weights.items())),
+        }
+
+
+# ----------------------------------------------------------------------
+# 횡단면 정규화
+# ----------------------------------------------------------------------
+
+def cross_sectional_zscore(values: np.ndarray) -> np.ndarray:
+    """마지막 축(종목) 기준 z-score (NaN 무시, 분산 0이면 0, ±Z_CLIP 절단)"""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=-1, keepdims=True)
+    safe_count = np.maximum(count, 1)
+    mean = np.where(valid, values, 0.0).sum(axis=-1, keepdims=True) / safe_count
+    centered = np.where(valid, values - mean, 0.0)
+    std = np.sqrt((centered ** 2).sum(axis=-1, keepdims=True) / safe_count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(std > 0, centered / std, 0.0)
+    return np.where(valid, np.clip(z, -Z_CLIP, Z_CLIP), np.nan)
+
+
+def cross_sectional_percentile(values: np.ndarray) -> np.ndarray:
+    """
+    마지막 축(종목) 기준 백분위 (0~1, 최저 0 / 최고 1, 동점은 평균 순위, NaN 유지)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=-1, keepdims=True)
+
+    # NaN은 정렬 시 뒤로 가므로 유효 값은 앞쪽 [0, count)에 모임.
+    # 동점은 같은 값의 최소/최대 순위 평균
+    sorted_values = np.sort(values, axis=-1)
+    low = _searchsorted_last_axis(sorted_values, values, count, side="left")
+    high = _searchsorted_last_axis(sorted_values, values, count, side="right") - 1
+    ranks = np.where(valid, (low + high) / 2.0, np.nan)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentile = np.where(count > 1, ranks / (count - 1), 0.5)
+    return np.where(valid, percentile, np.nan)
+
+
+def _searchsorted_last_axis(sorted_values: np.ndarray, values: np.ndarray, count: np.ndarray, side: str) -> np.ndarray:
+    """행별 searchsorted (정렬된 유효 구간 [0, count) 안에서)"""
+    if sorted_values.ndim == 1:
+        n = int(count[0])
+        return np.searchsorted(sorted_values[:n], np.nan_to_num(values), side=side).astype(np.float64)
+    out = np.empty(values.shape, dtype=np.float64)
+    for row in range(values.shape[0]):
+        n = int(count[row, 0])
+        out[row] = np.searchsorted(sorted_values[row, :n], np.nan_to_num(values[row]), side=side)
+    return out
+
+
+def logistic_cdf(z: np.ndarray) -> np.ndarray:
+    """표준정규 CDF 근사 (0~1)"""
+    return 1.0 / (1.0 + np.exp(-LOGISTIC_SCALE * z))
+
+
+# ----------------------------------------------------------------------
+# 기술적 점수
+# ----------------------------------------------------------------------
+
+def technical_scores(indicators: Dict[str, np.ndarray], params: Optional[ScoringParams] = None) -> Dict[str, np.ndarray]:
+    """
+    지표 배열 → 횡단면 기술적 점수
+
+    Args:
+        indicators: {"sma20", "sma50", "rsi", "macd", "signal"} 배열 (마지막 축 = 종목, 분석 대상이 아닌 칸은 NaN)
+
+    Returns:
+        {"composite_z", "composite_score"(0~100), "technical_percentile"(0~1),
+         "rules_met"(0~3), "technical_rule"(bool)}
+    """
+    params = params or ScoringParams()
+    sma20 = np.asarray(indicators["sma20"], dtype=np.float64)
+    sma50 = np.asarray(indicators["sma50"], dtype=np.float64)
+    rsi = np.asarray(indicators["rsi"], dtype=np.float64)
+    macd = np.asarray(indicators["macd"], dtype=np.float64)
+    signal = np.asarray(indicators["signal"], dtype=np.float64)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        features = {
+            "trend": np.where(sma50 > 0, sma20 / sma50 - 1.0, np.nan),
+            "rsi": 50.0 - rsi,
+            "macd": np.where(sma20 > 0, (macd - signal) / sma20, np.nan),
+        }
+        golden_cross = sma20 > sma50
+        rsi_ok = rsi < 50
+        macd_buy = macd > signal
+
+    weighted = np.zeros(sma20.shape)
+    total_weight = np.zeros(sma20.shape)
+    for name, values in features.items():
+        weight = params.feature_weights.get(name, 0.0)
+        if weight == 0:
+            continue
+        z = cross_sectional_zscore(values)
+        valid = ~np.isnan(z)
+        weighted += np.where(valid, z * weight, 0.0)
+        total_weight += np.where(valid, weight, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        composite_z = np.where(total_weight > 0, weighted / total_weight, np.nan)
+
+    rules_met = golden_cross.astype(np.int8) + rsi_ok + macd_buy
+    return {
+        "composite_z": composite_z,
+        "composite_score": 100.0 * logistic_cdf(composite_z),
+        "technical_percentile": cross_sectional_percentile(composite_z),
+        "rules_met": rules_met,
+        "technical_rule": rules_met == 3,
+    }
+
+
+# ----------------------------------------------------------------------
+# 통합 점수
+# ----------------------------------------------------------------------
+
+@dataclass
+class ScoreFrame:
+    """ticker로 정렬된 기술적 + 감정 열 (종목 = 원소)"""
+    tickers: List[str]
+    technical: np.ndarray              # composite_score / 100 (0~1)
+    technical_percentile: np.ndarray
+    technical_rule: np.ndarray
+    sentiment: np.ndarray              # -1~1, 없으면 NaN
+    sentiment_percentile: np.ndarray
+    article_count: np.ndarray
+
+    @property
+    def has_sentiment(self) -> np.ndarray:
+        return ~np.isnan(self.sentiment)
+
+
+def build_score_frame(tech_results: Sequence[Dict[str, Any]], sentiment_results: Sequence[Dict[str, Any]]) -> ScoreFrame:
+    """
+    기술적 분석 결과 문서와 감정 문서를 ticker로 결합합니다.
+
+    기술적 문서에 composite_score가 없으면 (이전 버전 캐시 등) 지표로 다시 계산합니다.
+    """
+    rows = [r for r in tech_results if r.get("ticker")]
+    tickers = [r["ticker"] for r in rows]
+    index = {ticker: i for i, ticker in enumerate(tickers)}
+    n = len(tickers)
+
+    composite = np.fromiter((r.get("composite_score", np.nan) for r in rows), dtype=np.float64, count=n)
+    percentile = np.fromiter((r.get("technical_percentile", np.nan) for r in rows), dtype=np.float64, count=n)
+    rule = np.fromiter((bool(r.get("is_recommended", False)) for r in rows), dtype=bool, count=n)
+    if n and (np.isnan(composite).any() or np.isnan(percentile).any()):
+        indicator_names = ("sma20", "sma50", "rsi", "macd", "signal")
+        indicators = {
+            name: np.fromiter(
+                (r.get("technical_indicators", {}).get(name, np.nan) for r in rows), dtype=np.float64, count=n
+            )
+            for name in indicator_names
+        }
+        scores = technical_scores(indicators)
+        composite = np.where(np.isnan(composite), scores["composite_score"], composite)
+        percentile = np.where(np.isnan(percentile), scores["technical_percentile"], percentile)
+
+    sentiment = np.full(n, np.nan)
+    article_count = np.zeros(n)
+    for doc in sentiment_results:
+        i = index.get(doc.get("ticker"))
+        if i is not None and doc.get("average_sentiment_score") is not None:
+            sentiment[i] = float(doc["average_sentiment_score"])
+            article_count[i] = float(doc.get("article_count", 0) or 0)
+
+    return ScoreFrame(
+        tickers=tickers,
+        technical=np.nan_to_num(composite, nan=0.0) / 100.0,
+        technical_percentile=np.nan_to_num(percentile, nan=0.0),
+        technical_rule=rule,
+        sentiment=sentiment,
+        sentiment_percentile=cross_sectional_percentile(sentiment),
+        article_count=article_count,
+    )
+
+
+WEIGHTING_SCHEMES: Dict[str, Callable[[ScoreFrame, ScoringParams], np.ndarray]] = {}
+
+
+def register_weighting(name: str):
+    """통합 점수 가중 방식 등록 데코레이터. 함수는 (frame, params) → combined_score 배열(0~1)"""
+    def decorator(scheme: Callable[[ScoreFrame, ScoringParams], np.ndarray]):
+        WEIGHTING_SCHEMES[name] = scheme
+        return scheme
+    return decorator
+
+
+def _blend(technical: np.ndarray, sentiment: np.ndarray, sentiment_weight: np.ndarray, technical_weight: float) -> np.ndarray:
+    """감정 값이 NaN인 종목은 기술적 점수만으로 (가중치 재정규화)"""
+    has_sentiment = ~np.isnan(sentiment)
+    weight = np.where(has_sentiment, sentiment_weight, 0.0)
+    total = technical_weight + weight
+    with np.errstate(invalid="ignore", divide="ignore"):
+        blended = (technical_weight * technical + weight * np.nan_to_num(sentiment)) / total
+    return np.where(total > 0, blended, technical)
+
+
+@register_weighting("fixed")
+def fixed_weighting(frame: ScoreFrame, params: ScoringParams) -> np.ndarray:
+    """기술적 composite(0~1)와 감정((s + 1) / 2)의 고정 가중 평균"""
+    sentiment_normalized = (frame.sentiment + 1.0) / 2.0
+    return _blend(frame.technical, sentiment_normalized, np.full(len(frame.tickers), params.sentiment_weight), params.technical_weight)
+
+
+@register_weighting("rank")
+def rank_weighting(frame: ScoreFrame, params: ScoringParams) -> np.ndarray:
+    """기술적/감정 백분위의 가중 평균 (두 점수의 분포 차이를 없앰)"""
+    return _blend(
+        frame.technical_percentile, frame.sentiment_percentile,
+        np.full(len(frame.tickers), params.sentiment_weight), params.technical_weight
+    )
+
+
+@register_weighting("confidence")
+def confidence_weighting(frame: ScoreFrame, params: ScoringParams) -> np.ndarray:
+    """fixed와 같되 기사 수가 적은 종목은 감정 가중치를 비례해서 줄임"""
+    confidence = np.minimum(1.0, frame.article_count / max(1, params.full_confidence_articles))
+    sentiment_normalized = (frame.sentiment + 1.0) / 2.0
+    return _blend(frame.technical, sentiment_normalized, params.sentiment_weight * confidence, params.technical_weight)
+
+
+def top_k_indices(scores: np.ndarray, eligible: np.ndarray, k: int) -> np.ndarray:
+    """
+    eligible 중 점수 상위 k개 인덱스 (내림차순). k <= 0이면 eligible 전체를 정렬
+
+    부분 정렬(argpartition) 후 선택된 k개만 정렬합니다.
+    """
+    candidates = np.flatnonzero(eligible)
+    if candidates.size == 0:
+        return candidates
+    candidate_scores = scores[candidates]
+    if 0 < k < candidates.size:
+        part = np.argpartition(-candidate_scores, k - 1)[:k]
+        candidates, candidate_scores = candidates[part], candidate_scores[part]
+    # 동점은 입력 순서 유지
+    return candidates[np.argsort(-candidate_scores, kind="stable")]
+
+
+class ScoringEngine:
+    """통합 점수 계산 + 상위 종목 선택"""
+
+    def __init__(self, params: Optional[ScoringParams] = None):
+        self.params = params or ScoringParams()
+        if self.params.scheme not in WEIGHTING_SCHEMES:
+            raise ValueError(f"Unknown weighting scheme: {self.params.scheme} (available: {sorted(WEIGHTING_SCHEMES)})")
+
+    def score(self, frame: ScoreFrame) -> np.ndarray:
+        return np.clip(WEIGHTING_SCHEMES[self.params.scheme](frame, self.params), 0.0, 1.0)
+
+    def rank(self, tech_results: Sequence[Dict[str, Any]], sentiment_results: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        통합 점수 상위 종목 문서 (combined_score 내림차순)
+
+        결과 문서는 선택된 종목만 만들며, 기술적 분석 문서의 필드 위에 점수 필드를 덮어씁니다.
+        """
+        frame = build_score_frame(tech_results, sentiment_results)
+        if not frame.tickers:
+            return []
+
+        combined = self.score(frame)
+        eligible = combined >= self.params.score_threshold
+        if self.params.require_technical_rule:
+            eligible &= frame.technical_rule
+        selected = top_k_indices(combined, eligible, self.params.top_k)
+
+        rows = [r for r in tech_results if r.get("ticker")]
+        results = []
+        for rank, i in enumerate(selected, start=1):
+            has_sentiment = bool(frame.has_sentiment[i])
+            results.append({
+                **rows[i],  # 기존 기술적 지표 데이터 포함
+                "ticker": frame.tickers[i],
+                "technical_score": float(frame.technical[i]),
+                "technical_percentile": float(frame.technical_percentile[i]),
+                "sentiment_score": float(frame.sentiment[i]) if has_sentiment else 0.0,
+                "sentiment_percentile": float(frame.sentiment_percentile[i]) if has_sentiment else None,
+                "combined_score": float(combined[i]),
+                "rank": rank,
+                "is_recommended": True,
+            })
+        return results
@@ -1,26 +1,173 @@
 import logging
+import re
 import requests
-import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+import numpy as np
+from pymongo import UpdateOne
 from src.core.database import MongoDB
+from src.core import tracing
 from src.core.config import settings
+from src.core.jobs import add_records
+from src.core.metrics import external_call, stage_timer
+from src.core.rate_limiter import DailyQuotaExceeded, TokenBucketRateLimiter
+from src.services.lexicon_sentiment import LexiconSentimentScorer, article_text
 
 logger = logging.getLogger(__name__)
 
+# Alpha Vantage는 호출 제한을 200 응답의 "Note"/"Information" 본문으로 알림
+RATE_LIMIT_MARKERS = ("call frequency", "rate limit", "requests per", "premium")
+# 그중 일일 한도 소진 안내 (예: "... standard API rate limit is 25 requests per day ...") → 재시도하지 않고 중단.
+# 분당 제한 안내도 "5 calls per minute and 500 calls per day"처럼 일일 한도를 함께 적으므로 분/초 단위 언급이 없을 때만 일일 소진으로 봄
+DAILY_QUOTA_MARKERS = ("per day", "daily")
+SHORT_WINDOW_MARKERS = ("per minute", "per second", "call frequency")
+MAX_RATE_LIMIT_RETRIES = 3
+API_TIME_FORMAT = "%Y%m%dT%H%M"
+# 조회 결과가 limit에 걸리면 구간을 나눠 다시 조회 (이보다 짧은 구간은 더 나누지 않음)
+MIN_SWEEP_WINDOW = timedelta(hours=1)
+# 종목별 조회의 요청당 최대 기사 수
+TICKER_FEED_LIMIT = 100
+# 기준일 이전 며칠치 기사를 조회할지
+LOOKBACK_DAYS = 3
+# 기사 원문/종목별 점수 (URL당 한 문서)와 마지막으로 본 기사 시각 (종목별 + 시장 전체)
+ARTICLE_COLLECTION = "news_articles"
+WATERMARK_COLLECTION = "news_watermarks"
+MARKET_WATERMARK = "__market__"
+# 다른 수집이 _fetch_lock을 잡고 있을 때 취소 여부를 확인하는 주기 (초)
+FETCH_LOCK_POLL_SECONDS = 1.0
+# 종목명 매칭 시 제거할 법인 접미사
+# 이보다 짧은 티커(A, T, F 등)는 일반 단어와 겹치므로 $ 접두사가 붙은 경우만 언급으로 인정
+MIN_BARE_TICKER_LENGTH = 3
+COMPANY_SUFFIXES = re.compile(r"[,.]?\s+(inc|corp|corporation|co|company|ltd|plc|holdings|group|class [a-z])\.?$", re.IGNORECASE)
+
+
 class SentimentAnalysisService:
+    _limiter = None
+    _limiter_lock = threading.Lock()
+    _indexes_ready = False
+    # 백그라운드 갱신과 통합 분석의 직접 수집이 같은 기사를 동시에 받지 않도록 직렬화
+    _fetch_lock = threading.Lock()
+    # 직전 실행에서 시장 조회로 커버하지 못해 종목별로 조회한 비율 (예상 시간 계산용)
+    last_fallback_ratio = 1.0
+
     def __init__(self):
         self.api_key = settings.ALPHA_VANTAGE_API_KEY
-        self.base_url = "https://www.alphavantage.co/query"
+        self.base_url = f"{settings.ALPHA_VANTAGE_BASE_URL}/query"
+        self.max_concurrency = max(1, settings.ALPHA_VANTAGE_MAX_CONCURRENCY)
+        self.lexicon = LexiconSentimentScorer()
 
-    def fetch_and_store_sentiment(self, start_date=None, end_date=None):
-        logger.info(f"Starting sentiment analysis... ({start_date} ~ {end_date})")
-        db = MongoDB.get_db()
-        
+    @classmethod
+    def limiter(cls) -> TokenBucketRateLimiter:
+        """API 키 한도는 프로세스 전체가 공유하므로 서비스 인스턴스와 무관하게 하나만 생성"""
+        with cls._limiter_lock:
+            if cls._limiter is None:
+                cls._limiter = TokenBucketRateLimiter(
+                    "Alpha Vantage",
+                    calls_per_minute=settings.ALPHA_VANTAGE_CALLS_PER_MINUTE,
+                    calls_per_day=settings.ALPHA_VANTAGE_CALLS_PER_DAY
+                )
+            return cls._limiter
+
+    @classmethod
+    def _ensure_indexes(cls, db):
+        if cls._indexes_ready:
+            return
+        try:
+            db[ARTICLE_COLLECTION].create_index("url", unique=True)
+            db[ARTICLE_COLLECTION].create_index([("tickers.ticker", 1), ("time_published", 1)])
+            cls._indexes_ready = True
+        except Exception as e:
+            logger.warning(f"news_articles 인덱스 생성 실패: {e}")
+
+    def _get_tickers(self, db):
         # 1. Get Tickers (Union of Active Stocks and Holdings)
         # For MVP, just get active stocks
+        active_stocks = list(db.stocks.find({"is_active": True}))
+        return [s["ticker"] for s in active_stocks if s.get("ticker")]
+
+    def estimate_completion(self, ticker_count=None):
+        """
+        현재 한도 기준 예상 소요 시간
+
+        시장 조회를 사용하면 (조회 구간 일수) + (직전 실행의 종목별 보완 조회 비율 × 종목 수)로 호출 수를 추정합니다.
+
+        Returns:
+            {"calls": 호출 수, "seconds": 예상 소요 초, "eta": 예상 완료 시각, "remaining_today": 일일 잔여 호출}
+        """
+        if ticker_count is None:
+            ticker_count = len(self._get_tickers(MongoDB.get_db()))
+        calls = ticker_count
+        if settings.SENTIMENT_MARKET_SWEEP:
+            fallback_ratio = self.last_fallback_ratio if settings.SENTIMENT_PER_TICKER_FALLBACK else 0.0
+            calls = LOOKBACK_DAYS + 1 + int(round(ticker_count * fallback_ratio))
+        limiter = self.limiter()
+        seconds = limiter.estimate_seconds(calls)
+        return {
+            "calls": calls,
+            "seconds": seconds,
+            "eta": datetime.now() + timedelta(seconds=seconds),
+            "remaining_today": limiter.remaining_today
+        }
+
+    def get_fresh_sentiment(self, tickers=None, max_age_seconds=None):
+        """
+        저장된 감성 점수 중 최대 나이 이내인 종목별 최신 문서를 반환합니다 (API 호출 없음).
+
+        Args:
+            tickers: 조회할 종목 (None이면 활성 종목 전체)
+            max_age_seconds: updated_at 기준 최대 나이 (기본 SENTIMENT_MAX_AGE_SECONDS)
+
+        Returns:
+            (문서 목록, 최대 나이 이내 점수가 없는 종목 목록)
+        """
+        db = MongoDB.get_db()
+        tickers = tickers if tickers is not None else self._get_tickers(db)
+        max_age = settings.SENTIMENT_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+
+        latest = {}
+        cursor = db.sentiment_analysis.find(
+            {"ticker": {"$in": tickers}, "updated_at": {"$gte": cutoff}},
+            {"_id": 0}
+        ).sort([("date", -1), ("updated_at", -1)])
+        for doc in cursor:
+            latest.setdefault(doc["ticker"], doc)
+
+        missing = [t for t in tickers if t not in latest]
+        return [latest[t] for t in tickers if t in latest], missing
+
+    def fetch_and_store_sentiment(self, start_date=None, end_date=None, tickers=None, cancel_event=None, on_progress=None):
+        """
+        뉴스를 수집해 종목별 감성 점수를 저장합니다.
+
+        Args:
+            tickers: 점수를 계산할 종목 (None이면 활성 종목 전체)
+            cancel_event: set되면 남은 API 호출을 멈추고 그때까지 저장된 기사로 집계
+                (일일 한도가 소진되어도 set됨)
+            on_progress: on_progress(stage, processed, total) 진행 콜백
+                (시장 조회 후 1회, 종목별 조회는 종목마다)
+
+        다른 수집(백그라운드 갱신 등)이 진행 중이면 끝날 때까지 기다리되,
+        기다리는 동안 cancel_event가 set되면 수집하지 않고 저장된 점수를 반환합니다.
+        """
+        while not self._fetch_lock.acquire(timeout=FETCH_LOCK_POLL_SECONDS):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("⏭️ 다른 감성 수집이 진행 중이고 요청이 취소되어 저장된 점수를 사용합니다")
+                stored, _ = self.get_fresh_sentiment(tickers)
+                return stored
         try:
-            active_stocks = list(db.stocks.find({"is_active": True}))
-            tickers = [s["ticker"] for s in active_stocks if s.get("ticker")]
+            return self._fetch_and_store_sentiment(start_date, end_date, tickers, cancel_event, on_progress)
+        finally:
+            self._fetch_lock.release()
+
+    def _fetch_and_store_sentiment(self, start_date=None, end_date=None, tickers=None, cancel_event=None, on_progress=None):
+        logger.info(f"Starting sentiment analysis... ({start_date} ~ {end_date})")
+        db = MongoDB.get_db()
+        self._ensure_indexes(db)
+
+        try:
+            tickers = tickers if tickers is not None else self._get_tickers(db)
         except Exception as e:
             logger.error(f"Failed to fetch active stocks: {e}")
             return []
@@ -28,72 +175,477 @@ class SentimentAnalysisService:
         if not tickers:
             logger.warning("No tickers found for sentiment analysis.")
             return []
-            
+
         # 2. Date Setup
         if not start_date:
             start_date = datetime.now().strftime('%Y-%m-%d')
-        
+
         start_date_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        time_from = (start_date_dt - timedelta(days=3)).strftime("%Y%m%dT0000")
-        
-        params = {
-            "function": "NEWS_SENTIMENT",
-            "time_from": time_from,
-            "limit": 100,
-            "apikey": self.api_key
-        }
-        
+        window_start = start_date_dt - timedelta(days=LOOKBACK_DAYS)
+        window_end = datetime.utcnow()
+        watermarks = self._load_watermarks(db)
+
+        estimate = self.estimate_completion(len(tickers))
+        logger.info(
+            f"Fetching sentiment for {len(tickers)} tickers "
+            f"(concurrency={self.max_concurrency}, estimated {estimate['calls']} calls / {estimate['seconds']:.0f}s)"
+        )
+
+        stats = {"api_calls": 0, "articles_received": 0, "articles_stored": 0, "fallback_tickers": 0}
+        # 한도 소진 또는 호출 측 취소 시 남은 요청 중단
+        halt = cancel_event if cancel_event is not None else threading.Event()
+        tracked = set(tickers)
+
+        if settings.SENTIMENT_MARKET_SWEEP:
+            # 마지막으로 본 기사 이후만 조회 (워터마크가 조회 구간보다 오래됐으면 구간 시작부터)
+            sweep_from = max(window_start, watermarks.get(MARKET_WATERMARK, window_start))
+            articles = {}
+            with stage_timer("sentiment", "market_sweep"):
+                complete = self._sweep_market(sweep_from, window_end, articles, stats, halt)
+                stats["articles_stored"] += self._store_articles(db, articles.values())
+            if complete:
+                self._advance_watermarks(db, articles.values(), tracked, market=True)
+            if on_progress:
+                on_progress("sentiment_sweep", stats["api_calls"], None)
+
+        if not settings.SENTIMENT_MARKET_SWEEP or settings.SENTIMENT_PER_TICKER_FALLBACK:
+            # 저장된 기사까지 포함해도 조회 구간에 기사가 없는 종목만 종목별로 조회
+            covered = self._covered_tickers(db, window_start, tickers)
+            uncovered = [t for t in tickers if t not in covered]
+            stats["fallback_tickers"] = len(uncovered)
+            with stage_timer("sentiment", "per_ticker"):
+                self._fetch_per_ticker(db, uncovered, window_start, window_end, watermarks, tracked, stats, halt, on_progress)
+        if settings.SENTIMENT_MARKET_SWEEP:
+            SentimentAnalysisService.last_fallback_ratio = stats["fallback_tickers"] / len(tickers)
+
+        if halt.is_set():
+            logger.warning("Sentiment fetch stopped early (quota exhausted or cancelled): results are partial")
+
+        with stage_timer("sentiment", "aggregate"):
+            results = self.aggregate_daily_sentiment(start_date, tickers, db=db)
+        lexicon_count = 0
+        if settings.SENTIMENT_LEXICON_FALLBACK and len(results) < len(tickers):
+            # API 점수가 없는 종목은 저장된 기사 본문을 오프라인 채점 (추가 API 호출 없음)
+            scored = {r["ticker"] for r in results}
+            with stage_timer("sentiment", "lexicon"):
+                lexicon_results = self.score_with_lexicon(start_date, [t for t in tickers if t not in scored], db=db)
+            lexicon_count = len(lexicon_results)
+            results.extend(lexicon_results)
+        add_records(len(results))
+
+        logger.info(
+            f"Sentiment analysis done: {stats['api_calls']} API calls, {stats['articles_received']} articles received, "
+            f"{stats['articles_stored']} new, {stats['fallback_tickers']} per-ticker fallbacks, "
+            f"{len(results)}/{len(tickers)} tickers saved ({lexicon_count} by lexicon)"
+        )
+        return results
+
+    def aggregate_daily_sentiment(self, date, tickers=None, lookback_days=LOOKBACK_DAYS, db=None):
+        """
+        저장된 기사로 종목별 평균 감성 점수를 계산해 sentiment_analysis에 저장합니다.
+
+        API를 호출하지 않으므로 임의의 날짜/구간으로 다시 집계할 수 있습니다.
+
+        Args:
+            date: 기준일 (YYYY-MM-DD). [기준일 - lookback_days, 기준일 끝] 구간의 기사를 집계
+            tickers: 집계할 종목 (None이면 활성 종목 전체)
+        """
+        db = db if db is not None else MongoDB.get_db()
+        tickers = tickers if tickers is not None else self._get_tickers(db)
+        date_dt = datetime.strptime(date, '%Y-%m-%d')
+        window = {"$gte": date_dt - timedelta(days=lookback_days), "$lt": date_dt + timedelta(days=1)}
+
+        pipeline = [
+            {"$match": {"time_published": window, "tickers.ticker": {"$in": tickers}}},
+            {"$unwind": "$tickers"},
+            {"$match": {"tickers.ticker": {"$in": tickers}}},
+            {"$group": {
+                "_id": "$tickers.ticker",
+                "average_sentiment_score": {"$avg": "$tickers.score"},
+                "article_count": {"$sum": 1}
+            }}
+        ]
+        aggregated = {row["_id"]: row for row in db[ARTICLE_COLLECTION].aggregate(pipeline)}
+
+        results = []
+        operations = []
+        for ticker in tickers:
+            row = aggregated.get(ticker)
+            if not row:
+                continue
+            doc = {
+                "ticker": ticker,
+                "date": date,
+                "average_sentiment_score": row["average_sentiment_score"],
+                "article_count": row["article_count"],
+                "source": "alpha_vantage",
+                "updated_at": datetime.utcnow()
+            }
+            operations.append(UpdateOne({"ticker": ticker, "date": date}, {"$set": doc}, upsert=True))
+            results.append(doc)
+
+        if operations:
+            try:
+                db.sentiment_analysis.bulk_write(operations, ordered=False)
+            except Exception as e:
+                logger.error(f"Error saving sentiment for {date}: {e}")
+                return []
+        return results
+
+    def score_with_lexicon(self, date, tickers, lookback_days=LOOKBACK_DAYS, db=None):
+        """
+        저장된 기사 중 종목(티커/종목명)을 언급한 기사를 오프라인 채점해 sentiment_analysis에 저장합니다.
+
+        API가 종목 태그(ticker_sentiment)를 붙인 기사는 태그된 종목에만, 태그가 없는 기사는 본문 언급으로 종목을 정합니다.
+        어휘 점수는 같은 구간에서 API 점수가 있는 기사로 배율을 맞춰 API 점수와 같은 척도(-1 ~ 1)로 저장합니다.
+
+        Returns:
+            저장된 감성 문서 목록 (source="lexicon")
+        """
+        if not tickers:
+            return []
+        db = db if db is not None else MongoDB.get_db()
+        date_dt = datetime.strptime(date, '%Y-%m-%d')
+        window = {"$gte": date_dt - timedelta(days=lookback_days), "$lt": date_dt + timedelta(days=1)}
+        articles = list(db[ARTICLE_COLLECTION].find(
+            {"time_published": window},
+            {"title": 1, "summary": 1, "overall_sentiment_score": 1, "lexicon_raw_score": 1, "tickers.ticker": 1}
+        ))
+        if not articles:
+            return []
+
+        aliases = {}
+        for stock in db.stocks.find({"ticker": {"$in": tickers}}, {"ticker": 1, "stock_name": 1}):
+            aliases[stock["ticker"]] = stock["ticker"]
+            name = COMPANY_SUFFIXES.sub("", (stock.get("stock_name") or "").strip())
+            if len(name) >= 3:
+                aliases[name] = stock["ticker"]
+        for ticker in tickers:
+            aliases.setdefault(ticker, ticker)
+        cashtag_only = [a for a in aliases if a == aliases[a] and len(a) < MIN_BARE_TICKER_LENGTH]
+        bare = [a for a in aliases if a not in cashtag_only]
+
+        def alternation(names):
+            # 매칭 실패만 하는 빈 대안 (목록이 비어도 정규식이 유효하도록)
+            return "|".join(map(re.escape, sorted(names, key=len, reverse=True))) or r"(?!)"
+
+        mention = re.compile(r"(?<![\w$])(?:\$(" + alternation(cashtag_only) + r")|\$?(" + alternation(bare) + r"))(?!\w)")
+
+        texts = [article_text(a) for a in articles]
+        raw = self._raw_lexicon_scores(db, articles, texts)
+        api_scores = [a.get("overall_sentiment_score") for a in articles]
+        paired = [i for i, v in enumerate(api_scores) if v is not None]
+        scale = self.lexicon.calibrate([texts[i] for i in paired], [api_scores[i] for i in paired])
+        scores = raw * (self.lexicon.scale if scale is None else scale)
+
+        targets = set(tickers)
+        per_ticker = {}
+        for article, text, score in zip(articles, texts, scores):
+            tagged = {t.get("ticker") for t in article.get("tickers") or []}
+            if tagged:
+                mentioned = tagged & targets
+            else:
+                mentioned = {aliases[cashtag or name] for cashtag, name in mention.findall(text)}
+            for ticker in mentioned:
+                per_ticker.setdefault(ticker, []).append(float(score))
+
         results = []
-        
+        operations = []
+        now = datetime.utcnow()
         for ticker in tickers:
+            values = per_ticker.get(ticker)
+            if not values:
+                continue
+            doc = {
+                "ticker": ticker,
+                "date": date,
+                "average_sentiment_score": max(-1.0, min(1.0, sum(values) / len(values))),
+                "article_count": len(values),
+                "source": "lexicon",
+                "updated_at": now
+            }
+            operations.append(UpdateOne({"ticker": ticker, "date": date}, {"$set": doc}, upsert=True))
+            results.append(doc)
+
+        if operations:
+            try:
+                db.sentiment_analysis.bulk_write(operations, ordered=False)
+            except Exception as e:
+                logger.error(f"Error saving lexicon sentiment for {date}: {e}")
+                return []
+        logger.info(
+            f"Lexicon sentiment: {len(results)}/{len(tickers)} tickers from {len(articles)} articles "
+            f"(scale={'default' if scale is None else f'{scale:.3f}'})"
+        )
+        return results
+
+    def _raw_lexicon_scores(self, db, articles, texts):
+        """저장된 보정 전 어휘 점수를 쓰고, 없는 기사(이전 버전에서 저장)만 채점해 채워 넣습니다."""
+        raw = np.array([a.get("lexicon_raw_score", np.nan) for a in articles], dtype=np.float64)
+        missing = np.flatnonzero(np.isnan(raw))
+        if missing.size:
+            raw[missing] = self.lexicon.raw_scores([texts[i] for i in missing])
+            try:
+                db[ARTICLE_COLLECTION].bulk_write([
+                    UpdateOne({"_id": articles[i]["_id"]}, {"$set": {"lexicon_raw_score": float(raw[i])}})
+                    for i in missing
+                ], ordered=False)
+            except Exception as e:
+                logger.warning(f"Error saving lexicon scores: {e}")
+        return raw
+
+    @staticmethod
+    def _covered_tickers(db, window_start, tickers):
+        """조회 구간에 저장된 기사가 있는 종목"""
+        return set(db[ARTICLE_COLLECTION].distinct(
+            "tickers.ticker",
+            {"time_published": {"$gte": window_start}, "tickers.ticker": {"$in": tickers}}
+        ))
+
+    @staticmethod
+    def _parse_published(article):
+        try:
+            return datetime.strptime(article.get("time_published", ""), "%Y%m%dT%H%M%S")
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _collect(feed, articles, stats):
+        stats["articles_received"] += len(feed)
+        for article in feed:
+            key = article.get("url") or (article.get("title"), article.get("time_published"))
+            articles.setdefault(key, article)
+
+    def _store_articles(self, db, articles):
+        """
+        기사를 URL당 한 문서로 news_articles에 upsert합니다.
+
+        Returns:
+            새로 저장된 기사 수
+        """
+        articles = [a for a in articles if a.get("url") and self._parse_published(a) is not None]
+        if not articles:
+            return 0
+        # 한도 소진 시 대체 점수로 쓰도록 저장 시점에 어휘 점수를 함께 계산 (묶음 단위)
+        lexicon_scores = self.lexicon.raw_scores([article_text(a) for a in articles])
+
+        operations = []
+        now = datetime.utcnow()
+        for article, lexicon_score in zip(articles, lexicon_scores):
+            published = self._parse_published(article)
+            operations.append(UpdateOne({"url": article["url"]}, {
+                "$set": {
+                    "title": article.get("title", ""),
+                    "summary": article.get("summary", ""),
+                    "source": article.get("source", ""),
+                    "time_published": published,
+                    "overall_sentiment_score": float(article.get("overall_sentiment_score") or 0),
+                    "tickers": [
+                        {
+                            "ticker": ts["ticker"],
+                            "score": float(ts.get("ticker_sentiment_score") or 0),
+                            "relevance": float(ts.get("relevance_score") or 0)
+                        }
+                        for ts in article.get("ticker_sentiment", [])
+                        if ts.get("ticker")
+                    ],
+                    "lexicon_raw_score": float(lexicon_score),
+                    "updated_at": now
+                },
+                "$setOnInsert": {"first_seen_at": now}
+            }, upsert=True))
+
+        try:
+            return db[ARTICLE_COLLECTION].bulk_write(operations, ordered=False).upserted_count
+        except Exception as e:
+            logger.error(f"Error saving news articles: {e}")
+            return 0
+
+    @staticmethod
+    def _load_watermarks(db):
+        return {doc["_id"]: doc["last_published"] for doc in db[WATERMARK_COLLECTION].find({}, {"last_published": 1})}
+
+    def _advance_watermarks(self, db, articles, tracked, market=False, ticker=None):
+        """
+        빠짐없이 조회한 범위의 마지막 기사 발행 시각까지 워터마크를 전진시킵니다.
+
+        시장 조회는 시장 워터마크와 기사에 등장한 추적 종목의 워터마크를,
+        종목별 조회는 해당 종목의 워터마크만 갱신합니다.
+        """
+        latest = {}
+        for article in articles:
+            published = self._parse_published(article)
+            if published is None:
+                continue
+            if ticker:
+                keys = [ticker]
+            else:
+                keys = [ts.get("ticker") for ts in article.get("ticker_sentiment", []) if ts.get("ticker") in tracked]
+                if market:
+                    keys.append(MARKET_WATERMARK)
+            for key in keys:
+                if key not in latest or published > latest[key]:
+                    latest[key] = published
+
+        if not latest:
+            return
+        now = datetime.utcnow()
+        try:
+            db[WATERMARK_COLLECTION].bulk_write([
+                UpdateOne({"_id": key}, {"$max": {"last_published": published}, "$set": {"updated_at": now}}, upsert=True)
+                for key, published in latest.items()
+            ], ordered=False)
+        except Exception as e:
+            logger.warning(f"Error updating news watermarks: {e}")
+
+    def _sweep_market(self, window_start, window_end, articles, stats, halt):
+        """
+        종목 필터 없이 시장 전체 기사를 조회합니다.
+
+        Returns:
+            모든 구간을 빠짐없이 조회했으면 True (워터마크 전진 조건)
+        """
+        return self._sweep_window(
+            {"function": "NEWS_SENTIMENT", "sort": "LATEST"}, "market",
+            window_start, window_end, settings.SENTIMENT_SWEEP_LIMIT, articles, stats, halt
+        )
+
+    def _sweep_window(self, params, label, window_start, window_end, limit, articles, stats, halt):
+        """
+        [window_start, window_end] 구간의 기사를 조회합니다.
+
+        응답이 limit개로 꽉 차면 구간을 반으로 나눠 다시 조회해 누락 없이 모읍니다.
+        MIN_SWEEP_WINDOW 이하 구간이 여전히 꽉 차면 더 나누지 않고 불완전으로 표시합니다.
+
+        Returns:
+            모든 구간을 빠짐없이 조회했으면 True (워터마크 전진 조건)
+        """
+        pending = [(window_start, window_end)]
+        complete = True
+        while pending:
+            if halt.is_set():
+                return False
+            start, end = pending.pop()
+            data = self._request({
+                **params,
+                "time_from": start.strftime(API_TIME_FORMAT),
+                "time_to": end.strftime(API_TIME_FORMAT),
+                "limit": limit,
+                "apikey": self.api_key
+            }, label, halt)
+            stats["api_calls"] += 1
+            if data is None or "feed" not in data:
+                if data is not None:
+                    logger.warning(f"No feed data for {label}")
+                complete = False
+                continue
+            feed = data["feed"]
+            self._collect(feed, articles, stats)
+
+            if len(feed) >= limit:
+                if end - start > MIN_SWEEP_WINDOW:
+                    middle = start + (end - start) / 2
+                    pending.extend([(start, middle), (middle, end)])
+                else:
+                    logger.warning(f"News for {label} still truncated at {limit} articles in {start} ~ {end}")
+                    complete = False
+        return complete
+
+    def _fetch_per_ticker(self, db, tickers, window_start, window_end, watermarks, tracked, stats, halt, on_progress=None):
+        """
+        시장 조회로 커버되지 않은 종목을 종목별 워터마크 이후로 조회 (한도 안에서 동시 요청)
+
+        기사가 많은 종목은 시장 조회와 같이 구간을 나눠 조회하고,
+        빠짐없이 조회한 종목만 워터마크를 전진시킵니다.
+        """
+        if not tickers:
+            return
+
+        def fetch(ticker):
             logger.info(f"Fetching sentiment for {ticker}...")
-            params["tickers"] = ticker
-            
+            time_from = max(window_start, watermarks.get(ticker, window_start))
+            articles = {}
+            # 워커 스레드마다 따로 세고 호출 측에서 합산
+            ticker_stats = {"api_calls": 0, "articles_received": 0}
+            try:
+                complete = self._sweep_window(
+                    {"function": "NEWS_SENTIMENT", "tickers": ticker}, ticker,
+                    time_from, window_end, TICKER_FEED_LIMIT, articles, ticker_stats, halt
+                )
+            except Exception as e:
+                logger.error(f"Error fetching sentiment for {ticker}: {e}")
+                complete = False
+            return articles, complete, ticker_stats
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="sentiment") as executor:
+            results = executor.map(tracing.wrap(fetch), tickers)
+            for processed, (ticker, (articles, complete, ticker_stats)) in enumerate(zip(tickers, results), 1):
+                stats["api_calls"] += ticker_stats["api_calls"]
+                stats["articles_received"] += ticker_stats["articles_received"]
+                if on_progress:
+                    on_progress("sentiment_per_ticker", processed, len(tickers))
+                if not articles:
+                    continue
+                stats["articles_stored"] += self._store_articles(db, articles.values())
+                if complete:
+                    self._advance_watermarks(db, articles.values(), tracked, ticker=ticker)
+
+    @staticmethod
+    def _is_daily_quota_notice(notice):
+        """호출 제한 안내가 일일 한도 소진인지 (분당 제한 안내와 구분)"""
+        text = notice.lower()
+        return any(m in text for m in DAILY_QUOTA_MARKERS) and not any(m in text for m in SHORT_WINDOW_MARKERS)
+
+    def _request(self, params, label, halt):
+        """
+        NEWS_SENTIMENT 요청 (호출 제한 응답이면 감속 후 재시도)
+
+        Returns:
+            응답 JSON, 실패 시 None
+        """
+        limiter = self.limiter()
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            if halt.is_set():
+                return None
             try:
+                # 토큰 대기 중에도 취소를 확인하도록 짧게 나눠 대기
+                while not limiter.acquire(timeout=1.0):
+                    if halt.is_set():
+                        return None
+            except DailyQuotaExceeded as e:
+                halt.set()
+                logger.warning(str(e))
+                return None
+
+            with external_call("alphavantage", "market" if label == "market" else "ticker") as call:
                 response = requests.get(self.base_url, params=params, timeout=30)
-                if response.status_code != 200:
-                    logger.warning(f"Alpha Vantage API error for {ticker}: {response.status_code}")
+                if response.status_code == 429:
+                    call.status = "rate_limited"
+                    retry_after = response.headers.get("Retry-After")
+                    limiter.on_rate_limited(float(retry_after) if retry_after else None)
                     continue
-                    
+                if response.status_code != 200:
+                    call.status = "error"
+                    logger.warning(f"Alpha Vantage API error for {label}: {response.status_code}")
+                    return None
+
+                call.bytes = len(response.content)
                 data = response.json()
-                if "feed" not in data:
-                    logger.warning(f"No feed data for {ticker}")
+                notice = str(data.get("Note") or data.get("Information") or "")
+                if "feed" not in data and self._is_daily_quota_notice(notice):
+                    call.status = "rate_limited"
+                    limiter.on_quota_exhausted()
+                    halt.set()
+                    logger.warning(f"Alpha Vantage daily quota exhausted at {label}: {notice[:120]}")
+                    return None
+                if "feed" not in data and any(marker in notice.lower() for marker in RATE_LIMIT_MARKERS):
+                    call.status = "rate_limited"
+                    limiter.on_rate_limited()
+                    logger.warning(f"Alpha Vantage rate limited for {label} (attempt {attempt + 1}): {notice[:80]}")
                     continue
-                    
-                # Calculate simple average sentiment
-                sentiment_scores = []
-                for article in data["feed"]:
-                    for ticker_sentiment in article.get("ticker_sentiment", []):
-                        if ticker_sentiment.get("ticker") == ticker:
-                            score = float(ticker_sentiment.get("ticker_sentiment_score", 0))
-                            sentiment_scores.append(score)
-                
-                if sentiment_scores:
-                    avg_score = sum(sentiment_scores) / len(sentiment_scores)
-                    article_count = len(sentiment_scores)
-                    
-                    doc = {
-                        "ticker": ticker,
-                        "date": start_date,
-                        "average_sentiment_score": avg_score,
-                        "article_count": article_count,
-                        "updated_at": datetime.utcnow()
-                    }
-                    
-                    db.sentiment_analysis.update_one(
-                        {"ticker": ticker, "date": start_date},
-                        {"$set": doc},
-                        upsert=True
-                    )
-                    
-                    results.append(doc)
-                    logger.info(f"Saved sentiment for {ticker}: Score={avg_score:.2f}, Count={article_count}")
-                
-                # Respect rate limits (Alpha Vantage free tier: 5 calls/min)
-                # Assuming key allows more or we sleep more. conservative sleep.
-                time.sleep(12) 
-                
-            except Exception as e:
-                logger.error(f"Error fetching sentiment for {ticker}: {e}")
-                
-        return results
+
+            limiter.on_success()
+            return data
+
+        logger.warning(f"Giving up {label} after {MAX_RATE_LIMIT_RETRIES} rate-limited retries")
+        return None
@@ -0,0 +1,65 @@
+"""
+Sentiment Refresher - 활성 종목의 뉴스 감성 점수를 백그라운드로 주기 갱신
+
+통합 분석은 저장된 sentiment_analysis 중 SENTIMENT_MAX_AGE_SECONDS 이내의 점수를 바로 읽고,
+이 스레드가 Alpha Vantage 호출 한도에 맞춰 SENTIMENT_REFRESH_INTERVAL_SECONDS마다 점수를 새로 채웁니다.
+"""
+import logging
+import threading
+from datetime import datetime
+from typing import Optional
+
+from src.core.config import settings
+from src.services.sentiment_analysis import SentimentAnalysisService
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentRefresher(threading.Thread):
+    """감성 점수 백그라운드 갱신 스레드"""
+
+    def __init__(self, service: Optional[SentimentAnalysisService] = None, interval_seconds: Optional[float] = None):
+        super().__init__(name="sentiment-refresher", daemon=True)
+        self.service = service or SentimentAnalysisService()
+        self.interval_seconds = settings.SENTIMENT_REFRESH_INTERVAL_SECONDS if interval_seconds is None else interval_seconds
+        self._stop_event = threading.Event()
+        self.last_refreshed_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self.stats = {"runs": 0, "failures": 0, "tickers": 0}
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def refresh_once(self) -> int:
+        """한 번 갱신하고 저장한 종목 수를 반환"""
+        started = datetime.utcnow()
+        try:
+            results = self.service.fetch_and_store_sentiment()
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.last_error = str(e)
+            logger.error(f"❌ 감성 점수 백그라운드 갱신 실패: {e}")
+            return 0
+
+        self.stats["runs"] += 1
+        self.stats["tickers"] = len(results)
+        self.last_refreshed_at = datetime.utcnow()
+        self.last_error = None
+        elapsed = (self.last_refreshed_at - started).total_seconds()
+        logger.info(f"📰 감성 점수 백그라운드 갱신 완료: {len(results)}개 종목 ({elapsed:.1f}초)")
+        return len(results)
+
+    def status(self) -> dict:
+        return {
+            "enabled": True,
+            "interval_seconds": self.interval_seconds,
+            "last_refreshed_at": self.last_refreshed_at.isoformat() if self.last_refreshed_at else None,
+            "last_error": self.last_error,
+            **self.stats
+        }
+
+    def run(self) -> None:
+        logger.info(f"Sentiment refresher started (interval={self.interval_seconds:.0f}s)")
+        while not self._stop_event.is_set():
+            self.refresh_once()
+            self._stop_event.wait(self.interval_seconds)
@@ -1,8 +1,26 @@
+"""
+Slack Notifier - Slack API/Webhook 알림 (Thread 지원)
+
+분석/수집 경로에서는 메시지를 큐에 넣기만 하고, 백그라운드 dispatcher 스레드가 전송합니다.
+- 전송: requests.Session 재사용 (연결 풀)
+- 호출 제한: 채널별 토큰 버킷 (SLACK_MESSAGES_PER_MINUTE), 429 응답 시 Retry-After만큼 감속 후 재시도
+- 병합: 같은 스레드로 가는 단순 답글(send_thread_message)이 아직 전송 전이면 한 메시지로 합침
+- 큐가 가득 차면 새 메시지를 버리고 dropped 카운터를 올림 (호출 측은 절대 기다리지 않음)
+
+SLACK_ASYNC_ENABLED=false면 이전처럼 호출 스레드에서 바로 전송합니다.
+"""
 import requests
 import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime
 from pytz import timezone
+from src.core import tracing
 from src.core.config import settings
+from src.core.metrics import REGISTRY, SLACK_MESSAGES, SLACK_QUEUE_DEPTH, external_call
+from src.core.rate_limiter import TokenBucketRateLimiter
 from typing import Optional, Dict
 
 KST = timezone('Asia/Seoul')
@@ -10,11 +28,264 @@ KST = timezone('Asia/Seoul')
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class SlackMessage:
+    """전송 대기 메시지"""
+    text: str
+    attachments: Optional[list] = None
+    thread_ts: Optional[str] = None
+    coalescible: bool = False  # 같은 스레드의 다음 단순 답글과 합칠 수 있는지
+    attempts: int = 0
+    # 보낸 요청의 trace (전송 스레드에서 Slack 호출 span의 부모)
+    trace_context: Optional[tracing.SpanContext] = field(default_factory=tracing.current_context)
+
+
+class SlackDispatcher:
+    """
+    Slack 전송 큐 + 백그라운드 전송 스레드 (프로세스당 하나, SlackNotifier.dispatcher())
+
+    Args:
+        max_size: 큐 최대 길이 (초과 시 새 메시지 버림)
+        messages_per_minute: 채널별 분당 전송 수
+        coalesce_max_chars: 병합 메시지 최대 길이
+        max_retries: 호출 제한(429) 응답 시 최대 재시도 횟수
+    """
+
+    def __init__(self, max_size: int, messages_per_minute: float, coalesce_max_chars: int, max_retries: int):
+        self.max_size = max_size
+        self.messages_per_minute = messages_per_minute
+        self.coalesce_max_chars = coalesce_max_chars
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._limiters: Dict[str, TokenBucketRateLimiter] = {}
+        self._in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self.counters = {
+            "enqueued": 0, "sent": 0, "failed": 0, "dropped": 0,
+            "coalesced": 0, "rate_limited": 0, "retried": 0, "max_queue_depth": 0
+        }
+
+    # ------------------------------------------------------------------
+    # Producer side (handler threads)
+    # ------------------------------------------------------------------
+
+    def submit(self, message: SlackMessage) -> bool:
+        """메시지를 큐에 넣습니다 (대기 없음). 버려졌으면 False"""
+        with self._cond:
+            self._count("enqueued")
+            if message.coalescible and self._coalesce(message):
+                self._count("coalesced")
+                return True
+            if len(self._queue) >= self.max_size:
+                self._count("dropped")
+                if self.counters["dropped"] == 1 or self.counters["dropped"] % 100 == 0:
+                    logger.warning(f"⚠️ Slack 큐 가득 참 ({self.max_size}) - 메시지 버림 (누적 {self.counters['dropped']}건)")
+                return False
+            self._queue.append(message)
+            self.counters["max_queue_depth"] = max(self.counters["max_queue_depth"], len(self._queue))
+            self._cond.notify()
+        self._ensure_started()
+        return True
+
+    def _count(self, outcome: str) -> None:
+        """카운터 증가 (self._cond 안에서 호출, /metrics의 quantiq_slack_messages_total에도 반영)"""
+        self.counters[outcome] += 1
+        SLACK_MESSAGES.labels(outcome=outcome).inc()
+
+    def _coalesce(self, message: SlackMessage) -> bool:
+        """같은 스레드의 마지막 대기 메시지가 단순 답글이면 본문을 이어 붙임 (스레드 내 순서 유지)"""
+        for pending in reversed(self._queue):
+            if pending.thread_ts != message.thread_ts:
+                continue
+            if not pending.coalescible:
+                return False
+            merged = f"{pending.attachments[0]['text']}\n\n{message.attachments[0]['text']}"
+            if len(merged) > self.coalesce_max_chars:
+                return False
+            pending.attachments[0]["text"] = merged
+            return True
+        return False
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="slack-dispatcher", daemon=True)
+                self._thread.start()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {**self.counters, "queue_depth": len(self._queue)}
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """대기 메시지를 모두 보낼 때까지 기다립니다 (종료 시). 시간 내 비웠으면 True"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"⚠️ Slack 큐 비우기 시간 초과: {len(self._queue)}건 남음")
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Consumer side (dispatcher thread)
+    # ------------------------------------------------------------------
+
+    def _limiter(self, channel: str) -> TokenBucketRateLimiter:
+        if channel not in self._limiters:
+            self._limiters[channel] = TokenBucketRateLimiter(
+                f"Slack {channel}", calls_per_minute=self.messages_per_minute, burst=1, cooldown_seconds=1.0
+            )
+        return self._limiters[channel]
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if self._stopping and not self._queue:
+                    return
+                message = self._queue.popleft()
+                self._in_flight += 1
+            try:
+                self._deliver(message)
+            except Exception as e:
+                logger.error(f"❌ Slack 전송 스레드 오류: {e}")
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, message: SlackMessage) -> None:
+        channel = settings.SLACK_CHANNEL if settings.SLACK_BOT_TOKEN else "webhook"
+        limiter = self._limiter(channel)
+        limiter.acquire()
+        with tracing.use_context(message.trace_context):
+            outcome, retry_after = SlackNotifier._send(message, self.session)
+        with self._cond:
+            if outcome == "sent":
+                self._count("sent")
+            elif outcome == "rate_limited":
+                self._count("rate_limited")
+                if message.attempts < self.max_retries:
+                    # 스레드 내 순서를 지키도록 큐 맨 앞에 다시 넣음
+                    message.attempts += 1
+                    self._count("retried")
+                    self._queue.appendleft(message)
+                else:
+                    self._count("failed")
+            else:
+                self._count("failed")
+        if outcome == "rate_limited":
+            limiter.on_rate_limited(retry_after)
+        elif outcome == "sent":
+            limiter.on_success()
+
+
+class ThreadTimestampMap:
+    """
+    request_id → thread_ts 저장소 (최대 개수 + TTL, thread-safe)
+
+    완료/오류 알림이 정리하지 못한 항목(예외로 건너뛴 경우)도 ttl_seconds가 지나거나
+    max_entries를 넘으면 오래된 것부터 삭제되어 무한히 커지지 않습니다.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        while self._items:
+            key, (_, expires_at) = next(iter(self._items.items()))
+            if expires_at > now and len(self._items) <= self.max_entries:
+                break
+            del self._items[key]
+
+    def __setitem__(self, key: str, value: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._items.pop(key, None)
+            self._items[key] = (value, now + self.ttl_seconds)
+            self._evict(now)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            if item[1] <= time.monotonic():
+                del self._items[key]
+                return default
+            return item[0]
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def pop(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self._lock:
+            item = self._items.pop(key, None)
+        return item[0] if item is not None and item[1] > time.monotonic() else default
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            del self._items[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict(time.monotonic())
+            return len(self._items)
+
+
 class SlackNotifier:
     """Slack 알림 서비스 (Thread 지원) - Slack API 기반"""
 
-    # Request별 thread_ts 저장소
-    _thread_timestamps: Dict[str, str] = {}
+    # Request별 thread_ts 저장소 (최대 개수/TTL 제한)
+    _thread_timestamps = ThreadTimestampMap(
+        max_entries=settings.SLACK_THREAD_TS_MAX_ENTRIES,
+        ttl_seconds=settings.SLACK_THREAD_TS_TTL_SECONDS
+    )
+
+    _dispatcher: Optional[SlackDispatcher] = None
+    _dispatcher_lock = threading.Lock()
+    _session: Optional[requests.Session] = None
+
+    @classmethod
+    def dispatcher(cls) -> SlackDispatcher:
+        """프로세스 전체가 공유하는 전송 큐"""
+        with cls._dispatcher_lock:
+            if cls._dispatcher is None:
+                cls._dispatcher = SlackDispatcher(
+                    max_size=settings.SLACK_QUEUE_MAX_SIZE,
+                    messages_per_minute=settings.SLACK_MESSAGES_PER_MINUTE,
+                    coalesce_max_chars=settings.SLACK_COALESCE_MAX_CHARS,
+                    max_retries=settings.SLACK_MAX_RETRIES
+                )
+            return cls._dispatcher
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """전송 큐 카운터 (enqueued/sent/failed/dropped/coalesced/rate_limited/retried, queue_depth)"""
+        return cls._dispatcher.stats() if cls._dispatcher is not None else {}
+
+    @classmethod
+    def flush(cls, timeout: float = 10.0) -> bool:
+        """대기 중인 메시지 전송 완료 대기 (프로세스 종료 전 호출)"""
+        return cls._dispatcher.flush(timeout) if cls._dispatcher is not None else True
 
     @staticmethod
     def _use_api() -> bool:
@@ -22,7 +293,7 @@ class SlackNotifier:
         return bool(settings.SLACK_BOT_TOKEN)
 
     @staticmethod
-    def _post_message(text: str, attachments: list = None, thread_ts: Optional[str] = None) -> Optional[str]:
+    def _post_message(text: str, attachments: list = None, thread_ts: Optional[str] = None, coalescible: bool = False) -> Optional[str]:
         """
         Slack API 또는 Webhook으로 메시지 전송
 
@@ -30,22 +301,48 @@ class SlackNotifier:
             text: 메시지 텍스트
             attachments: 첨부 파일
             thread_ts: 스레드 타임스탬프 (thread 답글용)
+            coalescible: 같은 스레드의 연속 답글과 병합 가능 여부
 
         Returns:
-            메시지 타임스탬프 (API 사용 시) 또는 None (Webhook 사용 시)
+            메시지 타임스탬프 (동기 API 전송 시) 또는 None (큐 전송/Webhook 사용 시)
+        """
+        if not settings.SLACK_BOT_TOKEN and not settings.SLACK_WEBHOOK_URL:
+            logger.warning("Slack configuration not found (need SLACK_BOT_TOKEN or SLACK_WEBHOOK_URL)")
+            return None
+
+        message = SlackMessage(text=text, attachments=attachments, thread_ts=thread_ts, coalescible=coalescible)
+        if settings.SLACK_ASYNC_ENABLED:
+            SlackNotifier.dispatcher().submit(message)
+            return None
+
+        if SlackNotifier._session is None:
+            SlackNotifier._session = requests.Session()
+        outcome, ts = SlackNotifier._send(message, SlackNotifier._session)
+        return ts if outcome == "sent" else None
+
+    @staticmethod
+    def _send(message: SlackMessage, session: requests.Session):
+        """
+        메시지 한 건 전송
+
+        Returns:
+            (outcome, value) - ("sent", ts), ("rate_limited", retry_after 초), ("failed", None)
         """
         if settings.SLACK_BOT_TOKEN:
             # Slack API 사용 (권장)
-            return SlackNotifier._post_via_api(text, attachments, thread_ts)
-        elif settings.SLACK_WEBHOOK_URL:
-            # Slack Webhook 사용 (대체)
-            return SlackNotifier._post_via_webhook(text, attachments)
-        else:
-            logger.warning("Slack configuration not found (need SLACK_BOT_TOKEN or SLACK_WEBHOOK_URL)")
+            return SlackNotifier._post_via_api(message, session)
+        # Slack Webhook 사용 (대체)
+        return SlackNotifier._post_via_webhook(message, session)
+
+    @staticmethod
+    def _retry_after(response) -> Optional[float]:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
             return None
 
     @staticmethod
-    def _post_via_api(text: str, attachments: list = None, thread_ts: Optional[str] = None) -> Optional[str]:
+    def _post_via_api(message: SlackMessage, session: requests.Session):
         """Slack API (chat.postMessage)를 사용해 메시지 전송"""
         try:
             headers = {
@@ -55,64 +352,76 @@ class SlackNotifier:
 
             payload = {
                 "channel": settings.SLACK_CHANNEL,
-                "text": text,
+                "text": message.text,
             }
 
-            if attachments:
-                payload["attachments"] = attachments
-
-            if thread_ts:
-                payload["thread_ts"] = thread_ts
-
-            response = requests.post(
-                "https://slack.com/api/chat.postMessage",
-                headers=headers,
-                json=payload,
-                timeout=5
-            )
-            response.raise_for_status()
+            if message.attachments:
+                payload["attachments"] = message.attachments
+
+            if message.thread_ts:
+                payload["thread_ts"] = message.thread_ts
+
+            with external_call("slack", "chat.postMessage") as call:
+                response = session.post(
+                    f"{settings.SLACK_API_BASE_URL}/chat.postMessage",
+                    headers=headers,
+                    json=payload,
+                    timeout=5
+                )
+                if response.status_code == 429:
+                    call.status = "rate_limited"
+                    logger.warning("⏳ Slack API 호출 제한 (429)")
+                    return "rate_limited", SlackNotifier._retry_after(response)
+                response.raise_for_status()
 
             data = response.json()
             if data.get("ok"):
                 message_ts = data.get("ts")
-                if thread_ts:
-                    logger.info(f"✅ Slack 스레드 답글 발송: thread_ts={thread_ts}, ts={message_ts}")
+                if message.thread_ts:
+                    logger.info(f"✅ Slack 스레드 답글 발송: thread_ts={message.thread_ts}, ts={message_ts}")
                 else:
                     logger.info(f"✅ Slack 메시지 발송: ts={message_ts}")
-                return message_ts
+                return "sent", message_ts
             else:
                 error_msg = data.get("error", "Unknown error")
+                if error_msg == "ratelimited":
+                    return "rate_limited", SlackNotifier._retry_after(response)
                 logger.error(f"❌ Slack API 오류: {error_msg}")
-                return None
+                return "failed", None
 
         except Exception as e:
             logger.error(f"❌ Slack 메시지 발송 실패: {e}")
-            return None
+            return "failed", None
 
     @staticmethod
-    def _post_via_webhook(text: str, attachments: list = None) -> Optional[str]:
+    def _post_via_webhook(message: SlackMessage, session: requests.Session):
         """Slack Webhook을 사용해 메시지 전송 (Thread 미지원)"""
         try:
-            message = {
-                "text": text,
+            body = {
+                "text": message.text,
             }
 
-            if attachments:
-                message["attachments"] = attachments
-
-            response = requests.post(
-                settings.SLACK_WEBHOOK_URL,
-                json=message,
-                timeout=5
-            )
-            response.raise_for_status()
+            if message.attachments:
+                body["attachments"] = message.attachments
+
+            with external_call("slack", "webhook") as call:
+                response = session.post(
+                    settings.SLACK_WEBHOOK_URL,
+                    json=body,
+                    timeout=5
+                )
+                if response.status_code == 429:
+                    call.status = "rate_limited"
+                    logger.warning("⏳ Slack Webhook 호출 제한 (429)")
+                    return "rate_limited", SlackNotifier._retry_after(response)
+                response.raise_for_status()
 
             logger.info("✅ Slack 메시지 발송 (Webhook)")
-            return None
+            return "sent", None
 
         except Exception as e:
             logger.error(f"❌ Slack 메시지 발송 실패: {e}")
-            return None
+            return "failed", None
 
     @staticmethod
     def notify_economic_data_collection_start(request_id: str, source: str = "kafka", parent_thread_ts: Optional[str] = None) -> Optional[str]:
@@ -125,7 +434,7 @@ class SlackNotifier:
             parent_thread_ts: 부모 스레드 타임스탬프 (Kotlin에서 전달받음)
 
         Returns:
-            메시지 타임스탬프
+            메시지 타임스탬프 (큐 전송 시 None)
         """
         # Kotlin에서 전달받은 parent_thread_ts가 있으면 저장
         if parent_thread_ts:
@@ -183,6 +492,9 @@ class SlackNotifier:
         yahoo_count = data_summary.get("yahoo_collected", 0)
         total_count = data_summary.get("total_indicators", fred_count + yahoo_count)
         duration = data_summary.get("duration", "N/A")
+        dates_written = data_summary.get("dates_written", 0)
+        dates_skipped = data_summary.get("dates_skipped", 0)
+        source_errors = data_summary.get("source_errors", 0)
 
         text = "✅ 경제 데이터 수집 완료"
         attachments = [
@@ -196,6 +508,8 @@ class SlackNotifier:
                     {"title": "FRED 지표", "value": f"{fred_count}개", "short": True},
                     {"title": "Yahoo Finance", "value": f"{yahoo_count}개", "short": True},
                     {"title": "총 수집 지표", "value": f"{total_count}개", "short": True},
+                    {"title": "저장 일자", "value": f"{dates_written}일 (변경 없음 {dates_skipped}일)", "short": True},
+                    {"title": "소스 오류", "value": f"{source_errors}건", "short": True},
                     {"title": "완료 시각", "value": datetime.now(KST).strftime("%Y-%m-%d %H:%M:%S"), "short": True},
                 ],
                 "footer": "Quantiq Data Engine",
@@ -207,8 +521,7 @@ class SlackNotifier:
         SlackNotifier._post_message(text, attachments, thread_ts=thread_ts)
 
         # 정리
-        if request_id in SlackNotifier._thread_timestamps:
-            del SlackNotifier._thread_timestamps[request_id]
+        SlackNotifier._thread_timestamps.pop(request_id)
 
     @staticmethod
     def notify_economic_data_collection_error(request_id: str, error: str, thread_ts: Optional[str] = None):
@@ -249,12 +562,11 @@ class SlackNotifier:
         SlackNotifier._post_message(text, attachments, thread_ts=thread_ts)
 
         # 정리
-        if request_id in SlackNotifier._thread_timestamps:
-            del SlackNotifier._thread_timestamps[request_id]
+        SlackNotifier._thread_timestamps.pop(request_id)
 
     @staticmethod
     def notify_fred_api_error(indicator_code: str, error: str):
-        """FRED API 오류 알림"""
+        """FRED API 오류 단건 알림 (수집 작업 중 오류는 notify_error_digest로 모아서 발송)"""
         text = "⚠️ FRED API 오류"
         attachments = [
             {
@@ -274,7 +586,7 @@ class SlackNotifier:
 
     @staticmethod
     def notify_yahoo_finance_error(ticker: str, error: str):
-        """Yahoo Finance 오류 알림"""
+        """Yahoo Finance 오류 단건 알림 (수집 작업 중 오류는 notify_error_digest로 모아서 발송)"""
         text = "⚠️ Yahoo Finance 오류"
         attachments = [
             {
@@ -292,6 +604,47 @@ class SlackNotifier:
         ]
         SlackNotifier._post_message(text, attachments)
 
+    @staticmethod
+    def notify_error_digest(request_id: str, digest: dict, thread_ts: Optional[str] = None):
+        """
+        작업 중 모은 소스 오류 요약 알림 (요청당 한 건, 스레드 답글)
+
+        Args:
+            request_id: 요청 ID
+            digest: ErrorDigest.summary()
+            thread_ts: 스레드 타임스탬프 (없으면 저장된 것 조회)
+        """
+        if not digest or not digest.get("total"):
+            return
+
+        if not thread_ts:
+            thread_ts = SlackNotifier._thread_timestamps.get(request_id)
+
+        source_lines = "\n".join(
+            f"• {source}: {stats['count']}건 ({stats['keys']}개 대상, 최대 {stats['duration_max']:.1f}초, 합계 {stats['duration_total']:.1f}초)"
+            for source, stats in digest["sources"].items()
+        )
+        top_errors = "\n".join(f"• {e['count']}건 - {e['error']}" for e in digest["top_errors"])
+        samples = "\n".join(f"• [{s['source']}] {s['key']}: {s['error']}" for s in digest["samples"])
+
+        text = f"⚠️ {digest.get('job', '작업')} 소스 오류 {digest['total']}건"
+        attachments = [
+            {
+                "color": "ffc107",
+                "title": "외부 소스 오류 요약",
+                "text": source_lines,
+                "fields": [
+                    {"title": "Request ID", "value": request_id, "short": True},
+                    {"title": "작업 소요", "value": f"{digest.get('elapsed', 0):.1f}초", "short": True},
+                    {"title": "주요 오류", "value": top_errors, "short": False},
+                    {"title": "샘플", "value": samples, "short": False},
+                ],
+                "footer": "Quantiq Data Engine",
+                "ts": int(datetime.now(KST).timestamp())
+            }
+        ]
+        SlackNotifier._post_message(text, attachments, thread_ts=thread_ts)
+
     @staticmethod
     def send_thread_message(text: str, thread_ts: str):
         """
@@ -314,4 +667,12 @@ class SlackNotifier:
             }
         ]
 
-        SlackNotifier._post_message("", attachments, thread_ts=thread_ts)
+        # 연속된 진행 상황 답글은 전송 대기 중이면 한 메시지로 병합
+        SlackNotifier._post_message("", attachments, thread_ts=thread_ts, coalescible=True)
+
+
+def _collect_slack_queue_depth():
+    SLACK_QUEUE_DEPTH.set(SlackNotifier.stats().get("queue_depth", 0))
+
+
+REGISTRY.add_collect_hook(_collect_slack_queue_depth)
@@ -0,0 +1,271 @@
+"""
+Streaming Analysis - 실시간 가격 틱으로 장중 기술적 매매 신호 감지
+
+quantiq.stock.price.updated 틱을 소비해 종목별 SMA/RSI/MACD를 O(1)로 갱신하고,
+analyze_stocks와 같은 매수 조건(골든크로스 + RSI<50 + MACD>Signal)이
+바뀌는 순간 quantiq.trading.signal.detected 이벤트를 발행합니다.
+
+지표 상태는 indicator_state(IndicatorStateBook)를 사용합니다. 증분 기술적 분석
+(TECHNICAL_ANALYSIS_INCREMENTAL)이 꺼져 있어도 동작하도록, 재적재 시 상태가 최신 일봉보다
+뒤처져 있으면 워커가 직접 advance_to로 전진시킵니다.
+장중 틱은 "현재가를 오늘 종가로 본다면"의 미리보기(advance(commit=False))로 계산하므로
+일봉 상태는 바뀌지 않고, 종목당 틱 처리 비용은 일정합니다.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from confluent_kafka import Consumer, KafkaError
+from pytz import timezone
+
+from src.core.config import settings
+from src.core.database import MongoDB
+from src.events.publisher import EventPublisher
+from src.events.schema import EventTopics, TradingSignalDetectedPayload, create_event
+from src.services.indicator_engine import IndicatorEngine
+from src.services.indicator_state import MIN_OBSERVATIONS, IncrementalIndicatorService, IndicatorStateBook
+
+logger = logging.getLogger(__name__)
+
+# 미국 종목 기준 거래일 (일봉 상태의 as_of_date와 비교)
+MARKET_TZ = timezone("America/New_York")
+
+SIGNAL_UNKNOWN = -1
+SIGNAL_NONE = 0
+SIGNAL_BUY = 1
+
+
+def buy_conditions(indicators: Dict[str, np.ndarray]) -> np.ndarray:
+    """매수 조건 충족 개수 (골든크로스, RSI<50, MACD>Signal → 0~3)"""
+    with np.errstate(invalid="ignore"):
+        golden_cross = indicators["sma20"] > indicators["sma50"]
+        rsi_ok = indicators["rsi"] < 50
+        macd_buy = indicators["macd"] > indicators["signal"]
+    return golden_cross.astype(np.int8) + rsi_ok + macd_buy
+
+
+class StreamingSignalDetector:
+    """
+    종목별 장중 신호 상태.
+
+    - book: 직전 거래일까지 전진한 지표 상태 (종목 = 행)
+    - signal: 종목별 마지막 신호 (-1 미정, 0 매수 조건 미충족, 1 매수)
+    - last_emit: 종목별 마지막 신호 발행 시각 (cooldown)
+    """
+
+    def __init__(self, book: IndicatorStateBook, cooldown_seconds: float = 60.0):
+        self.book = book
+        self.cooldown_seconds = cooldown_seconds
+        n = len(book.tickers)
+        self.signal = np.full(n, SIGNAL_UNKNOWN, dtype=np.int8)
+        self.last_emit = np.full(n, -np.inf)
+        self.last_price = np.full(n, np.nan)
+
+        # 일봉 종가 기준 신호로 시작해 첫 틱부터 실제 전환만 감지
+        rows = np.flatnonzero(book.count >= MIN_OBSERVATIONS)
+        if rows.size:
+            self.signal[rows] = np.where(buy_conditions(book.current(rows)) == 3, SIGNAL_BUY, SIGNAL_NONE)
+
+    def carry_over(self, previous: "StreamingSignalDetector") -> None:
+        """
+        재적재 전 detector의 장중 상태를 이어받습니다.
+
+        일봉 상태(as_of)가 그대로인 종목은 signal/last_price까지 유지해 이미 감지한 전환을 다시 발행하지 않고,
+        일봉이 전진한 종목은 새 종가 기준 signal로 시작하되 cooldown(last_emit)만 유지합니다.
+        """
+        for ticker, row in self.book.index.items():
+            old = previous.book.index.get(ticker)
+            if old is None:
+                continue
+            self.last_emit[row] = previous.last_emit[old]
+            if self.book.as_of[row] == previous.book.as_of[old] and previous.signal[old] != SIGNAL_UNKNOWN:
+                self.signal[row] = previous.signal[old]
+                self.last_price[row] = previous.last_price[old]
+
+    def on_ticks(self, ticks: Dict[str, float], trading_date: str, now: Optional[float] = None) -> List[Tuple[str, str, float, Dict[str, float]]]:
+        """
+        틱 묶음(종목별 최신가)을 반영하고 신호가 바뀐 종목을 반환합니다.
+
+        Args:
+            ticks: {ticker: 현재가}
+            trading_date: 틱의 거래일 (YYYY-MM-DD)
+            now: 현재 시각 (cooldown 계산용, 기본 time.monotonic())
+
+        Returns:
+            [(ticker, "buy" | "sell", confidence, indicators)]
+        """
+        now = time.monotonic() if now is None else now
+        index = self.book.index
+        pairs = [(index[t], p) for t, p in ticks.items() if t in index and p and p > 0]
+        if not pairs:
+            return []
+
+        rows = np.fromiter((r for r, _ in pairs), dtype=np.intp, count=len(pairs))
+        prices = np.fromiter((p for _, p in pairs), dtype=np.float64, count=len(pairs))
+        self.last_price[rows] = prices
+
+        # 관측치가 부족하거나 오늘 종가가 이미 반영된 종목은 제외
+        usable = (self.book.count[rows] >= MIN_OBSERVATIONS - 1) & (self.book.as_of[rows] < trading_date)
+        rows, prices = rows[usable], prices[usable]
+        if not rows.size:
+            return []
+
+        indicators = self.book.advance(rows, prices, commit=False)
+        met = buy_conditions(indicators)
+        new_signal = np.where(met == 3, SIGNAL_BUY, SIGNAL_NONE).astype(np.int8)
+
+        previous = self.signal[rows]
+        changed = (previous != SIGNAL_UNKNOWN) & (new_signal != previous)
+        cooled = now - self.last_emit[rows] >= self.cooldown_seconds
+        emit = changed & cooled
+
+        # cooldown 중인 전환은 상태에 반영하지 않아 cooldown 이후 다시 감지되도록 함
+        update = ~changed | emit
+        self.signal[rows[update]] = new_signal[update]
+        self.last_emit[rows[emit]] = now
+
+        signals = []
+        for k in np.flatnonzero(emit):
+            row = int(rows[k])
+            side = "buy" if new_signal[k] == SIGNAL_BUY else "sell"
+            # 매수는 3개 조건 모두 충족(1.0), 매도는 깨진 조건 비율
+            confidence = met[k] / 3.0 if side == "buy" else 1.0 - met[k] / 3.0
+            values = {name: float(arr[k]) for name, arr in indicators.items()}
+            values["price"] = float(prices[k])
+            signals.append((self.book.tickers[row], side, round(float(confidence), 4), values))
+        return signals
+
+
+class StreamingAnalysisWorker(threading.Thread):
+    """
+    가격 틱 전용 Kafka consumer 스레드.
+
+    분석 요청 consumer와 별도 그룹/스레드로 동작하므로 배치 분석 중에도 틱 처리가 밀리지 않습니다.
+    한 번에 받은 메시지는 종목별 최신가만 남겨 한 번의 벡터 연산으로 반영합니다.
+    """
+
+    def __init__(self, engine: Optional[IndicatorEngine] = None):
+        super().__init__(name="streaming-analysis", daemon=True)
+        self.service = IncrementalIndicatorService(engine or IndicatorEngine())
+        self.detector: Optional[StreamingSignalDetector] = None
+        self._loaded_at = 0.0
+        self._stop_event = threading.Event()
+        self.stats = {"ticks": 0, "batches": 0, "signals": 0}
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def reload_state(self) -> None:
+        """indicator_state와 활성 종목을 다시 읽습니다 (일봉 배치 반영)."""
+        db = MongoDB.get_db()
+        tickers = [s["ticker"] for s in db.stocks.find({"is_active": True}, {"ticker": 1}) if s.get("ticker")]
+        book = self.service.load_book(tickers)
+
+        # 상태가 없거나 최신 일봉보다 뒤처졌으면 직접 전진 (증분 기술적 분석이 꺼져 있으면 아무도 갱신하지 않음)
+        latest = db.daily_stock_data.find_one({}, {"_id": 0, "date": 1}, sort=[("date", -1)])
+        latest_date = latest["date"] if latest else None
+        if latest_date and max(book.as_of, default="") < latest_date:
+            try:
+                self.service.advance_to(latest_date)
+                book = self.service.load_book(tickers)
+            except Exception as e:
+                logger.error(f"indicator_state를 {latest_date}까지 전진하지 못했습니다: {e}")
+
+        previous = self.detector
+        self.detector = StreamingSignalDetector(book, settings.STREAMING_SIGNAL_COOLDOWN_SECONDS)
+        if previous is not None:
+            # 같은 날 재적재 시 장중 신호/발행 이력 유지 (중복 신호 방지)
+            self.detector.carry_over(previous)
+        self._loaded_at = time.monotonic()
+
+        usable = int((book.count >= MIN_OBSERVATIONS - 1).sum())
+        if usable == 0:
+            logger.error(f"❌ 스트리밍 분석에 쓸 indicator_state가 없습니다 (daily_stock_data 최신일: {latest_date}) - 신호가 발행되지 않습니다")
+        logger.info(f"📈 스트리밍 분석 상태 적재: {len(book.tickers)}개 종목 (지표 사용 가능 {usable}개, 기준일 {latest_date})")
+
+    @staticmethod
+    def parse_tick(raw: bytes) -> Optional[Tuple[str, float, str]]:
+        """틱 메시지 → (symbol, price, trading_date). BaseEvent 래핑/순수 payload 모두 지원"""
+        try:
+            data = json.loads(raw)
+        except (ValueError, TypeError):
+            return None
+        payload = data.get("payload", data) if isinstance(data, dict) else None
+        if not isinstance(payload, dict) or not payload.get("symbol") or payload.get("price") is None:
+            return None
+
+        try:
+            ts = datetime.fromisoformat(data["timestamp"]) if data.get("timestamp") else datetime.now(MARKET_TZ)
+            if ts.tzinfo is None:
+                ts = MARKET_TZ.localize(ts)
+            trading_date = ts.astimezone(MARKET_TZ).strftime("%Y-%m-%d")
+            return payload["symbol"], float(payload["price"]), trading_date
+        except (ValueError, TypeError):
+            return None
+
+    def process_batch(self, messages: Iterable[Any]) -> int:
+        """메시지 묶음 처리. 발행한 신호 수를 반환"""
+        if self.detector is None or time.monotonic() - self._loaded_at >= settings.STREAMING_STATE_RELOAD_SECONDS:
+            self.reload_state()
+
+        latest: Dict[str, Dict[str, float]] = {}
+        for msg in messages:
+            if msg.error():
+                if msg.error().code() != KafkaError._PARTITION_EOF:
+                    logger.error(f"Streaming consumer error: {msg.error()}")
+                continue
+            tick = self.parse_tick(msg.value())
+            if tick is None:
+                continue
+            symbol, price, trading_date = tick
+            latest.setdefault(trading_date, {})[symbol] = price
+            self.stats["ticks"] += 1
+
+        emitted = 0
+        for trading_date, ticks in latest.items():
+            for ticker, side, confidence, indicators in self.detector.on_ticks(ticks, trading_date):
+                payload = TradingSignalDetectedPayload(
+                    symbol=ticker,
+                    signalType=side,
+                    confidence=confidence,
+                    indicators=indicators,
+                    recommendedAction="BUY" if side == "buy" else "SELL",
+                    recommendedQuantity=0  # 수량은 주문 측에서 잔고 기준으로 결정
+                )
+                EventPublisher.publish(
+                    EventTopics.TRADING_SIGNAL_DETECTED,
+                    create_event(EventTopics.TRADING_SIGNAL_DETECTED, payload),
+                    flush=False
+                )
+                logger.info(f"🚦 장중 신호: {ticker} {side} (confidence={confidence}, price={indicators['price']})")
+                emitted += 1
+
+        self.stats["batches"] += 1
+        self.stats["signals"] += emitted
+        return emitted
+
+    def run(self) -> None:
+        consumer = Consumer({
+            'bootstrap.servers': settings.KAFKA_BOOTSTRAP_SERVERS,
+            'group.id': 'quantiq-data-engine-streaming',
+            'auto.offset.reset': 'latest'  # 지난 틱은 재생하지 않음
+        })
+        consumer.subscribe([EventTopics.STOCK_PRICE_UPDATED])
+        logger.info(f"Streaming analysis subscribed to {EventTopics.STOCK_PRICE_UPDATED}")
+
+        try:
+            while not self._stop_event.is_set():
+                messages = consumer.consume(num_messages=500, timeout=0.2)
+                if not messages:
+                    continue
+                try:
+                    self.process_batch(messages)
+                except Exception as e:
+                    logger.error(f"Streaming analysis batch failed: {e}")
+        finally:
+            consumer.close()
+            EventPublisher.close()
@@ -1,14 +1,32 @@
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
+from pymongo import UpdateOne
+from src.core.config import settings
 from src.core.database import MongoDB
+from src.core.jobs import add_records
+from src.core.metrics import stage_timer
+from src.services.indicator_engine import IndicatorEngine, build_field_matrix, build_price_matrix
+from src.services.indicator_graph import INPUT_FIELDS, split_specs
+from src.services.indicator_state import MIN_OBSERVATIONS, IncrementalIndicatorService
+from src.services.parallel_analysis import ShardedIndicatorRunner
+from src.services.result_cache import ResultCache, daily_data_version, universe_hash
+from src.services.scoring_engine import ScoringParams, technical_scores
 
 logger = logging.getLogger(__name__)
 
 class TechnicalAnalysisService:
     def __init__(self):
         self.lookback_days = 180
+        self.engine = IndicatorEngine(extra_indicators=split_specs(settings.TECHNICAL_ANALYSIS_EXTRA_INDICATORS))
+        self.incremental = IncrementalIndicatorService(self.engine, self.lookback_days)
+        self.incremental_enabled = settings.TECHNICAL_ANALYSIS_INCREMENTAL
+        self._incremental_runs = 0
+        self.cache = ResultCache()
+        self.last_run_cached = False
+        self.scoring = ScoringParams()
+        self.parallel = ShardedIndicatorRunner(self.engine, settings.TECHNICAL_ANALYSIS_WORKERS) \
+            if settings.TECHNICAL_ANALYSIS_WORKERS > 1 else None
 
     def calculate_sma(self, series, period):
         return series.rolling(window=period, min_periods=period).mean()
@@ -30,9 +48,17 @@ class TechnicalAnalysisService:
         signal = macd.ewm(span=signal_period, adjust=False).mean()
         return macd, signal
 
-    def analyze_stocks(self, target_date=None):
+    def analyze_stocks(self, target_date=None, use_cache=True, include_all=False):
+        """
+        기준일 기술적 분석. 모든 분석 종목의 stock_recommendations를 저장하고
+        (유니버스 횡단면 composite_score/technical_percentile 포함) 추천 종목을 반환합니다.
+
+        Args:
+            include_all: True면 추천 여부와 관계없이 분석한 모든 종목 반환 (통합 점수 계산용)
+        """
         logger.info(f"Starting technical analysis (target_date={target_date})...")
         db = MongoDB.get_db()
+        self.last_run_cached = False
 
         # Get active stocks
         stock_names = []
@@ -63,103 +89,285 @@ class TechnicalAnalysisService:
             end_date_str = end_dt.strftime("%Y-%m-%d")
             analysis_date = end_date_str
 
-        # Fetch daily data
+        # 같은 기준일/유니버스/입력 데이터/파라미터면 저장된 결과 재사용 (use_cache=False면 재계산 후 갱신)
+        cache_key = None
+        if self.cache.enabled:
+            try:
+                cache_key = ResultCache.make_key(
+                    "technical", analysis_date, universe_hash(active_stocks),
+                    self.data_version(db, analysis_date), self.cache_params()
+                )
+            except Exception as e:
+                logger.warning(f"Failed to build result cache key: {e}")
+            if cache_key and use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    recommendations = [r for r in cached if r.get("is_recommended")]
+                    logger.info(f"Analysis result cache hit ({analysis_date}). {len(recommendations)} stocks recommended.")
+                    self.last_run_cached = True
+                    return cached if include_all else recommendations
+
         try:
-            daily_data = list(db.daily_stock_data.find({
-                "date": {"$gte": start_date_str, "$lte": end_date_str}
-            }).sort("date", 1))
-            
-            if not daily_data:
-                logger.warning("No daily stock data found.")
+            with stage_timer("technical", "indicators"):
+                indicator_rows = None
+                if self.incremental_enabled:
+                    indicator_rows = self._compute_incremental(analysis_date)
+
+                if indicator_rows is None:
+                    indicator_rows = self._compute_full(db, start_date_str, end_date_str, analysis_date)
+
+            if not indicator_rows:
                 return []
 
-            # Construct DataFrame
-            data_dict = {}
-            for doc in daily_data:
-                date = doc["date"]
-                stocks_data = doc.get("stocks", {})
-                
-                # Active stocks logic needs ticker mapping. 
-                # For simplicity in migration, assuming stocks_data uses Ticker as key.
-                # But we need Stock Name -> Ticker mapping or just iterate what's in DB.
-                # Let's rely on what's available in stocks_data.
-                for ticker, val in stocks_data.items():
-                    price = val if isinstance(val, (int, float)) else val.get("close_price")
-                    if price:
-                        if ticker not in data_dict:
-                            data_dict[ticker] = {}
-                        data_dict[ticker][date] = float(price)
-            
             # Map Ticker to Stock Name for reporting
             ticker_to_name = {s["ticker"]: s["stock_name"] for s in active_stocks if s.get("ticker")}
-            
-            recommendations = []
-            
-            for ticker, dates_prices in data_dict.items():
-                if len(dates_prices) < 50:
-                    continue
-                    
-                df = pd.DataFrame.from_dict(dates_prices, orient='index', columns=['close'])
-                df.index = pd.to_datetime(df.index)
-                df.sort_index(inplace=True)
-                
-                # Fill missing
-                df = df.ffill().bfill()
-                
-                # Setup indicators
-                df['sma20'] = self.calculate_sma(df['close'], 20)
-                df['sma50'] = self.calculate_sma(df['close'], 50)
-                df['rsi'] = self.calculate_rsi(df['close'])
-                df['macd'], df['signal'] = self.calculate_macd(df['close'])
-
-                # Use target_date for analysis (not the latest date)
-                try:
-                    target_dt = pd.to_datetime(analysis_date)
-                    if target_dt not in df.index:
-                        logger.warning(f"Target date {analysis_date} not found for {ticker}, skipping")
-                        continue
-                    latest_date = target_dt
-                    latest_row = df.loc[latest_date]
-                except Exception as e:
-                    logger.error(f"Error accessing target date {analysis_date} for {ticker}: {e}")
-                    continue
-                
-                golden_cross = latest_row['sma20'] > latest_row['sma50']
-                macd_buy = latest_row['macd'] > latest_row['signal']
-                is_recommended = golden_cross and (latest_row['rsi'] < 50) and macd_buy
-                
-                rec_data = {
-                    "date": latest_date.strftime("%Y-%m-%d"),
-                    "ticker": ticker,
-                    "stock_name": ticker_to_name.get(ticker, ticker),
-                    "technical_indicators": {
-                        "sma20": latest_row['sma20'],
-                        "sma50": latest_row['sma50'],
-                        "rsi": latest_row['rsi'],
-                        "macd": latest_row['macd'],
-                        "signal": latest_row['signal'],
-                        "golden_cross": bool(golden_cross),
-                        "macd_buy_signal": bool(macd_buy)
-                    },
-                    "is_recommended": bool(is_recommended),
-                    "updated_at": datetime.utcnow()
-                }
-                
-                # Save to MongoDB (stock_recommendations)
-                db.stock_recommendations.update_one(
-                    {"ticker": ticker, "date": rec_data["date"]},
-                    {"$set": rec_data},
-                    upsert=True
-                )
-                
-                if is_recommended:
-                    recommendations.append(rec_data)
-                    
-            logger.info(f"Analysis complete. {len(recommendations)} stocks recommended.")
-            return recommendations
+
+            # 유니버스 횡단면 기술적 점수 (전 종목을 한 번에 정규화)
+            with stage_timer("technical", "scoring"):
+                tickers = list(indicator_rows)
+                scores = technical_scores({
+                    name: np.fromiter((indicator_rows[t][name] for t in tickers), dtype=np.float64, count=len(tickers))
+                    for name in ("sma20", "sma50", "rsi", "macd", "signal")
+                }, self.scoring)
+
+                rows = []
+                operations = []
+                for j, ticker in enumerate(tickers):
+                    rec_data = self._build_recommendation(
+                        ticker, analysis_date, indicator_rows[ticker], ticker_to_name, scores=self._score_fields(scores, j)
+                    )
+                    operations.append(UpdateOne({"ticker": ticker, "date": rec_data["date"]}, {"$set": rec_data}, upsert=True))
+                    rows.append(rec_data)
+                recommendations = [r for r in rows if r["is_recommended"]]
+
+            # Save to MongoDB (stock_recommendations)
+            with stage_timer("technical", "store"):
+                db.stock_recommendations.bulk_write(operations, ordered=False)
+
+                if cache_key:
+                    self.cache.put(cache_key, "technical", analysis_date, rows)
+            add_records(len(rows))
+
+            logger.info(f"Analysis complete. {len(recommendations)}/{len(rows)} stocks recommended.")
+            return rows if include_all else recommendations
 
         except Exception as e:
             logger.error(f"Analysis failed: {e}")
             import traceback
             logger.error(traceback.format_exc())
             return []
+
+    def analyze_date_range(self, start_date, end_date):
+        """
+        기간 일괄 분석: 조회 구간을 한 번만 읽고 지표를 한 번만 계산해
+        start_date ~ end_date의 모든 거래일 추천 행을 한 번의 bulk write로 저장합니다.
+
+        날짜별 선정 조건(해당일 가격 존재, 직전 lookback_days 내 관측치 50개 이상)은
+        analyze_stocks와 같습니다. 단, EMA는 날짜마다 다시 시작하지 않고
+        (start_date - lookback_days)부터 이어서 계산하므로 MACD/Signal이 단일 날짜 분석과
+        미세하게 다를 수 있습니다.
+
+        Args:
+            start_date: 시작 날짜 (YYYY-MM-DD)
+            end_date: 종료 날짜 (YYYY-MM-DD)
+
+        Returns:
+            {"dates": 분석한 거래일 수, "total_analyzed": 저장한 행 수,
+             "recommended_by_date": {date: 추천 수}, "recommendations": 추천 행 목록}
+        """
+        logger.info(f"Starting date-range technical analysis ({start_date} ~ {end_date})...")
+        db = MongoDB.get_db()
+
+        if start_date > end_date:
+            raise ValueError(f"start_date({start_date}) must not be after end_date({end_date})")
+
+        active_stocks = list(db.stocks.find({"is_active": True}))
+        ticker_to_name = {s["ticker"]: s["stock_name"] for s in active_stocks if s.get("ticker")}
+
+        load_start = (datetime.strptime(start_date, "%Y-%m-%d") - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d")
+        daily_data = list(db.daily_stock_data.find({
+            "date": {"$gte": load_start, "$lte": end_date}
+        }).sort("date", 1))
+
+        summary = {"dates": 0, "total_analyzed": 0, "recommended_by_date": {}, "recommendations": []}
+        if not daily_data:
+            logger.warning("No daily stock data found.")
+            return summary
+
+        matrix = build_price_matrix(daily_data)
+        indicators = self._compute_indicators(matrix.values, self._extra_inputs(daily_data, matrix))
+
+        # 날짜별 직전 lookback_days 구간의 관측치 수 (analyze_stocks의 50개 조건과 동일)
+        dates = np.array(matrix.dates, dtype="datetime64[D]")
+        window_starts = np.searchsorted(dates, dates - np.timedelta64(self.lookback_days, "D"), side="left")
+        cumulative = np.vstack([
+            np.zeros((1, matrix.values.shape[1]), dtype=np.int64),
+            np.cumsum(~np.isnan(matrix.values), axis=0)
+        ])
+        window_counts = cumulative[1:] - cumulative[window_starts]
+
+        selected = (window_counts >= MIN_OBSERVATIONS) & ~np.isnan(matrix.values)
+        in_range = (dates >= np.datetime64(start_date)) & (dates <= np.datetime64(end_date))
+        selected[~in_range] = False
+
+        # 날짜별 횡단면 점수 (각 날짜의 분석 대상 종목끼리 정규화)
+        scores = technical_scores({
+            name: np.where(selected, indicators[name], np.nan)
+            for name in ("sma20", "sma50", "rsi", "macd", "signal")
+        }, self.scoring)
+
+        now = datetime.utcnow()
+        operations = []
+        for t, j in zip(*np.nonzero(selected)):
+            date = matrix.dates[t]
+            ticker = matrix.tickers[j]
+            row = {name: float(values[t, j]) for name, values in indicators.items()}
+            rec_data = self._build_recommendation(ticker, date, row, ticker_to_name, now, self._score_fields(scores, (t, j)))
+            operations.append(UpdateOne({"ticker": ticker, "date": date}, {"$set": rec_data}, upsert=True))
+
+            summary["recommended_by_date"].setdefault(date, 0)
+            if rec_data["is_recommended"]:
+                summary["recommended_by_date"][date] += 1
+                summary["recommendations"].append(rec_data)
+
+        if operations:
+            db.stock_recommendations.bulk_write(operations, ordered=False)
+
+        summary["dates"] = int(in_range.sum())
+        summary["total_analyzed"] = len(operations)
+        logger.info(
+            f"Date-range analysis complete. {summary['dates']} dates, {len(operations)} rows, "
+            f"{len(summary['recommendations'])} recommendations."
+        )
+        return summary
+
+    def cache_params(self):
+        """결과 캐시 키에 들어가는 분석 파라미터"""
+        return {
+            **self.engine.config(),
+            "lookback_days": self.lookback_days,
+            "min_observations": MIN_OBSERVATIONS,
+            "incremental": self.incremental_enabled,
+            "scoring_features": self.scoring.feature_weights,
+            # 캐시 항목 형식: 분석한 전체 종목 (추천 여부 필드 포함)
+            "cache_rows": "all",
+        }
+
+    def data_version(self, db, analysis_date):
+        """analysis_date 분석에 쓰이는 daily_stock_data 구간의 버전 해시"""
+        start = (datetime.strptime(analysis_date, "%Y-%m-%d") - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d")
+        return daily_data_version(db, start, analysis_date)
+
+    def _compute_indicators(self, values, extra_inputs):
+        """지표 행렬 계산 (종목 수가 충분하고 워커가 설정되어 있으면 프로세스 풀로 분산)"""
+        if self.parallel is not None and values.shape[1] >= settings.TECHNICAL_ANALYSIS_PARALLEL_MIN_TICKERS:
+            try:
+                return self.parallel.compute(values, extra_inputs)
+            except Exception as e:
+                logger.error(f"병렬 지표 계산 실패, 단일 프로세스로 대체: {e}")
+                self.parallel.close()  # 다음 실행에서 워커 풀을 새로 생성
+        return self.engine.compute(values, extra_inputs)
+
+    def _extra_inputs(self, daily_data, matrix):
+        """추가 지표에 필요한 고가/저가/거래량 등의 행렬 (종가 행렬과 같은 좌표)"""
+        field_to_input = {field: name for name, field in INPUT_FIELDS.items()}
+        return {
+            field_to_input[field]: build_field_matrix(daily_data, matrix, field)
+            for field in self.engine.input_fields
+        }
+
+    @staticmethod
+    def _score_fields(scores, index):
+        """technical_scores 결과에서 한 종목(또는 날짜 × 종목 칸)의 점수 필드"""
+        composite = float(scores["composite_score"][index])
+        percentile = float(scores["technical_percentile"][index])
+        return {
+            "composite_score": None if np.isnan(composite) else round(composite, 4),
+            "technical_percentile": None if np.isnan(percentile) else round(percentile, 4),
+            "rules_met": int(scores["rules_met"][index]),
+        }
+
+    @staticmethod
+    def _build_recommendation(ticker, date, row, ticker_to_name, updated_at=None, scores=None):
+        """지표 값으로 stock_recommendations 문서를 만듭니다."""
+        golden_cross = row['sma20'] > row['sma50']
+        macd_buy = row['macd'] > row['signal']
+        is_recommended = golden_cross and (row['rsi'] < 50) and macd_buy
+
+        # TECHNICAL_ANALYSIS_EXTRA_INDICATORS로 요청한 추가 지표 (NaN은 저장하지 않음)
+        extra_indicators = {
+            name: value for name, value in row.items()
+            if name not in ("sma20", "sma50", "rsi", "macd", "signal") and not np.isnan(value)
+        }
+
+        return {
+            "date": date,
+            "ticker": ticker,
+            "stock_name": ticker_to_name.get(ticker, ticker),
+            "technical_indicators": {
+                "sma20": row['sma20'],
+                "sma50": row['sma50'],
+                "rsi": row['rsi'],
+                "macd": row['macd'],
+                "signal": row['signal'],
+                "golden_cross": bool(golden_cross),
+                "macd_buy_signal": bool(macd_buy),
+                **extra_indicators
+            },
+            **(scores or {}),
+            "is_recommended": bool(is_recommended),
+            "updated_at": updated_at or datetime.utcnow()
+        }
+
+    def _compute_full(self, db, start_date_str, end_date_str, analysis_date):
+        """
+        조회 구간 전체를 다시 읽어 analysis_date의 지표를 계산합니다.
+
+        Returns:
+            {ticker: {"sma20", "sma50", "rsi", "macd", "signal"}}
+        """
+        daily_data = list(db.daily_stock_data.find({
+            "date": {"$gte": start_date_str, "$lte": end_date_str}
+        }).sort("date", 1))
+
+        if not daily_data:
+            logger.warning("No daily stock data found.")
+            return {}
+
+        # 전 종목 가격을 (날짜 × 종목) 행렬로 적재 후 지표를 한 번에 계산
+        matrix = build_price_matrix(daily_data)
+        target_idx = matrix.date_index(analysis_date)
+        if target_idx is None:
+            logger.warning(f"Target date {analysis_date} not found in daily stock data")
+            return {}
+
+        indicators = self._compute_indicators(matrix.values, self._extra_inputs(daily_data, matrix))
+        selected = np.flatnonzero(
+            (matrix.observation_counts() >= MIN_OBSERVATIONS) & ~np.isnan(matrix.values[target_idx])
+        )
+        return {
+            matrix.tickers[j]: {name: float(values[target_idx, j]) for name, values in indicators.items()}
+            for j in selected
+        }
+
+    def _compute_incremental(self, analysis_date):
+        """
+        indicator_state를 analysis_date까지 전진시켜 지표를 계산합니다.
+
+        과거 날짜 재분석 등 증분 경로를 쓸 수 없으면 None (전체 재계산으로 대체)
+        """
+        try:
+            rows = self.incremental.advance_to(analysis_date)
+        except Exception as e:
+            logger.error(f"증분 지표 계산 실패, 전체 재계산으로 대체: {e}")
+            return None
+
+        self._incremental_runs += 1
+        verify_every = settings.INDICATOR_STATE_VERIFY_EVERY
+        if rows is not None and verify_every > 0 and self._incremental_runs % verify_every == 0:
+            try:
+                self.incremental.verify(sample_size=settings.INDICATOR_STATE_VERIFY_SAMPLE)
+            except Exception as e:
+                logger.error(f"indicator_state 일관성 검사 실패: {e}")
+
+        return rows
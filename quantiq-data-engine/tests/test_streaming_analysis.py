@@ -0,0 +1,76 @@
+"""StreamingSignalDetector - indicator_state 재적재 전후의 장중 신호 중복 발행 검사"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.services.indicator_engine import IndicatorEngine
+from src.services.indicator_state import IndicatorStateBook
+from src.services.streaming_analysis import SIGNAL_BUY, SIGNAL_NONE, StreamingSignalDetector, buy_conditions
+
+COOLDOWN = 60.0
+TRADING_DATE = "2026-05-01"
+
+
+def _history(days: int = 120, seed: int = 14):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(1 + rng.normal(0.002, 0.02, days))
+    dates = [(date(2026, 1, 1) + timedelta(days=i)).isoformat() for i in range(days)]
+    return dates, closes
+
+
+def _book(dates, closes) -> IndicatorStateBook:
+    book = IndicatorStateBook(["AAA"], IndicatorEngine())
+    book.seed(np.array([0]), dates, closes[:, None])
+    return book
+
+
+def _reload(book: IndicatorStateBook) -> IndicatorStateBook:
+    """저장 후 다시 읽은 것과 같은 새 상태 (reload_state의 load_book)"""
+    return IndicatorStateBook.from_documents([book.to_document(0)], book.engine)
+
+
+def _buy_price(book: IndicatorStateBook) -> float:
+    """일봉 기준으로는 매수 조건 미충족이지만 장중 가격으로는 충족되는 현재가"""
+    row = np.array([0])
+    assert buy_conditions(book.current(row))[0] < 3
+    last = float(book.last_close[0])
+    for factor in np.linspace(0.8, 1.2, 81):
+        if buy_conditions(book.advance(row, np.array([last * factor]), commit=False))[0] == 3:
+            return last * factor
+    raise AssertionError("no intraday buy price for fixture history")
+
+
+def test_reload_with_same_daily_state_does_not_reemit():
+    dates, closes = _history()
+    book = _book(dates, closes)
+    price = _buy_price(book)
+
+    detector = StreamingSignalDetector(book, COOLDOWN)
+    assert detector.signal[0] == SIGNAL_NONE
+    assert [s[1] for s in detector.on_ticks({"AAA": price}, TRADING_DATE, now=0.0)] == ["buy"]
+    assert detector.on_ticks({"AAA": price}, TRADING_DATE, now=100.0) == []
+
+    reloaded = StreamingSignalDetector(_reload(book), COOLDOWN)
+    reloaded.carry_over(detector)
+    assert reloaded.signal[0] == SIGNAL_BUY
+    assert reloaded.last_price[0] == price
+    assert reloaded.on_ticks({"AAA": price}, TRADING_DATE, now=400.0) == []
+
+
+def test_reload_after_daily_advance_reseeds_signal_and_keeps_cooldown():
+    dates, closes = _history()
+    book = _book(dates[:-1], closes[:-1])
+    detector = StreamingSignalDetector(book, COOLDOWN)
+    detector.signal[0] = SIGNAL_BUY
+    detector.last_emit[0] = 390.0
+
+    advanced = _book(dates, closes)
+    reloaded = StreamingSignalDetector(advanced, COOLDOWN)
+    reloaded.carry_over(detector)
+    # 새 일봉 종가 기준 신호로 다시 시작하고, 발행 시각은 유지
+    assert reloaded.signal[0] == SIGNAL_NONE
+    assert reloaded.last_emit[0] == 390.0
+
+    price = _buy_price(advanced)
+    assert reloaded.on_ticks({"AAA": price}, TRADING_DATE, now=400.0) == []
+    assert [s[1] for s in reloaded.on_ticks({"AAA": price}, TRADING_DATE, now=460.0)] == ["buy"]